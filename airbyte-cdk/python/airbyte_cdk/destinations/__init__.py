@@ -3,5 +3,7 @@
 #
 
 from .destination import Destination
+from .input_pipeline import RecordBatch, parse_input_messages
+from .record_buffer import RecordBuffer
 
-__all__ = ["Destination"]
+__all__ = ["Destination", "RecordBatch", "RecordBuffer", "parse_input_messages"]
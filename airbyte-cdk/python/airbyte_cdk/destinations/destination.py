@@ -7,12 +7,13 @@ import io
 import logging
 import sys
 from abc import ABC, abstractmethod
-from typing import Any, Iterable, List, Mapping
+from typing import Any, Iterable, List, Mapping, Union
 
 from airbyte_cdk.connector import Connector
+from airbyte_cdk.destinations.input_pipeline import RecordBatch, parse_input_messages
 from airbyte_cdk.models import AirbyteMessage, ConfiguredAirbyteCatalog, Type
 from airbyte_cdk.sources.utils.schema_helpers import check_config_against_spec_or_exit
-from pydantic import ValidationError
+from airbyte_cdk.utils.output_sink import OutputSink
 
 logger = logging.getLogger("airbyte")
 
@@ -20,23 +21,31 @@ logger = logging.getLogger("airbyte")
 class Destination(Connector, ABC):
     VALID_CMDS = {"spec", "check", "write"}
 
+    # Set to True for write() to receive the records of each stream grouped in RecordBatches rather than one message per record
+    batch_input_records: bool = False
+    # Maximum number of records of the RecordBatches received by write()
+    input_batch_size: int = 1000
+
     @abstractmethod
     def write(
-        self, config: Mapping[str, Any], configured_catalog: ConfiguredAirbyteCatalog, input_messages: Iterable[AirbyteMessage]
+        self,
+        config: Mapping[str, Any],
+        configured_catalog: ConfiguredAirbyteCatalog,
+        input_messages: Iterable[Union[AirbyteMessage, RecordBatch]],
     ) -> Iterable[AirbyteMessage]:
-        """Implement to define how the connector writes data to the destination"""
+        """
+        Implement to define how the connector writes data to the destination.
+        :param input_messages: the messages read from the input. If batch_input_records is set, records are received in RecordBatches,
+        and every STATE message follows the batches of the records it acknowledges.
+        """
 
     def _run_check(self, config: Mapping[str, Any]) -> AirbyteMessage:
         check_result = self.check(logger, config)
         return AirbyteMessage(type=Type.CONNECTION_STATUS, connectionStatus=check_result)
 
-    def _parse_input_stream(self, input_stream: io.TextIOWrapper) -> Iterable[AirbyteMessage]:
-        """Reads from stdin, converting to Airbyte messages"""
-        for line in input_stream:
-            try:
-                yield AirbyteMessage.parse_raw(line)
-            except ValidationError:
-                logger.info(f"ignoring input which can't be deserialized as Airbyte Message: {line}")
+    def _parse_input_stream(self, input_stream: io.TextIOWrapper) -> Iterable[Union[AirbyteMessage, RecordBatch]]:
+        """Reads from stdin on a reader thread, converting to Airbyte messages, see parse_input_messages"""
+        yield from parse_input_messages(input_stream, group_records=self.batch_input_records, batch_size=self.input_batch_size)
 
     def _run_write(
         self, config: Mapping[str, Any], configured_catalog_path: str, input_stream: io.TextIOWrapper
@@ -105,5 +114,7 @@ class Destination(Connector, ABC):
     def run(self, args: List[str]):
         parsed_args = self.parse_args(args)
         output_messages = self.run_cmd(parsed_args)
-        for message in output_messages:
-            print(message.json(exclude_unset=True))
+        with OutputSink(sys.stdout) as sink:
+            for message in output_messages:
+                # STATE messages acknowledge the records persisted so far and are flushed right away
+                sink.write_message(message.json(exclude_unset=True), flush=message.type == Type.STATE)
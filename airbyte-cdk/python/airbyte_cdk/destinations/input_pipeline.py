@@ -0,0 +1,148 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from airbyte_cdk.models import AirbyteMessage, AirbyteRecordMessage, Type
+from airbyte_cdk.sources.utils.concurrency import prefetch
+from pydantic import ValidationError
+
+logger = logging.getLogger("airbyte")
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class RecordBatch:
+    """Records of a stream handed to Destination.write at once in place of their messages, in the order they were read"""
+
+    stream: str
+    namespace: Optional[str]
+    records: List[AirbyteRecordMessage]
+
+    def messages(self) -> Iterator[AirbyteMessage]:
+        for record in self.records:
+            yield AirbyteMessage(type=Type.RECORD, record=record)
+
+
+def parse_input_messages(
+    input_stream: TextIO,
+    group_records: bool = False,
+    batch_size: int = 1000,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    prefetch_depth: int = 4,
+) -> Iterator[Union[AirbyteMessage, RecordBatch]]:
+    """
+    Parse the messages of the input of a destination on a reader thread, ahead of the writer consuming them.
+
+    The input is read in chunks of up to chunk_size bytes and decoded with the JSON decoder of the standard library. Records with the
+    fields of a valid record message are built without being validated by pydantic, which only validates the other messages. Lines
+    which aren't valid messages are logged and ignored.
+
+    If group_records is set, the records of each stream are grouped in RecordBatches of up to batch_size records. Every other message,
+    e.g: STATE, is a barrier: the records read before it are handed over before it, so a state message still follows all the records
+    it acknowledges. Records of different streams between two barriers may be reordered, records of the same stream never are.
+
+    :param input_stream: the input to read messages from, read from its binary buffer when it has one
+    :param group_records: hand the records over in RecordBatches instead of one message per record
+    :param batch_size: maximum number of records of a RecordBatch
+    :param chunk_size: maximum number of bytes read from the input at once
+    :param prefetch_depth: maximum number of chunks parsed but not consumed yet
+    """
+    blocks = _parse_blocks(input_stream, group_records, batch_size, chunk_size)
+    for block in prefetch(blocks, depth=prefetch_depth):
+        yield from block
+
+
+def _parse_blocks(
+    input_stream: TextIO, group_records: bool, batch_size: int, chunk_size: int
+) -> Iterator[List[Union[AirbyteMessage, RecordBatch]]]:
+    pending: Dict[Tuple[Optional[str], str], List[AirbyteRecordMessage]] = {}
+    for lines in _read_lines(input_stream, chunk_size):
+        block: List[Union[AirbyteMessage, RecordBatch]] = []
+        for line in lines:
+            message = _parse_message(line)
+            if message is None:
+                continue
+            if not group_records:
+                block.append(message)
+            elif message.type == Type.RECORD and message.record is not None:
+                record = message.record
+                key = (record.namespace, record.stream)
+                records = pending.setdefault(key, [])
+                records.append(record)
+                if len(records) >= batch_size:
+                    block.append(RecordBatch(record.stream, record.namespace, pending.pop(key)))
+            else:
+                block.extend(_batches(pending))
+                pending = {}
+                block.append(message)
+        if block:
+            yield block
+    if pending:
+        yield list(_batches(pending))
+
+
+def _batches(pending: Dict[Tuple[Optional[str], str], List[AirbyteRecordMessage]]) -> Iterator[RecordBatch]:
+    for (namespace, stream), records in pending.items():
+        yield RecordBatch(stream, namespace, records)
+
+
+def _read_lines(input_stream: TextIO, chunk_size: int) -> Iterator[Sequence[Union[str, bytes]]]:
+    """Lines of the input, a chunk at a time"""
+    buffer = getattr(input_stream, "buffer", None)
+    if buffer is None or not hasattr(buffer, "read1"):
+        # Text streams without a binary buffer, e.g: io.StringIO
+        text_lines: List[str] = []
+        for line in input_stream:
+            text_lines.append(line)
+            if len(text_lines) >= 1000:
+                yield text_lines
+                text_lines = []
+        if text_lines:
+            yield text_lines
+        return
+
+    remainder: bytes = b""
+    while True:
+        # read1 returns the bytes available rather than waiting for a full chunk, so messages aren't held back by a slow input
+        chunk: bytes = buffer.read1(chunk_size)
+        if not chunk:
+            break
+        lines: List[bytes] = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        if lines:
+            yield lines
+    if remainder:
+        yield [remainder]
+
+
+def _parse_message(line: Union[str, bytes]) -> Optional[AirbyteMessage]:
+    if not line.strip():
+        return None
+    try:
+        message = json.loads(line)
+        record = message.get("record") if isinstance(message, dict) and message.get("type") == Type.RECORD.value else None
+        if record is not None and _is_valid_record(record):
+            return AirbyteMessage.construct(type=Type.RECORD, record=AirbyteRecordMessage.construct(**record))
+        return AirbyteMessage.parse_obj(message)
+    except (json.JSONDecodeError, ValidationError):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        logger.info(f"ignoring input which can't be deserialized as Airbyte Message: {line}")
+        return None
+
+
+def _is_valid_record(record: Any) -> bool:
+    """Whether a record has the fields of a valid record message, in which case validating it with pydantic wouldn't change it"""
+    return (
+        isinstance(record, dict)
+        and isinstance(record.get("stream"), str)
+        and isinstance(record.get("data"), dict)
+        and type(record.get("emitted_at")) is int
+        and isinstance(record.get("namespace", ""), (str, type(None)))
+    )
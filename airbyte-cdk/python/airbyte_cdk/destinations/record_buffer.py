@@ -0,0 +1,194 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from airbyte_cdk.destinations.input_pipeline import RecordBatch
+from airbyte_cdk.models import AirbyteMessage, AirbyteRecordMessage, Type
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+# Streams are identified by their namespace and name
+_StreamKey = Tuple[Optional[str], str]
+
+
+class _StreamBuffer:
+    def __init__(self, first_sequence: int):
+        self.records: List[AirbyteRecordMessage] = []
+        self.size = 0
+        # Sequence number of the first record buffered, records are numbered in the order they are received across streams
+        self.first_sequence = first_sequence
+        self.started = time.monotonic()
+
+
+class RecordBuffer:
+    """
+    Buffers the records received by a destination per stream and flushes them in batches, so destinations only implement how a batch
+    of records is persisted.
+
+    The records of a stream are flushed once the stream buffers max_records records, max_bytes bytes of record data serialized as
+    JSON, or records received more than max_seconds ago. Flushes run on up to max_concurrent_flushes worker threads while the next
+    records are buffered, and the flushes of a stream run one after another in the order its records were received. Buffering waits
+    for a worker once max_concurrent_flushes flushes are in flight, which bounds the memory used.
+
+    STATE messages are only acknowledged, i.e: yielded by write, once every record received before them was flushed. A failed flush
+    is raised by write, after which no STATE message is acknowledged anymore.
+
+        def write(self, config, configured_catalog, input_messages):
+            buffer = RecordBuffer(lambda batch: client.insert(batch.stream, [record.data for record in batch.records]))
+            yield from buffer.write(input_messages)
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[RecordBatch], Any],
+        max_records: Optional[int] = 1000,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        max_seconds: Optional[float] = None,
+        max_concurrent_flushes: int = 1,
+    ):
+        """
+        :param flush: persists a batch of records of a stream, called from a worker thread
+        :param max_records: number of records of a stream which triggers a flush, None for no limit
+        :param max_bytes: number of bytes of records of a stream which triggers a flush, None for no limit
+        :param max_seconds: number of seconds the records of a stream stay buffered at most, checked when messages are received,
+        None for no limit
+        :param max_concurrent_flushes: maximum number of flushes in flight
+        """
+        self._flush = flush
+        self._max_records = max_records
+        self._max_bytes = max_bytes
+        self._max_seconds = max_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_flushes, thread_name_prefix="record-buffer-flush")
+        self._flush_permits = threading.Semaphore(max_concurrent_flushes)
+        self._buffers: Dict[_StreamKey, _StreamBuffer] = {}
+        self._sequence = 0
+        # Flushes in flight with the sequence number of their first record, and the last flush submitted for each stream
+        self._in_flight: Dict[Future, int] = {}
+        self._last_flushes: Dict[_StreamKey, Future] = {}
+        # STATE messages waiting for the records received before them, with the number of records received before them
+        self._states: Deque[Tuple[int, AirbyteMessage]] = deque()
+        self._lock = threading.Lock()
+        self._metrics = {"flushes": 0, "flushed_records": 0, "flushed_bytes": 0, "flush_seconds": 0.0}
+
+    @property
+    def metrics(self) -> Mapping[str, Any]:
+        """
+        Number of flushes, of records and bytes flushed, and seconds spent flushing, plus the records and bytes still buffered. Bytes
+        are only measured if max_bytes is set.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        buffers = list(self._buffers.values())
+        return {
+            **metrics,
+            "buffered_records": sum(len(buffer.records) for buffer in buffers),
+            "buffered_bytes": sum(buffer.size for buffer in buffers),
+        }
+
+    def write(self, input_messages: Iterable[Union[AirbyteMessage, RecordBatch]]) -> Iterator[AirbyteMessage]:
+        """
+        Buffer the records of the input messages, and yield the STATE messages once the records received before them are flushed.
+        Every record is flushed once the input is consumed. Other messages are ignored.
+        """
+        try:
+            for message in input_messages:
+                if isinstance(message, RecordBatch):
+                    for record in message.records:
+                        self.add(record)
+                elif message.type == Type.RECORD and message.record is not None:
+                    self.add(message.record)
+                elif message.type == Type.STATE:
+                    self.add_state(message)
+                yield from self.acknowledged_states()
+            self.flush_all()
+            yield from self.acknowledged_states()
+        finally:
+            self.close()
+
+    def add(self, record: AirbyteRecordMessage):
+        """Buffer a record, flushing its stream if it reaches a threshold"""
+        key = (record.namespace, record.stream)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = _StreamBuffer(self._sequence)
+        self._sequence += 1
+        buffer.records.append(record)
+        if self._max_bytes is not None:
+            buffer.size += len(json.dumps(record.data, default=str))
+        if (self._max_records is not None and len(buffer.records) >= self._max_records) or (
+            self._max_bytes is not None and buffer.size >= self._max_bytes
+        ):
+            self._submit(key)
+        self._flush_expired()
+
+    def add_state(self, message: AirbyteMessage):
+        """Acknowledge a STATE message once the records received before it are flushed, see acknowledged_states"""
+        self._states.append((self._sequence, message))
+        self._flush_expired()
+
+    def acknowledged_states(self) -> List[AirbyteMessage]:
+        """The STATE messages whose records were all flushed since the last call, in order. Raises the error of a failed flush."""
+        oldest_pending = min((buffer.first_sequence for buffer in self._buffers.values()), default=self._sequence)
+        for future, first_sequence in list(self._in_flight.items()):
+            if not future.done():
+                oldest_pending = min(oldest_pending, first_sequence)
+                continue
+            del self._in_flight[future]
+            future.result()
+        acknowledged = []
+        while self._states and self._states[0][0] <= oldest_pending:
+            acknowledged.append(self._states.popleft()[1])
+        return acknowledged
+
+    def flush_all(self):
+        """Flush every stream and wait for the flushes to complete"""
+        for key in list(self._buffers):
+            self._submit(key)
+        for future in list(self._in_flight):
+            future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def _flush_expired(self):
+        if self._max_seconds is None:
+            return
+        now = time.monotonic()
+        for key, buffer in list(self._buffers.items()):
+            if now - buffer.started >= self._max_seconds:
+                self._submit(key)
+
+    def _submit(self, key: _StreamKey):
+        buffer = self._buffers.pop(key)
+        # The flushes of a stream run in order, the previous one must complete before the next one starts
+        previous = self._last_flushes.get(key)
+        if previous is not None:
+            previous.result()
+        self._flush_permits.acquire()
+        batch = RecordBatch(key[1], key[0], buffer.records)
+        try:
+            future = self._executor.submit(self._run_flush, batch, buffer.size)
+        except BaseException:
+            self._flush_permits.release()
+            raise
+        self._in_flight[future] = buffer.first_sequence
+        self._last_flushes[key] = future
+
+    def _run_flush(self, batch: RecordBatch, size: int):
+        try:
+            started = time.monotonic()
+            self._flush(batch)
+            with self._lock:
+                self._metrics["flushes"] += 1
+                self._metrics["flushed_records"] += len(batch.records)
+                self._metrics["flushed_bytes"] += size
+                self._metrics["flush_seconds"] += time.monotonic() - started
+        finally:
+            self._flush_permits.release()
@@ -18,6 +18,8 @@ from airbyte_cdk.models.airbyte_protocol import ConnectorSpecification
 from airbyte_cdk.sources import Source
 from airbyte_cdk.sources.utils.schema_helpers import check_config_against_spec_or_exit, split_config
 from airbyte_cdk.utils.airbyte_secrets_utils import get_secrets, update_secrets
+from airbyte_cdk.utils.message_serialization import airbyte_message_to_string
+from airbyte_cdk.utils.output_sink import OutputSink
 
 logger = init_logger("airbyte")
 init_uncaught_exception_handler(logger)
@@ -64,6 +66,11 @@ class AirbyteEntrypoint(object):
         return main_parser.parse_args(args)
 
     def run(self, parsed_args: argparse.Namespace) -> Iterable[str]:
+        for message in self.run_messages(parsed_args):
+            yield airbyte_message_to_string(message)
+
+    def run_messages(self, parsed_args: argparse.Namespace) -> Iterable[AirbyteMessage]:
+        """Same as run but outputs the messages before they are serialized"""
         cmd = parsed_args.command
         if not cmd:
             raise Exception("No command passed")
@@ -78,8 +85,7 @@ class AirbyteEntrypoint(object):
         source_spec: ConnectorSpecification = self.source.spec(self.logger)
         with tempfile.TemporaryDirectory() as temp_dir:
             if cmd == "spec":
-                message = AirbyteMessage(type=Type.SPEC, spec=source_spec)
-                yield message.json(exclude_unset=True)
+                yield AirbyteMessage(type=Type.SPEC, spec=source_spec)
             else:
                 raw_config = self.source.read_config(parsed_args.config)
                 config = self.source.configure(raw_config, temp_dir)
@@ -102,17 +108,14 @@ class AirbyteEntrypoint(object):
                     else:
                         self.logger.error("Check failed")
 
-                    output_message = AirbyteMessage(type=Type.CONNECTION_STATUS, connectionStatus=check_result).json(exclude_unset=True)
-                    yield output_message
+                    yield AirbyteMessage(type=Type.CONNECTION_STATUS, connectionStatus=check_result)
                 elif cmd == "discover":
                     catalog = self.source.discover(self.logger, config)
-                    yield AirbyteMessage(type=Type.CATALOG, catalog=catalog).json(exclude_unset=True)
+                    yield AirbyteMessage(type=Type.CATALOG, catalog=catalog)
                 elif cmd == "read":
                     config_catalog = self.source.read_catalog(parsed_args.catalog)
                     state = self.source.read_state(parsed_args.state)
-                    generator = self.source.read(self.logger, config, config_catalog, state)
-                    for message in generator:
-                        yield message.json(exclude_unset=True)
+                    yield from self.source.read(self.logger, config, config_catalog, state)
                 else:
                     raise Exception("Unexpected command " + cmd)
 
@@ -120,8 +123,10 @@ class AirbyteEntrypoint(object):
 def launch(source: Source, args: List[str]):
     source_entrypoint = AirbyteEntrypoint(source)
     parsed_args = source_entrypoint.parse_args(args)
-    for message in source_entrypoint.run(parsed_args):
-        print(message)
+    with OutputSink(sys.stdout) as sink:
+        for message in source_entrypoint.run_messages(parsed_args):
+            # STATE messages are flushed right away so the platform can checkpoint the records written before them
+            sink.write_message(airbyte_message_to_string(message), flush=message.type == Type.STATE)
 
 
 def main():
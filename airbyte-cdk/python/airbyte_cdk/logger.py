@@ -2,17 +2,20 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
+import copy
 import json
 import logging
 import logging.config
+import threading
+import time
 import traceback
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from airbyte_cdk.models import AirbyteLogMessage, AirbyteMessage
 from airbyte_cdk.utils.airbyte_secrets_utils import filter_secrets
 from deprecated import deprecated
 
-LOGGING_CONFIG = {
+LOGGING_CONFIG: Dict[str, Any] = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
@@ -31,14 +34,34 @@ LOGGING_CONFIG = {
 }
 
 
-def init_logger(name: str = None):
-    """Initial set up of logger"""
+def init_logger(name: str = None, max_repeated_messages: Optional[int] = None, repeated_messages_interval: float = 60.0):
+    """
+    Initial set up of logger
+    :param max_repeated_messages: if set, the number of times a message below the WARNING level is output per interval by each
+    logger, see RepeatedMessageFilter
+    :param repeated_messages_interval: the interval, in seconds
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
-    logging.config.dictConfig(LOGGING_CONFIG)
+    config = LOGGING_CONFIG
+    if max_repeated_messages is not None:
+        config = copy.deepcopy(LOGGING_CONFIG)
+        config["filters"] = {
+            "repeated_messages": {
+                "()": "airbyte_cdk.logger.RepeatedMessageFilter",
+                "max_messages": max_repeated_messages,
+                "interval": repeated_messages_interval,
+            }
+        }
+        config["handlers"]["console"]["filters"] = ["repeated_messages"]
+    logging.config.dictConfig(config)
     return logger
 
 
+# Attributes of every log record, any other attribute was passed through extra
+_DEFAULT_RECORD_ATTRIBUTES = frozenset(logging.LogRecord("", 0, "", 0, None, None, None).__dict__.keys())
+
+
 class AirbyteLogFormatter(logging.Formatter):
     """Output log records using AirbyteMessage"""
 
@@ -61,20 +84,66 @@ class AirbyteLogFormatter(logging.Formatter):
         else:
             message = super().format(record)
             message = filter_secrets(message)
-            log_message = AirbyteMessage(type="LOG", log=AirbyteLogMessage(level=airbyte_level, message=message))
-            return log_message.json(exclude_unset=True)
+            # Same output as AirbyteMessage(type="LOG", log=AirbyteLogMessage(...)).json(exclude_unset=True), without building the models
+            return json.dumps({"type": "LOG", "log": {"level": airbyte_level, "message": message}})
 
     @staticmethod
     def extract_extra_args_from_record(record: logging.LogRecord):
         """
-        The python logger conflates default args with extra args. We use an empty log record and set operations
+        The python logger conflates default args with extra args. We use the attributes of an empty log record and set operations
         to isolate fields passed to the log record via extra by the developer.
         """
-        default_attrs = logging.LogRecord("", 0, "", 0, None, None, None).__dict__.keys()
-        extra_keys = set(record.__dict__.keys()) - default_attrs
+        extra_keys = record.__dict__.keys() - _DEFAULT_RECORD_ATTRIBUTES
         return {k: str(getattr(record, k)) for k in extra_keys if hasattr(record, k)}
 
 
+class RepeatedMessageFilter(logging.Filter):
+    """
+    Output a message logged below the WARNING level at most max_messages times per interval seconds by each logger, so connectors
+    logging for every page or record don't spend their time formatting logs. Messages are told apart by their format string, e.g:
+    logger.info("Read page %s", page) is one repeated message whatever the page.
+
+    The first message output once an interval ends mentions how many were dropped during the interval.
+    """
+
+    # Past this number of messages tracked, the ones whose interval ended are forgotten
+    _MAX_TRACKED_MESSAGES = 1000
+
+    def __init__(self, max_messages: int, interval: float = 60.0):
+        super().__init__()
+        self._max_messages = max_messages
+        self._interval = interval
+        self._lock = threading.Lock()
+        # (logger name, level, format string) -> [interval start, messages output, messages dropped]
+        self._messages: Dict[Tuple[str, int, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            message = self._messages.get(key)
+            if message is None or now - message[0] >= self._interval:
+                dropped = message[2] if message else 0
+                if message is None and len(self._messages) >= self._MAX_TRACKED_MESSAGES:
+                    self._forget_expired(now)
+                self._messages[key] = [now, 1, 0]
+            elif message[1] < self._max_messages:
+                message[1] += 1
+                return True
+            else:
+                message[2] += 1
+                return False
+        if dropped:
+            record.msg = f"{record.getMessage()} ({dropped} similar messages dropped)"
+            record.args = None
+        return True
+
+    def _forget_expired(self, now: float):
+        self._messages = {key: message for key, message in self._messages.items() if now - message[0] < self._interval}
+
+
 def log_by_prefix(msg: str, default_level: str) -> Tuple[int, str]:
     """Custom method, which takes log level from first word of message"""
     valid_log_types = ["FATAL", "ERROR", "WARN", "INFO", "DEBUG", "TRACE"]
@@ -4,30 +4,43 @@
 
 
 import copy
+import functools
+import json
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
 from functools import lru_cache
-from typing import Any, Dict, Iterator, List, Mapping, MutableMapping, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Tuple
 
 from airbyte_cdk.models import (
     AirbyteCatalog,
     AirbyteConnectionStatus,
     AirbyteMessage,
     AirbyteRecordMessage,
+    AirbyteStateBlob,
     AirbyteStateMessage,
+    AirbyteStateType,
+    AirbyteStreamState,
     ConfiguredAirbyteCatalog,
     ConfiguredAirbyteStream,
     Status,
+    StreamDescriptor,
     SyncMode,
 )
 from airbyte_cdk.models import Type as MessageType
 from airbyte_cdk.sources.source import Source
-from airbyte_cdk.sources.streams import Stream
+from airbyte_cdk.sources.streams import CheckpointPolicy, Stream
 from airbyte_cdk.sources.streams.http.http import HttpStream
+from airbyte_cdk.sources.streams.http.metrics import HttpMetrics
+from airbyte_cdk.sources.streams.http.requests_native_auth.token_manager import OAuthTokenManager
+from airbyte_cdk.sources.utils.concurrency import interleave, ordered
+from airbyte_cdk.sources.utils.parent_records import ParentRecordStore
 from airbyte_cdk.sources.utils.schema_helpers import InternalConfig, split_config
 from airbyte_cdk.sources.utils.transform import TypeTransformer
-from airbyte_cdk.utils.event_timing import create_timer
+from airbyte_cdk.utils.event_timing import EventTimer, create_timer
+from airbyte_cdk.utils.message_serialization import airbyte_message_to_string
 from airbyte_cdk.utils.traced_exception import AirbyteTracedException
 
 
@@ -61,6 +74,12 @@ class AbstractSource(Source, ABC):
     # Stream name to instance map for applying output object transformation
     _stream_to_instance_map: Dict[str, Stream] = {}
 
+    # Guards the connector state shared by the streams when they are read concurrently
+    _checkpoint_lock = threading.Lock()
+
+    # Serialized state of each stream as of its last per-stream STATE message
+    _checkpointed_states: Dict[str, str] = {}
+
     @property
     def name(self) -> str:
         """Source name"""
@@ -94,45 +113,126 @@ class AbstractSource(Source, ABC):
         state: MutableMapping[str, Any] = None,
     ) -> Iterator[AirbyteMessage]:
         """Implements the Read operation from the Airbyte Specification. See https://docs.airbyte.io/architecture/airbyte-protocol."""
-        connector_state = copy.deepcopy(state or {})
+        # Only the state of the streams read is copied, by _read_incremental
+        connector_state = dict(state or {})
+        self._checkpointed_states = {}
         logger.info(f"Starting syncing {self.name}")
         config, internal_config = split_config(config)
         # TODO assert all streams exist in the connector
         # get the streams once in case the connector needs to make any queries to generate them
         stream_instances = {s.name: s for s in self.streams(config)}
         self._stream_to_instance_map = stream_instances
-        with create_timer(self.name) as timer:
-            for configured_stream in catalog.streams:
-                stream_instance = stream_instances.get(configured_stream.stream.name)
-                if not stream_instance:
-                    raise KeyError(
-                        f"The requested stream {configured_stream.stream.name} was not found in the source."
-                        f" Available streams: {stream_instances.keys()}"
-                    )
-                try:
-                    timer.start_event(f"Syncing stream {configured_stream.stream.name}")
-                    yield from self._read_stream(
-                        logger=logger,
-                        stream_instance=stream_instance,
-                        configured_stream=configured_stream,
-                        connector_state=connector_state,
-                        internal_config=internal_config,
-                    )
-                except AirbyteTracedException as e:
-                    raise e
-                except Exception as e:
-                    logger.exception(f"Encountered an exception while reading stream {configured_stream.stream.name}")
-                    display_message = stream_instance.get_error_display_message(e)
-                    if display_message:
-                        raise AirbyteTracedException.from_exception(e, message=display_message) from e
-                    raise e
-                finally:
-                    timer.finish_event()
-                    logger.info(f"Finished syncing {configured_stream.stream.name}")
-                    logger.info(timer.report())
+        # The parent records stored for the substreams and the OAuth tokens shared during the sync are dropped once it ends
+        with create_timer(self.name) as timer, ParentRecordStore.default().sync(), OAuthTokenManager.sync():
+            stream_readers = [
+                functools.partial(
+                    self._read_configured_stream,
+                    logger=logger,
+                    timer=timer,
+                    stream_instances=stream_instances,
+                    configured_stream=configured_stream,
+                    connector_state=connector_state,
+                    internal_config=internal_config,
+                )
+                for configured_stream in catalog.streams
+            ]
+            try:
+                if self.max_concurrent_streams > 1 and len(stream_readers) > 1:
+                    logger.info(f"Syncing up to {self.max_concurrent_streams} streams concurrently")
+                    yield from interleave(stream_readers, max_workers=self.max_concurrent_streams)
+                else:
+                    for stream_reader in stream_readers:
+                        yield from stream_reader()
+            finally:
+                for stream_instance in stream_instances.values():
+                    if isinstance(stream_instance, HttpStream) and stream_instance.http_metrics:
+                        stream_instance.http_metrics.log_summary()
 
         logger.info(f"Finished syncing {self.name}")
 
+    @property
+    def max_concurrent_streams(self) -> int:
+        """
+        Override to sync several streams at the same time. Each configured stream is then read on its own worker thread and
+        the messages of all streams are merged into the output as they are produced, so the records and STATE messages of a
+        given stream keep their relative order.
+
+        Streams must not share mutable state other than the connector state managed by the source when this is enabled.
+        :return: The maximum number of streams read at the same time, 1 means streams are read one after another.
+        """
+        return 1
+
+    @property
+    def per_stream_state(self) -> bool:
+        """
+        Override to emit per-stream STATE messages. Each checkpoint then only holds the state of the stream checkpointed, and is only
+        emitted if that state changed since the previous checkpoint of the stream, instead of holding the state of every stream.
+        Only STREAM STATE messages are emitted then, the platform must keep the state of each stream.
+        """
+        return False
+
+    @property
+    def checkpoint_policy(self) -> CheckpointPolicy:
+        """
+        Default checkpoint policy of the streams which don't define their own, state is checkpointed after every slice by default.
+        Override if needed.
+        """
+        return CheckpointPolicy()
+
+    @property
+    def collect_http_metrics(self) -> bool:
+        """
+        Override to collect the metrics of the requests sent by the HTTP streams: latencies, status codes, bytes transferred, retries,
+        time spent backing off and pages per slice. They are logged every http_metrics_interval seconds and summarized for each
+        stream at the end of the sync.
+        """
+        return False
+
+    @property
+    def http_metrics_interval(self) -> Optional[float]:
+        """
+        Override if needed. Number of seconds between two logs of the HTTP metrics of a stream, None to only log their summary.
+        """
+        return 60.0
+
+    def _read_configured_stream(
+        self,
+        logger: logging.Logger,
+        timer: EventTimer,
+        stream_instances: Mapping[str, Stream],
+        configured_stream: ConfiguredAirbyteStream,
+        connector_state: MutableMapping[str, Any],
+        internal_config: InternalConfig,
+    ) -> Iterator[AirbyteMessage]:
+        stream_instance = stream_instances.get(configured_stream.stream.name)
+        if not stream_instance:
+            raise KeyError(
+                f"The requested stream {configured_stream.stream.name} was not found in the source."
+                f" Available streams: {stream_instances.keys()}"
+            )
+        event_name = f"Syncing stream {configured_stream.stream.name}"
+        try:
+            timer.start_event(event_name)
+            yield from self._read_stream(
+                logger=logger,
+                stream_instance=stream_instance,
+                configured_stream=configured_stream,
+                connector_state=connector_state,
+                internal_config=internal_config,
+            )
+        except AirbyteTracedException as e:
+            raise e
+        except Exception as e:
+            logger.exception(f"Encountered an exception while reading stream {configured_stream.stream.name}")
+            display_message = stream_instance.get_error_display_message(e)
+            if display_message:
+                raise AirbyteTracedException.from_exception(e, message=display_message) from e
+            raise e
+        finally:
+            timer.finish_event(event_name)
+            logger.info(f"Finished syncing {configured_stream.stream.name}")
+            logger.info(timer.report())
+
     def _read_stream(
         self,
         logger: logging.Logger,
@@ -145,6 +245,8 @@ class AbstractSource(Source, ABC):
         if internal_config.page_size and isinstance(stream_instance, HttpStream):
             logger.info(f"Setting page size for {stream_instance.name} to {internal_config.page_size}")
             stream_instance.page_size = internal_config.page_size
+        if self.collect_http_metrics and isinstance(stream_instance, HttpStream):
+            stream_instance.http_metrics = HttpMetrics(stream_instance.name, logger, interval=self.http_metrics_interval)
 
         logger.debug(
             f"Syncing stream: {configured_stream.stream.name}",
@@ -208,7 +310,8 @@ class AbstractSource(Source, ABC):
         :return:
         """
         stream_name = configured_stream.stream.name
-        stream_state = connector_state.get(stream_name, {})
+        # Streams may update their state in place, the state passed to read() is left untouched
+        stream_state = copy.deepcopy(connector_state.get(stream_name, {}))
         if stream_state and "state" in dir(stream_instance):
             stream_instance.state = stream_state
             logger.info(f"Setting state of {stream_name} stream to {stream_state}")
@@ -219,21 +322,64 @@ class AbstractSource(Source, ABC):
             stream_state=stream_state,
         )
         logger.debug(f"Processing stream slices for {stream_name}", extra={"stream_slices": slices})
-        total_records_counter = 0
-        for _slice in slices:
-            logger.debug("Processing stream slice", extra={"slice": _slice})
-            records = stream_instance.read_records(
+        tracker = stream_instance.cursor_tracker
+        read_concurrently = stream_instance.max_concurrent_slices > 1
+        if read_concurrently and tracker is None and not self._computes_state_from_records(stream_instance):
+            # The state checkpointed after each slice is computed from the emitted records, the state kept by the stream may be ahead
+            logger.warning(
+                f"Reading the slices of {stream_name} one after another: reading them concurrently in incremental mode requires "
+                "the stream to implement get_updated_state or to define a cursor_tracker"
+            )
+            read_concurrently = False
+        if read_concurrently:
+            # Slices are read with the state the sync started from since records of the previous slices may not be read yet
+            slices_records = self._read_slices_concurrently(
+                stream_instance,
+                slices,
                 sync_mode=SyncMode.incremental,
-                stream_slice=_slice,
                 stream_state=stream_state,
                 cursor_field=configured_stream.cursor_field or None,
             )
-            for record_counter, record_data in enumerate(records, start=1):
-                yield self._as_airbyte_record(stream_name, record_data)
-                stream_state = stream_instance.get_updated_state(stream_state, record_data)
-                checkpoint_interval = stream_instance.state_checkpoint_interval
-                if checkpoint_interval and record_counter % checkpoint_interval == 0:
-                    yield self._checkpoint_state(stream_instance, stream_state, connector_state)
+        else:
+            # stream_state is evaluated lazily so each slice is read with the state updated by the records of the previous slices
+            slices_records = (
+                (
+                    _slice,
+                    stream_instance.read_records(
+                        sync_mode=SyncMode.incremental,
+                        stream_slice=_slice,
+                        stream_state=stream_state,
+                        cursor_field=configured_stream.cursor_field or None,
+                    ),
+                )
+                for _slice in slices
+            )
+        policy = stream_instance.checkpoint_policy or self.checkpoint_policy
+        # The size of the records and the time elapsed are only measured for the policies which need them
+        measures_records, measures_time = policy.measures_records, policy.measures_time
+        # The state computed from the emitted records is checkpointed rather than the state kept by the stream when it may be ahead of them
+        from_emitted_records = read_concurrently or tracker is not None
+        total_records_counter = 0
+        records_counter, records_size, last_checkpoint = 0, 0, time.monotonic()
+        for _slice, records in slices_records:
+            logger.debug("Processing stream slice", extra={"slice": _slice})
+            for record_data in records:
+                record_message = self._as_airbyte_record(stream_name, record_data)
+                if measures_records:
+                    # The record is measured as it is output
+                    records_size += len(airbyte_message_to_string(record_message))
+                yield record_message
+                if tracker:
+                    tracker.observe(record_data)
+                else:
+                    stream_state = stream_instance.get_updated_state(stream_state, record_data)
+                records_counter += 1
+                elapsed = time.monotonic() - last_checkpoint if measures_time else 0.0
+                if policy.should_checkpoint(records_counter, records_size, elapsed):
+                    if tracker:
+                        stream_state = tracker.get_updated_state(stream_state)
+                    yield from self._checkpoint_state(stream_instance, stream_state, connector_state, from_emitted_records)
+                    records_counter, records_size, last_checkpoint = 0, 0, time.monotonic()
 
                 total_records_counter += 1
                 # This functionality should ideally live outside of this method
@@ -243,10 +389,20 @@ class AbstractSource(Source, ABC):
                     # Break from slice loop to save state and exit from _read_incremental function.
                     break
 
-            yield self._checkpoint_state(stream_instance, stream_state, connector_state)
-            if self._limit_reached(internal_config, total_records_counter):
+            if tracker:
+                # The next slice is read with the state updated by the records of this one
+                stream_state = tracker.get_updated_state(stream_state)
+            limit_reached = self._limit_reached(internal_config, total_records_counter)
+            if policy.on_slices or limit_reached:
+                yield from self._checkpoint_state(stream_instance, stream_state, connector_state, from_emitted_records)
+                records_counter, records_size, last_checkpoint = 0, 0, time.monotonic()
+            if limit_reached:
                 return
 
+        if read_concurrently or not policy.on_slices:
+            # Every slice is read, so the state kept by the stream itself only accounts for emitted records even if read concurrently
+            yield from self._checkpoint_state(stream_instance, stream_state, connector_state, tracker is not None)
+
     def _read_full_refresh(
         self,
         logger: logging.Logger,
@@ -256,27 +412,91 @@ class AbstractSource(Source, ABC):
     ) -> Iterator[AirbyteMessage]:
         slices = stream_instance.stream_slices(sync_mode=SyncMode.full_refresh, cursor_field=configured_stream.cursor_field)
         logger.debug(f"Processing stream slices for {configured_stream.stream.name}", extra={"stream_slices": slices})
+        sync_mode, cursor_field = SyncMode.full_refresh, configured_stream.cursor_field
+        slices_records: Iterable[Tuple[Optional[Mapping[str, Any]], Iterable[Mapping[str, Any]]]]
+        if stream_instance.max_concurrent_slices > 1:
+            slices_records = self._read_slices_concurrently(stream_instance, slices, sync_mode=sync_mode, cursor_field=cursor_field)
+        else:
+            slices_records = (
+                (_slice, stream_instance.read_records(sync_mode=sync_mode, cursor_field=cursor_field, stream_slice=_slice))
+                for _slice in slices
+            )
         total_records_counter = 0
-        for _slice in slices:
+        for _slice, records in slices_records:
             logger.debug("Processing stream slice", extra={"slice": _slice})
-            records = stream_instance.read_records(
-                stream_slice=_slice,
-                sync_mode=SyncMode.full_refresh,
-                cursor_field=configured_stream.cursor_field,
-            )
             for record in records:
                 yield self._as_airbyte_record(configured_stream.stream.name, record)
                 total_records_counter += 1
                 if self._limit_reached(internal_config, total_records_counter):
                     return
 
-    def _checkpoint_state(self, stream, stream_state, connector_state):
-        try:
-            connector_state[stream.name] = stream.state
-        except AttributeError:
-            connector_state[stream.name] = stream_state
+    @staticmethod
+    def _computes_state_from_records(stream_instance: Stream) -> bool:
+        """Whether the stream overrides get_updated_state, the default implementation returns an empty state"""
+        defining_class = next(cls for cls in type(stream_instance).__mro__ if "get_updated_state" in vars(cls))
+        return defining_class is not Stream
+
+    @staticmethod
+    def _read_slices_concurrently(
+        stream_instance: Stream,
+        slices: Iterable[Optional[Mapping[str, Any]]],
+        sync_mode: SyncMode,
+        cursor_field: Optional[List[str]] = None,
+        stream_state: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Tuple[Optional[Mapping[str, Any]], Iterable[Mapping[str, Any]]]]:
+        """
+        Read up to stream_instance.max_concurrent_slices slices at the same time.
+        :return: each slice with an iterator over its records, in slice order, so the slices before a given one are always fully read
+        """
+
+        def read_slice(_slice: Optional[Mapping[str, Any]]) -> Iterable[Mapping[str, Any]]:
+            return stream_instance.read_records(
+                sync_mode=sync_mode, cursor_field=cursor_field, stream_slice=_slice, stream_state=stream_state
+            )
+
+        return ordered(slices, read_slice, max_workers=stream_instance.max_concurrent_slices)
+
+    def _checkpoint_state(self, stream, stream_state, connector_state, from_emitted_records: bool = False) -> Iterator[AirbyteMessage]:
+        """
+        Yield the STATE message checkpointing the state of the stream, unless per-stream state is emitted and the state of the stream
+        didn't change since its previous checkpoint.
+        :param from_emitted_records: True to checkpoint stream_state, computed from the emitted records, rather than the state kept by the
+        stream itself, e.g: while later slices of the stream are read concurrently, since it may then include records which were not
+        emitted yet, or when the state is computed by the CursorTracker of the stream.
+        """
+        if not from_emitted_records:
+            try:
+                stream_state = stream.state
+            except AttributeError:
+                pass
 
-        return AirbyteMessage(type=MessageType.STATE, state=AirbyteStateMessage(data=connector_state))
+        # The state is copied so the message is not affected by a stream which keeps updating its state in place before the
+        # message is written out, which happens when streams are read concurrently.
+        per_stream_state = self.per_stream_state
+        with self._checkpoint_lock:
+            stream_state = copy.deepcopy(stream_state)
+            connector_state[stream.name] = stream_state
+            if not per_stream_state:
+                # Other streams keep checkpointing into connector_state once the lock is released, the message holds a snapshot of it.
+                # The state of each stream is replaced by a new copy on every checkpoint rather than updated, so a shallow copy is enough.
+                connector_state_snapshot = dict(connector_state)
+            else:
+                serialized_state = json.dumps(stream_state, sort_keys=True, default=str)
+                if self._checkpointed_states.get(stream.name) == serialized_state:
+                    return
+                self._checkpointed_states[stream.name] = serialized_state
+        if not per_stream_state:
+            yield AirbyteMessage(type=MessageType.STATE, state=AirbyteStateMessage(data=connector_state_snapshot))
+            return
+        yield AirbyteMessage(
+            type=MessageType.STATE,
+            state=AirbyteStateMessage(
+                type=AirbyteStateType.STREAM,
+                stream=AirbyteStreamState(
+                    stream_descriptor=StreamDescriptor(name=stream.name), stream_state=AirbyteStateBlob.parse_obj(stream_state)
+                ),
+            ),
+        )
 
     @lru_cache(maxsize=None)
     def _get_stream_transformer_and_schema(self, stream_name: str) -> Tuple[TypeTransformer, Mapping[str, Any]]:
@@ -298,8 +518,12 @@ class AbstractSource(Source, ABC):
         # taken unless configured. See
         # docs/connector-development/cdk-python/schemas.md for details.
         transformer.transform(data, schema)  # type: ignore
-        message = AirbyteRecordMessage(stream=stream_name, data=data, emitted_at=now_millis)
-        return AirbyteMessage(type=MessageType.RECORD, record=message)
+        # Records are built without pydantic validation: every field is already of the expected type and validating the data of
+        # each record is one of the most expensive steps of a sync. The message gets its own copy of the record, as validation would
+        # give it, so streams reusing their record dicts don't change messages which are buffered but not output yet.
+        data = dict(data)
+        message = AirbyteRecordMessage.construct(stream=stream_name, data=data, emitted_at=now_millis)
+        return AirbyteMessage.construct(type=MessageType.RECORD, record=message)
 
     @staticmethod
     def _apply_log_level_to_stream_logger(logger: logging.Logger, stream_instance: Stream):
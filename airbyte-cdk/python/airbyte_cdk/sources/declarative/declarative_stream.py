@@ -9,6 +9,7 @@ from airbyte_cdk.models import SyncMode
 from airbyte_cdk.sources.declarative.retrievers.retriever import Retriever
 from airbyte_cdk.sources.declarative.schema.schema_loader import SchemaLoader
 from airbyte_cdk.sources.declarative.transformations import RecordTransformation
+from airbyte_cdk.sources.streams.checkpoint import CheckpointPolicy
 from airbyte_cdk.sources.streams.core import Stream
 
 
@@ -26,6 +27,7 @@ class DeclarativeStream(Stream):
         cursor_field: Optional[List[str]] = None,
         transformations: List[RecordTransformation] = None,
         checkpoint_interval: Optional[int] = None,
+        checkpoint_policy: Optional[CheckpointPolicy] = None,
     ):
         """
 
@@ -36,6 +38,9 @@ class DeclarativeStream(Stream):
         :param cursor_field:
         :param transformations: A list of transformations to be applied to each output record in the stream. Transformations are applied
         in the order in which they are defined.
+        :param checkpoint_interval: number of records between two checkpoints of the state
+        :param checkpoint_policy: decides when to checkpoint the state, on records, seconds or bytes emitted and on slice boundaries.
+        Takes precedence over checkpoint_interval.
         """
         self._name = name
         self._primary_key = primary_key
@@ -44,6 +49,7 @@ class DeclarativeStream(Stream):
         self._retriever = retriever
         self._transformations = transformations or []
         self._checkpoint_interval = checkpoint_interval
+        self._checkpoint_policy = checkpoint_policy
 
     @property
     def primary_key(self) -> Optional[Union[str, List[str], List[List[str]]]]:
@@ -70,6 +76,10 @@ class DeclarativeStream(Stream):
         """
         return self._checkpoint_interval
 
+    @property
+    def checkpoint_policy(self) -> Optional[CheckpointPolicy]:
+        return self._checkpoint_policy or super().checkpoint_policy
+
     @property
     def state(self) -> MutableMapping[str, Any]:
         return self._retriever.state
@@ -97,15 +107,19 @@ class DeclarativeStream(Stream):
         stream_slice: Mapping[str, Any] = None,
         stream_state: Mapping[str, Any] = None,
     ) -> Iterable[Mapping[str, Any]]:
-        for record in self._retriever.read_records(sync_mode, cursor_field, stream_slice, stream_state):
-            yield self._apply_transformations(record)
-
-    def _apply_transformations(self, record: Mapping[str, Any]):
-        output_record = record
+        if not self._transformations:
+            yield from self._retriever.read_records(sync_mode, cursor_field, stream_slice, stream_state)
+            return
+        # Records are transformed a page at a time so the transformations can do the work common to all the records only once
+        for records in self._retriever.read_pages(sync_mode, cursor_field, stream_slice, stream_state):
+            yield from self._apply_transformations(records)
+
+    def _apply_transformations(self, records: List[Mapping[str, Any]]) -> List[Mapping[str, Any]]:
+        output_records = records
         for transformation in self._transformations:
-            output_record = transformation.transform(record)
+            output_records = transformation.transform_batch(output_records)
 
-        return output_record
+        return output_records
 
     def get_json_schema(self) -> Mapping[str, Any]:
         """
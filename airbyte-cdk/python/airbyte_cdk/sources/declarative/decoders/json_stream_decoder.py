@@ -0,0 +1,268 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import codecs
+import json
+import re
+from typing import Any, Iterator, List, Mapping, NoReturn
+
+import requests
+from airbyte_cdk.sources.declarative.decoders.decoder import Decoder
+from airbyte_cdk.sources.declarative.types import FieldPointer
+
+_WHITESPACE = re.compile(r"\s*")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(r"[^\s,\]}]+")
+_STRUCTURE = re.compile(r'[\[\]{}"]')
+_DECODER = json.JSONDecoder()
+_SEPARATOR = re.compile(r"\s*([,\]])")
+_NUMBER_DELIMITERS = frozenset(" \t\n\r,]}")
+
+
+def _whitespace_end(text: str, pos: int) -> int:
+    match = _WHITESPACE.match(text, pos)
+    # The pattern matches the empty string, so it always matches
+    assert match is not None
+    return match.end()
+
+
+class JsonStreamDecoder(Decoder):
+    """
+    Decoder reading the array of records of a JSON response while the response is downloaded, instead of loading the full body first.
+
+    Only one record is held in memory at a time on top of the chunk being read. Once the array is read, the rest of the body, without
+    the records, is kept as the content of the response so response.json() still works, e.g: to read the next page token.
+
+    The response must be requested with stream=True for the body to be downloaded while it is decoded.
+    """
+
+    def __init__(self, chunk_size: int = 64 * 1024):
+        """
+        :param chunk_size: number of bytes read from the response at a time
+        """
+        self._chunk_size = chunk_size
+
+    def decode(self, response: requests.Response) -> Mapping[str, Any]:
+        return response.json()
+
+    def decode_array(self, response: requests.Response, path: FieldPointer) -> Iterator[Any]:
+        """
+        Yield the elements of the array found at path as soon as each of them is downloaded.
+        If the value at path is an object, it is yielded as the only element. Nothing is yielded if the path doesn't exist.
+        :param path: keys of the objects leading to the array, an empty path designates the body itself
+        """
+        # requests doesn't expose whether the body was already downloaded, e.g: because the request wasn't streamed
+        already_downloaded = response._content is not False
+        raw_chunks = [response.content] if already_downloaded else response.iter_content(chunk_size=self._chunk_size)
+        encoding = response.encoding or "utf-8"
+        decoder = codecs.getincrementaldecoder(encoding)()
+        reader = _JsonReader(decoder.decode(chunk) for chunk in raw_chunks)
+        yield from reader.read_array(path)
+        reader.expect_end()
+        if not already_downloaded:
+            response._content = reader.remainder().encode(encoding)
+
+
+class _JsonReader:
+    """
+    Incremental reader of a JSON document split in chunks of text. Array elements are decoded straight from the buffered text, the rest
+    of the document is located with regular expressions so it is never scanned character by character in Python.
+    """
+
+    def __init__(self, chunks: Iterator[str]):
+        self._chunks = chunks
+        self._text = ""
+        self._pos = 0
+        self._exhausted = False
+        # The document without the elements of the array which was read
+        self._remainder: List[str] = []
+
+    def remainder(self) -> str:
+        return "".join(self._remainder)
+
+    def read_array(self, path: FieldPointer) -> Iterator[Any]:
+        self._skip_whitespace()
+        if not path:
+            yield from self._read_elements()
+            return
+        if self._peek() != "{":
+            self._remainder.append(self._read_value())
+            return
+        self._consume("{")
+        self._remainder.append("{")
+        found = False
+        self._skip_whitespace()
+        if self._peek() == "}":
+            self._consume("}")
+        else:
+            while True:
+                key = self._read_string()
+                self._remainder.append(key)
+                self._skip_whitespace()
+                self._consume(":")
+                self._remainder.append(":")
+                self._skip_whitespace()
+                if not found and json.loads(key) == path[0]:
+                    found = True
+                    yield from self.read_array(path[1:])
+                else:
+                    self._remainder.append(self._read_value())
+                self._skip_whitespace()
+                if self._peek() == "}":
+                    self._consume("}")
+                    break
+                self._consume(",")
+                self._remainder.append(",")
+                self._skip_whitespace()
+        self._remainder.append("}")
+
+    def expect_end(self):
+        self._skip_whitespace()
+        if self._peek() is not None:
+            raise ValueError(f"Unexpected data after the end of the JSON document: {self._text[self._pos:self._pos + 20]}")
+
+    def _read_elements(self) -> Iterator[Any]:
+        first = self._peek()
+        if first != "[":
+            value = self._read_value()
+            self._remainder.append(value)
+            if first == "{":
+                yield json.loads(value)
+            return
+        self._consume("[")
+        self._remainder.append("[]")
+        self._skip_whitespace()
+        if self._peek() == "]":
+            self._consume("]")
+            return
+        while True:
+            yield self._decode_value()
+            if self._read_separator() == "]":
+                return
+
+    def _decode_value(self) -> Any:
+        """Decode the next value, the buffered text is decoded directly as long as it holds the full value"""
+        self._compact()
+        while True:
+            self._pos = _whitespace_end(self._text, self._pos)
+            try:
+                value, end = _DECODER.raw_decode(self._text, self._pos)
+            except json.JSONDecodeError:
+                if self._exhausted:
+                    raise
+                self._fill(required=False)
+                continue
+            # A number cut by the end of the buffer, e.g: 1.5 out of 1.5e3, is only complete once it is followed by a delimiter
+            if self._exhausted or (end < len(self._text) and self._text[end] in _NUMBER_DELIMITERS) or not isinstance(value, (int, float)):
+                self._pos = end
+                return value
+            self._fill(required=False)
+
+    def _read_separator(self) -> str:
+        """Read the comma or the closing bracket following an element of an array"""
+        while True:
+            match = _SEPARATOR.match(self._text, self._pos)
+            if match:
+                self._pos = match.end()
+                return match.group(1)
+            if self._exhausted:
+                self._unexpected("',' or ']'")
+            self._fill(required=False)
+
+    def _read_value(self) -> str:
+        """Read the raw text of the next value"""
+        first = self._peek()
+        if first == '"':
+            return self._read_string()
+        if first not in ("{", "["):
+            return self._read_scalar()
+
+        self._compact()
+        depth = 0
+        index = self._pos
+        while True:
+            match = _STRUCTURE.search(self._text, index)
+            if not match:
+                index = len(self._text)
+                self._fill()
+                continue
+            character = match.group()
+            if character == '"':
+                index = self._string_end(match.start())
+            elif character in "[{":
+                depth += 1
+                index = match.end()
+            else:
+                depth -= 1
+                index = match.end()
+                if depth == 0:
+                    start = self._pos
+                    self._pos = index
+                    return self._text[start:index]
+
+    def _read_string(self) -> str:
+        self._compact()
+        if self._peek() != '"':
+            self._unexpected('"')
+        start, end = self._pos, self._string_end(self._pos)
+        self._pos = end
+        return self._text[start:end]
+
+    def _string_end(self, start: int) -> int:
+        while True:
+            match = _STRING.match(self._text, start)
+            if match:
+                return match.end()
+            self._fill()
+
+    def _read_scalar(self) -> str:
+        self._compact()
+        while True:
+            match = _SCALAR.match(self._text, self._pos)
+            if not match:
+                self._unexpected("a value")
+            # The scalar may continue in the next chunk
+            if match.end() < len(self._text) or self._exhausted:
+                self._pos = match.end()
+                return match.group()
+            self._fill(required=False)
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = _whitespace_end(self._text, self._pos)
+            if self._pos < len(self._text) or self._exhausted:
+                return
+            self._fill(required=False)
+
+    def _peek(self):
+        if self._pos >= len(self._text):
+            self._fill(required=False)
+        return self._text[self._pos] if self._pos < len(self._text) else None
+
+    def _consume(self, expected: str):
+        if self._peek() != expected:
+            self._unexpected(expected)
+        self._pos += 1
+
+    def _compact(self):
+        # Drop the text which was read so memory only holds the values being read, once it is worth copying the rest of the buffer
+        pos = self._pos
+        if pos and pos >= len(self._text) // 2:
+            self._text = self._text[pos:]
+            self._pos = 0
+
+    def _fill(self, required: bool = True):
+        """Append the next chunk of text, fail if the document is truncated and more text is required"""
+        for chunk in self._chunks:
+            if chunk:
+                self._text += chunk
+                return
+        self._exhausted = True
+        if required:
+            raise ValueError("Unexpected end of the JSON document")
+
+    def _unexpected(self, expected: str) -> NoReturn:
+        start, end = self._pos, self._pos + 20
+        found = self._text[start:end] or "the end of the document"
+        raise ValueError(f"Expected {expected} in the JSON document, found {found}")
@@ -3,7 +3,7 @@
 #
 
 from abc import ABC, abstractmethod
-from typing import Any, List, Mapping
+from typing import Any, Iterable, Mapping
 
 import requests
 from airbyte_cdk.sources.declarative.types import Record
@@ -17,5 +17,12 @@ class HttpSelector(ABC):
         stream_state: Mapping[str, Any],
         stream_slice: Mapping[str, Any] = None,
         next_page_token: Mapping[str, Any] = None,
-    ) -> List[Record]:
+    ) -> Iterable[Record]:
         pass
+
+    @property
+    def stream_response(self) -> bool:
+        """
+        :return: True if the records are selected while the response is downloaded, in which case it must be requested with stream=True
+        """
+        return False
@@ -14,6 +14,7 @@ from jello import lib as jello_lib
 
 class JelloExtractor:
     default_transform = "."
+    stream_response = False
 
     def __init__(self, transform: str, decoder: Optional[Decoder] = None, config=None, kwargs=None):
         self._interpolator = JinjaInterpolation()
@@ -0,0 +1,38 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+from typing import Iterable, List, Optional
+
+import requests
+from airbyte_cdk.sources.declarative.decoders.json_stream_decoder import JsonStreamDecoder
+from airbyte_cdk.sources.declarative.interpolation.interpolated_string import InterpolatedString
+from airbyte_cdk.sources.declarative.types import Record
+
+
+class JsonStreamExtractor:
+    """
+    Extracts the records from the array found at field_pointer in a JSON response, yielding each record as soon as it is downloaded.
+
+    Unlike JelloExtractor, neither the raw body nor the full decoded response are held in memory, which matters for large pages.
+    Responses are requested with stream=True so the records are decoded while the page is downloaded.
+
+    Examples of instantiating this extractor via YAML:
+      extractor:
+        type: JsonStreamExtractor
+        field_pointer: ["data", "{{ kwargs['data_field'] }}"]
+    """
+
+    stream_response = True
+
+    def __init__(self, field_pointer: List[str], decoder: Optional[JsonStreamDecoder] = None, config=None, kwargs=None):
+        """
+        :param field_pointer: keys leading to the array of records, each key can be interpolated with config and kwargs
+        :param decoder: the decoder reading the response
+        """
+        kwargs = kwargs or dict()
+        self._field_pointer = [str(InterpolatedString(key).eval(config, kwargs=kwargs)) if "{{" in key else key for key in field_pointer]
+        self._decoder = decoder or JsonStreamDecoder()
+
+    def extract_records(self, response: requests.Response) -> Iterable[Record]:
+        return self._decoder.decode_array(response, self._field_pointer)
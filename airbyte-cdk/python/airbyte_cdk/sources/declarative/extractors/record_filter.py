@@ -2,7 +2,7 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
-from typing import Any, List, Mapping
+from typing import Any, Iterable, List, Mapping
 
 from airbyte_cdk.sources.declarative.interpolation.interpolated_boolean import InterpolatedBoolean
 from airbyte_cdk.sources.declarative.types import Config, Record
@@ -15,10 +15,14 @@ class RecordFilter:
 
     def filter_records(
         self,
-        records: List[Record],
+        records: Iterable[Record],
         stream_state: Mapping[str, Any],
         stream_slice: Mapping[str, Any] = None,
         next_page_token: Mapping[str, Any] = None,
     ) -> List[Record]:
+        """
+        The records matching the condition. Records selected while the response is downloaded are all read first, so filtering a
+        page gives up streaming it.
+        """
         kwargs = {"stream_state": stream_state, "stream_slice": stream_slice, "next_page_token": next_page_token}
         return [record for record in records if self._filter_interpolator.eval(self._config, record=record, **kwargs)]
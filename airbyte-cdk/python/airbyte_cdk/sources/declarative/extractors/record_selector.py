@@ -2,11 +2,12 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
-from typing import Any, List, Mapping
+from typing import Any, Iterable, Mapping, Union
 
 import requests
 from airbyte_cdk.sources.declarative.extractors.http_selector import HttpSelector
 from airbyte_cdk.sources.declarative.extractors.jello import JelloExtractor
+from airbyte_cdk.sources.declarative.extractors.json_stream_extractor import JsonStreamExtractor
 from airbyte_cdk.sources.declarative.extractors.record_filter import RecordFilter
 from airbyte_cdk.sources.declarative.types import Record
 
@@ -17,7 +18,7 @@ class RecordSelector(HttpSelector):
     records based on a heuristic.
     """
 
-    def __init__(self, extractor: JelloExtractor, record_filter: RecordFilter = None):
+    def __init__(self, extractor: Union[JelloExtractor, JsonStreamExtractor], record_filter: RecordFilter = None):
         self._extractor = extractor
         self._record_filter = record_filter
 
@@ -27,10 +28,14 @@ class RecordSelector(HttpSelector):
         stream_state: Mapping[str, Any],
         stream_slice: Mapping[str, Any] = None,
         next_page_token: Mapping[str, Any] = None,
-    ) -> List[Record]:
+    ) -> Iterable[Record]:
         all_records = self._extractor.extract_records(response)
         if self._record_filter:
             return self._record_filter.filter_records(
                 all_records, stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token
             )
         return all_records
+
+    @property
+    def stream_response(self) -> bool:
+        return self._extractor.stream_response
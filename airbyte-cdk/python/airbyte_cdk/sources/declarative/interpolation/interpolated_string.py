@@ -2,7 +2,7 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
-from typing import Optional
+from typing import Optional, Set
 
 from airbyte_cdk.sources.declarative.interpolation.jinja import JinjaInterpolation
 
@@ -16,6 +16,12 @@ class InterpolatedString:
     def eval(self, config, **kwargs):
         return self._interpolation.eval(self._string, config, self._default, **kwargs)
 
+    def variables(self) -> Set[str]:
+        """
+        :return: the names the string and its default read from the context they are evaluated with
+        """
+        return self._interpolation.variables(self._string) | self._interpolation.variables(self._default)
+
     def __eq__(self, other):
         if not isinstance(other, InterpolatedString):
             return False
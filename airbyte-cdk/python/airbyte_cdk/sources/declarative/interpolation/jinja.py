@@ -3,17 +3,40 @@
 #
 
 import ast
+from functools import lru_cache
+from typing import Set, Union
 
 from airbyte_cdk.sources.declarative.interpolation.interpolation import Interpolation
 from airbyte_cdk.sources.declarative.interpolation.macros import macros
-from jinja2 import Environment
+from jinja2 import Environment, Template, nodes
 from jinja2.exceptions import UndefinedError
 
+# Environment shared by all the interpolations so a template used by several components is only compiled once
+_environment = Environment()
+_environment.globals.update(**macros)
+
+# Maximum number of compiled templates kept in memory
+_TEMPLATE_CACHE_SIZE = 1024
+
+_JINJA_DELIMITERS = ("{{", "{%", "{#")
+
+# First characters of the strings ast.literal_eval can parse: numbers, strings, containers, booleans and None
+_LITERAL_FIRST_CHARACTERS = frozenset("0123456789+-.([{'\"TFNbBrRuU")
+
+
+@lru_cache(maxsize=_TEMPLATE_CACHE_SIZE)
+def _compile(s: str) -> Union[Template, str]:
+    """
+    :return: the compiled template, or the rendered string if s contains no jinja syntax since it renders to the same string every time
+    """
+    if not any(delimiter in s for delimiter in _JINJA_DELIMITERS):
+        return _environment.from_string(s).render()
+    return _environment.from_string(s)
+
 
 class JinjaInterpolation(Interpolation):
     def __init__(self):
-        self._environment = Environment()
-        self._environment.globals.update(**macros)
+        self._environment = _environment
 
     def eval(self, input_str: str, config, default=None, **kwargs):
         context = {"config": config, **kwargs}
@@ -30,7 +53,18 @@ class JinjaInterpolation(Interpolation):
         # If result is empty or resulted in an undefined error, evaluate and return the default string
         return self._literal_eval(self._eval(default, context))
 
+    def variables(self, input_str: str) -> Set[str]:
+        """
+        :return: every name the template reads when rendered: context variables, macros and the variables it defines itself
+        """
+        return {node.name for node in self._environment.parse(input_str).find_all(nodes.Name) if node.ctx == "load"}
+
     def _literal_eval(self, result):
+        # Parsing is skipped for the outputs which can't be a literal, e.g: most strings, which are the most common output
+        if isinstance(result, str):
+            stripped = result.lstrip()
+            if not stripped or stripped[0] not in _LITERAL_FIRST_CHARACTERS:
+                return result
         try:
             return ast.literal_eval(result)
         except (ValueError, SyntaxError):
@@ -38,7 +72,10 @@ class JinjaInterpolation(Interpolation):
 
     def _eval(self, s: str, context):
         try:
-            return self._environment.from_string(s).render(context)
+            template = _compile(s)
+            if isinstance(template, str):
+                return template
+            return template.render(context)
         except TypeError:
             # The string is a static value, not a jinja template
             # It can be returned as is
@@ -7,6 +7,7 @@ from typing import Mapping, Type
 from airbyte_cdk.sources.declarative.datetime.min_max_datetime import MinMaxDatetime
 from airbyte_cdk.sources.declarative.declarative_stream import DeclarativeStream
 from airbyte_cdk.sources.declarative.extractors.jello import JelloExtractor
+from airbyte_cdk.sources.declarative.extractors.json_stream_extractor import JsonStreamExtractor
 from airbyte_cdk.sources.declarative.requesters.error_handlers.backoff_strategies.constant_backoff_strategy import ConstantBackoffStrategy
 from airbyte_cdk.sources.declarative.requesters.error_handlers.backoff_strategies.exponential_backoff_strategy import (
     ExponentialBackoffStrategy,
@@ -22,11 +23,13 @@ from airbyte_cdk.sources.declarative.stream_slicers.datetime_stream_slicer impor
 from airbyte_cdk.sources.declarative.stream_slicers.list_stream_slicer import ListStreamSlicer
 from airbyte_cdk.sources.declarative.transformations import RemoveFields
 from airbyte_cdk.sources.declarative.transformations.add_fields import AddFields
+from airbyte_cdk.sources.streams.checkpoint import CheckpointPolicy
 from airbyte_cdk.sources.streams.http.requests_native_auth.token import TokenAuthenticator
 
 CLASS_TYPES_REGISTRY: Mapping[str, Type] = {
     "AddFields": AddFields,
     "CartesianProductStreamSlicer": CartesianProductStreamSlicer,
+    "CheckpointPolicy": CheckpointPolicy,
     "CompositeErrorHandler": CompositeErrorHandler,
     "ConstantBackoffStrategy": ConstantBackoffStrategy,
     "DatetimeStreamSlicer": DatetimeStreamSlicer,
@@ -36,6 +39,7 @@ CLASS_TYPES_REGISTRY: Mapping[str, Type] = {
     "HttpRequester": HttpRequester,
     "InterpolatedPaginator": InterpolatedPaginator,
     "JelloExtractor": JelloExtractor,
+    "JsonStreamExtractor": JsonStreamExtractor,
     "ListStreamSlicer": ListStreamSlicer,
     "MinMaxDatetime": MinMaxDatetime,
     "NextPageUrlPaginator": NextPageUrlPaginator,
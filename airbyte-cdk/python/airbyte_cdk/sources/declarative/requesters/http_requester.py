@@ -30,8 +30,12 @@ class HttpRequester(Requester):
         request_options_provider: Optional[RequestOptionsProvider] = None,
         authenticator: HttpAuthenticator = None,
         error_handler: Optional[ErrorHandler] = None,
+        use_cache: bool = False,
         config: Config,
     ):
+        """
+        :param use_cache: cache the responses, e.g: so the substreams of this stream reuse the pages it reads
+        """
         if request_options_provider is None:
             request_options_provider = InterpolatedRequestOptionsProvider(config=config)
         elif isinstance(request_options_provider, dict):
@@ -45,6 +49,7 @@ class HttpRequester(Requester):
         self._method = http_method
         self._request_options_provider = request_options_provider
         self._error_handler = error_handler or DefaultErrorHandler()
+        self._use_cache = use_cache
         self._config = config
 
     def get_authenticator(self):
@@ -96,9 +101,8 @@ class HttpRequester(Requester):
     @property
     def cache_filename(self) -> str:
         # FIXME: this should be declarative
-        return f"{self._name}.yml"
+        return f"{self._name}.sqlite"
 
     @property
     def use_cache(self) -> bool:
-        # FIXME: this should be declarative
-        return False
+        return self._use_cache
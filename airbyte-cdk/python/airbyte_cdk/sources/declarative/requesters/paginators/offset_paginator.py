@@ -4,16 +4,47 @@
 
 from typing import Any, List, Mapping, Optional
 
+import dpath.util
 import requests
 from airbyte_cdk.sources.declarative.requesters.paginators.paginator import Paginator
 from airbyte_cdk.sources.declarative.states.dict_state import DictState
 
 
 class OffsetPaginator(Paginator):
-    def __init__(self, page_size: int, state: Optional[DictState] = None, offset_key: str = "offset"):
+    """
+    Paginates by increasing the offset by page_size until a page returns fewer records than page_size.
+
+    When total_count_pointer is set and the first response of a slice holds the total number of records at that path, the offsets of
+    all the remaining pages are known at once and up to max_concurrent_pages of them are requested at the same time.
+    Records are still returned in the order of the pages.
+
+    Examples of instantiating this paginator via YAML:
+      paginator:
+        type: OffsetPaginator
+        page_size: 100
+        total_count_pointer: ["meta", "total"]
+        max_concurrent_pages: 8
+    """
+
+    def __init__(
+        self,
+        page_size: int,
+        state: Optional[DictState] = None,
+        offset_key: str = "offset",
+        total_count_pointer: Optional[List[str]] = None,
+        max_concurrent_pages: int = 4,
+    ):
+        """
+        :param page_size: number of records requested per page
+        :param offset_key: key of the offset in the next page token
+        :param total_count_pointer: path to the total number of records in the response to the first request of a slice
+        :param max_concurrent_pages: maximum number of pages requested at the same time once the total number of records is known
+        """
         self._limit = page_size
         self._state = state or DictState()
         self._offsetKey = offset_key
+        self._total_count_pointer = total_count_pointer
+        self._max_concurrent_pages = max_concurrent_pages
         self._update_state_with_offset(0)
 
     def next_page_token(self, response: requests.Response, last_records: List[Mapping[str, Any]]) -> Optional[Mapping[str, Any]]:
@@ -24,6 +55,25 @@ class OffsetPaginator(Paginator):
         self._update_state_with_offset(offset)
         return token_map
 
+    def remaining_page_tokens(
+        self, response: requests.Response, last_records: List[Mapping[str, Any]]
+    ) -> Optional[List[Mapping[str, Any]]]:
+        if not self._total_count_pointer or not last_records or len(last_records) < self._limit:
+            return None
+        try:
+            total_count = int(dpath.util.get(response.json(), self._total_count_pointer))
+        except (KeyError, TypeError, ValueError):
+            # The total isn't available, fall back to reading one page at a time
+            return None
+        offsets = range(self._get_offset() + self._limit, total_count, self._limit)
+        if offsets:
+            self._update_state_with_offset(offsets[-1])
+        return [{self._offsetKey: offset} for offset in offsets]
+
+    @property
+    def max_concurrent_pages(self) -> int:
+        return self._max_concurrent_pages
+
     def _update_state_with_offset(self, offset):
         self._state.update_state(**{self._offsetKey: offset})
 
@@ -12,3 +12,21 @@ class Paginator(ABC):
     @abstractmethod
     def next_page_token(self, response: requests.Response, last_records: List[Mapping[str, Any]]) -> Optional[Mapping[str, Any]]:
         pass
+
+    def remaining_page_tokens(
+        self, response: requests.Response, last_records: List[Mapping[str, Any]]
+    ) -> Optional[List[Mapping[str, Any]]]:
+        """
+        :param response: the response to the first request of a slice
+        :param last_records: the records of the first page
+        :return: the tokens of all the remaining pages of the slice when they can be known from its first page, so they are requested
+        concurrently. None to discover the pages one at a time with next_page_token
+        """
+        return None
+
+    @property
+    def max_concurrent_pages(self) -> int:
+        """
+        :return: maximum number of the pages returned by remaining_page_tokens which are requested at the same time
+        """
+        return 1
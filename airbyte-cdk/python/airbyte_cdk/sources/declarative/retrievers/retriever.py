@@ -6,6 +6,7 @@ from abc import ABC, abstractmethod
 from typing import Any, Iterable, List, Mapping, MutableMapping, Optional
 
 from airbyte_cdk.models import SyncMode
+from airbyte_cdk.sources.declarative.types import Record
 
 
 class Retriever(ABC):
@@ -19,6 +20,20 @@ class Retriever(ABC):
     ) -> Iterable[Mapping[str, Any]]:
         pass
 
+    def read_pages(
+        self,
+        sync_mode: SyncMode,
+        cursor_field: List[str] = None,
+        stream_slice: Mapping[str, Any] = None,
+        stream_state: Mapping[str, Any] = None,
+    ) -> Iterable[List[Record]]:
+        """
+        Read the same records as read_records, grouped by the page they were read from so they can be processed together.
+        By default, every record is a page of its own.
+        """
+        for record in self.read_records(sync_mode, cursor_field, stream_slice, stream_state):
+            yield [record]
+
     @abstractmethod
     def stream_slices(self, *, sync_mode: SyncMode, stream_state: Mapping[str, Any] = None) -> Iterable[Optional[Mapping[str, Any]]]:
         pass
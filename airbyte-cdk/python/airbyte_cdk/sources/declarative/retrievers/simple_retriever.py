@@ -2,6 +2,7 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
+import copy
 from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Union
 
 import requests
@@ -16,6 +17,7 @@ from airbyte_cdk.sources.declarative.states.dict_state import DictState
 from airbyte_cdk.sources.declarative.states.state import State
 from airbyte_cdk.sources.declarative.stream_slicers.single_slice import SingleSlice
 from airbyte_cdk.sources.declarative.stream_slicers.stream_slicer import StreamSlicer
+from airbyte_cdk.sources.declarative.types import Record
 from airbyte_cdk.sources.streams.http import HttpStream
 
 
@@ -29,7 +31,12 @@ class SimpleRetriever(Retriever, HttpStream):
         paginator: Optional[Paginator] = None,
         stream_slicer: Optional[StreamSlicer] = SingleSlice(),
         state: Optional[State] = None,
+        prefetch_pages: int = 0,
     ):
+        """
+        :param prefetch_pages: number of pages requested ahead while the records of the current page are read, see
+        HttpStream.prefetch_pages. The requests must not depend on the state updated by the records of the slice.
+        """
         self._name = name
         self._primary_key = primary_key
         self._paginator = paginator or NoPagination()
@@ -39,7 +46,9 @@ class SimpleRetriever(Retriever, HttpStream):
         self._iterator = stream_slicer
         self._state: State = (state or DictState()).deep_copy()
         self._last_response = None
-        self._last_records = None
+        self._last_records: Optional[List[Record]] = None
+        self._page_start_state: Optional[MutableMapping[str, Any]] = None
+        self._prefetch_pages = prefetch_pages
 
     @property
     def name(self) -> str:
@@ -48,6 +57,17 @@ class SimpleRetriever(Retriever, HttpStream):
         """
         return self._name
 
+    def remaining_page_tokens(self, response: requests.Response) -> Optional[List[Mapping[str, Any]]]:
+        return self._paginator.remaining_page_tokens(response, self._last_records or [])
+
+    @property
+    def max_concurrent_pages(self) -> int:
+        return self._paginator.max_concurrent_pages
+
+    @property
+    def prefetch_pages(self) -> int:
+        return self._prefetch_pages
+
     @property
     def url_base(self) -> str:
         return self._requester.get_url_base()
@@ -143,7 +163,10 @@ class SimpleRetriever(Retriever, HttpStream):
         this method. Note that these options do not conflict with request-level options such as headers, request params, etc..
         """
         # Warning: use self.state instead of the stream_state passed as argument!
-        return self._requester.request_kwargs(self.state, stream_slice, next_page_token)
+        request_kwargs = self._requester.request_kwargs(self.state, stream_slice, next_page_token)
+        if self._record_selector.stream_response:
+            request_kwargs = {**request_kwargs, "stream": True}
+        return request_kwargs
 
     def path(
         self, *, stream_state: Mapping[str, Any] = None, stream_slice: Mapping[str, Any] = None, next_page_token: Mapping[str, Any] = None
@@ -201,8 +224,19 @@ class SimpleRetriever(Retriever, HttpStream):
         records = self._record_selector.select_records(
             response=response, stream_state=self.state, stream_slice=stream_slice, next_page_token=next_page_token
         )
-        self._last_records = records
-        return records
+        if isinstance(records, list):
+            self._last_records = records
+            return records
+        # Records selected while the response is downloaded are collected as they are read, for the paginator
+        last_records: List[Record] = []
+        self._last_records = last_records
+        return self._collect_last_records(records, last_records)
+
+    @staticmethod
+    def _collect_last_records(records: Iterable[Record], last_records: List[Record]) -> Iterable[Record]:
+        for record in records:
+            last_records.append(record)
+            yield record
 
     @property
     def primary_key(self) -> Optional[Union[str, List[str], List[List[str]]]]:
@@ -216,7 +250,7 @@ class SimpleRetriever(Retriever, HttpStream):
 
         :return: The token for the next page from the input response object. Returning None means there are no more pages to read in this response.
         """
-        return self._paginator.next_page_token(response, self._last_records)
+        return self._paginator.next_page_token(response, self._last_records or [])
 
     def read_records(
         self,
@@ -226,13 +260,44 @@ class SimpleRetriever(Retriever, HttpStream):
         stream_state: Mapping[str, Any] = None,
     ) -> Iterable[Mapping[str, Any]]:
         # Warning: use self.state instead of the stream_state passed as argument!
-        records_generator = HttpStream.read_records(self, sync_mode, cursor_field, stream_slice, self.state)
-        for r in records_generator:
-            self._state.update_state(stream_slice=stream_slice, stream_state=self.state, last_response=self._last_response, last_record=r)
-            yield r
-        else:
-            self._state.update_state(stream_slice=stream_slice, stream_state=self.state, last_reponse=self._last_response)
-            yield from []
+        # The state is updated with the response of each page rather than _last_response, which is ahead when pages are prefetched
+        last_response = None
+        for response, records in HttpStream._read_responses(self, stream_slice, self.state):
+            last_response = response
+            for r in records:
+                self._state.update_state(stream_slice=stream_slice, stream_state=self.state, last_response=response, last_record=r)
+                yield r
+        self._state.update_state(stream_slice=stream_slice, stream_state=self.state, last_response=last_response)
+
+    def read_pages(
+        self,
+        sync_mode: SyncMode,
+        cursor_field: List[str] = None,
+        stream_slice: Mapping[str, Any] = None,
+        stream_state: Mapping[str, Any] = None,
+    ) -> Iterable[List[Record]]:
+        """
+        Read the records of each page of the slice. The state is updated with the records of a page before the page is returned, since
+        they may be modified by transformations afterwards, but the state property keeps returning the state as of the start of the page
+        until the next page is read. The state checkpointed while the records of a page are emitted then never covers records which were
+        not emitted yet.
+        """
+        # Warning: use self.state instead of the stream_state passed as argument!
+        last_response = None
+        for response, records in HttpStream._read_responses(self, stream_slice, self.state):
+            last_response = response
+            records = list(records)
+            self._page_start_state = copy.deepcopy(self._state.get_stream_state())
+            for r in records:
+                self._state.update_state(
+                    stream_slice=stream_slice,
+                    stream_state=self._state.get_stream_state(),
+                    last_response=response,
+                    last_record=r,
+                )
+            yield records
+            self._page_start_state = None
+        self._state.update_state(stream_slice=stream_slice, stream_state=self.state, last_response=last_response)
 
     def stream_slices(
         self, *, sync_mode: SyncMode, cursor_field: List[str] = None, stream_state: Mapping[str, Any] = None
@@ -250,9 +315,13 @@ class SimpleRetriever(Retriever, HttpStream):
 
     @property
     def state(self) -> MutableMapping[str, Any]:
+        # The state as of the start of the page whose records are being emitted, see read_pages
+        if self._page_start_state is not None:
+            return self._page_start_state
         return self._state.get_stream_state()
 
     @state.setter
     def state(self, value: MutableMapping[str, Any]):
         """State setter, accept state serialized by state getter."""
+        self._page_start_state = None
         self._state.set_state(value)
@@ -2,7 +2,7 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
-from typing import Any, Iterable, List, Mapping
+from typing import Any, Iterable, List, Mapping, Optional, Tuple
 
 from airbyte_cdk.models import SyncMode
 from airbyte_cdk.sources.declarative.interpolation.interpolated_mapping import InterpolatedMapping
@@ -10,18 +10,40 @@ from airbyte_cdk.sources.declarative.interpolation.jinja import JinjaInterpolati
 from airbyte_cdk.sources.declarative.states.dict_state import DictState
 from airbyte_cdk.sources.declarative.stream_slicers.stream_slicer import StreamSlicer
 from airbyte_cdk.sources.streams.core import Stream
+from airbyte_cdk.sources.utils.parent_records import ParentRecordStore, project, store_key
 
 
 class SubstreamSlicer(StreamSlicer):
     """
     Stream slicer that iterates over the parent's stream slices and records and emits slices by interpolating the slice_definition mapping
     Will populate the state with `parent_stream_slice` and `parent_record` so they can be accessed by other components
+
+    If memoize_parent_records is set, the parent records read during a sync are stored and shared with the other substreams of the same
+    parent, so each parent is only read once per sync.
     """
 
-    def __init__(self, parent_streams: List[Stream], state: DictState, slice_definition: Mapping[str, Any]):
+    def __init__(
+        self,
+        parent_streams: List[Stream],
+        state: DictState,
+        slice_definition: Mapping[str, Any],
+        parent_fields: Optional[List[str]] = None,
+        memoize_parent_records: bool = False,
+    ):
+        """
+        :param parent_streams: the streams whose records the slices are built from
+        :param state: the state to populate with the parent slice and record
+        :param slice_definition: mapping interpolated into a slice for each parent record
+        :param parent_fields: top level fields of the parent records used by the slice definition and the other components, the only
+        ones kept in parent_record. None keeps the full records.
+        :param memoize_parent_records: whether the parent records are shared with the other substreams of the parent during a sync, only
+        set it if the parent records don't depend on the substream, e.g: on its state
+        """
         self._parent_streams = parent_streams
         self._state = state
         self._interpolation = InterpolatedMapping(slice_definition, JinjaInterpolation())
+        self._parent_fields = parent_fields
+        self._memoize_parent_records = memoize_parent_records
 
     def stream_slices(self, sync_mode: SyncMode, stream_state: Mapping[str, Any]) -> Iterable[Mapping[str, Any]]:
         """
@@ -41,23 +63,32 @@ class SubstreamSlicer(StreamSlicer):
             yield from []
         else:
             for parent_stream in self._parent_streams:
-                for parent_stream_slice in parent_stream.stream_slices(sync_mode=sync_mode, cursor_field=None, stream_state=stream_state):
+                for parent_stream_slice, parent_record in self._parent_records(parent_stream, sync_mode, stream_state):
                     self._state.update_state(parent_stream_slice=parent_stream_slice)
-                    self._state.update_state(parent_record=None)
-                    empty_parent_slice = True
+                    self._state.update_state(parent_record=parent_record)
+                    yield self._get_slice_definition(parent_stream_slice, parent_record, parent_stream.name)
+
+    def _parent_records(self, parent_stream: Stream, sync_mode: SyncMode, stream_state: Mapping[str, Any]) -> Iterable[Tuple[Any, Any]]:
+        if not self._memoize_parent_records:
+            return self._read_parent_records(parent_stream, sync_mode, stream_state)
+        key = store_key(parent_stream, sync_mode, self._parent_fields)
+        return ParentRecordStore.default().records(key, lambda: self._read_parent_records(parent_stream, sync_mode, stream_state))
 
-                    for parent_record in parent_stream.read_records(
-                        sync_mode=SyncMode.full_refresh, cursor_field=None, stream_slice=parent_stream_slice, stream_state=None
-                    ):
-                        empty_parent_slice = False
-                        slice_definition = self._get_slice_definition(parent_stream_slice, parent_record, parent_stream.name)
-                        self._state.update_state(parent_record=parent_record)
-                        yield slice_definition
-                    # If the parent slice contains no records,
-                    # yield a slice definition with parent_record==None
-                    if empty_parent_slice:
-                        slice_definition = self._get_slice_definition(parent_stream_slice, None, parent_stream.name)
-                        yield slice_definition
+    def _read_parent_records(
+        self, parent_stream: Stream, sync_mode: SyncMode, stream_state: Mapping[str, Any]
+    ) -> Iterable[Tuple[Any, Any]]:
+        """Yield each parent slice with each of its records, or with None if the slice has no record"""
+        for parent_stream_slice in parent_stream.stream_slices(sync_mode=sync_mode, cursor_field=None, stream_state=stream_state):
+            empty_parent_slice = True
+            for parent_record in parent_stream.read_records(
+                sync_mode=SyncMode.full_refresh, cursor_field=None, stream_slice=parent_stream_slice, stream_state=None
+            ):
+                empty_parent_slice = False
+                yield parent_stream_slice, project(parent_record, self._parent_fields)
+            # If the parent slice contains no records,
+            # yield a slice definition with parent_record==None
+            if empty_parent_slice:
+                yield parent_stream_slice, None
 
     def _get_slice_definition(self, parent_stream_slice, parent_record, parent_stream_name):
         return self._interpolation.eval(
@@ -2,6 +2,7 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
+import copy
 from dataclasses import dataclass
 from typing import Any, List, Mapping, Union
 
@@ -10,6 +11,9 @@ from airbyte_cdk.sources.declarative.interpolation.interpolated_string import In
 from airbyte_cdk.sources.declarative.transformations import RecordTransformation
 from airbyte_cdk.sources.declarative.types import Config, FieldPointer, StreamSlice, StreamState
 
+# Contextual values which are the same for all the records of a page
+_PAGE_VARIABLES = {"config", "stream_state", "stream_slice"}
+
 
 @dataclass(frozen=True)
 class AddedFieldDefinition:
@@ -84,16 +88,62 @@ class AddFields(RecordTransformation):
                     self._fields.append(ParsedAddFieldDefinition(field.path, InterpolatedString(field.value)))
             else:
                 self._fields.append(ParsedAddFieldDefinition(field.path, field.value))
+        # Values which don't read the record nor call a macro (e.g: now_utc()) are evaluated once per page by transform_batch
+        self._page_values = [field.value.variables() <= _PAGE_VARIABLES for field in self._fields]
+        # Paths made of keys only are set with plain dict accesses instead of dpath
+        self._key_paths = [all(isinstance(key, str) for key in field.path) for field in self._fields]
 
     def transform(
         self, record: Mapping[str, Any], config: Config = None, stream_state: StreamState = None, stream_slice: StreamSlice = None
     ) -> Mapping[str, Any]:
         kwargs = {"record": record, "stream_state": stream_state, "stream_slice": stream_slice}
-        for field in self._fields:
+        for field, key_path in zip(self._fields, self._key_paths):
             value = field.value.eval(config, **kwargs)
-            dpath.util.new(record, field.path, value)
+            _add_field(record, field.path, value, key_path)
 
         return record
 
+    def transform_batch(
+        self, records: List[Mapping[str, Any]], config: Config = None, stream_state: StreamState = None, stream_slice: StreamSlice = None
+    ) -> List[Mapping[str, Any]]:
+        page_values = {
+            index: field.value.eval(config, stream_state=stream_state, stream_slice=stream_slice)
+            for index, field in enumerate(self._fields)
+            if self._page_values[index]
+        }
+        for record in records:
+            kwargs = {"record": record, "stream_state": stream_state, "stream_slice": stream_slice}
+            for index, (field, key_path) in enumerate(zip(self._fields, self._key_paths)):
+                if index in page_values:
+                    value = page_values[index]
+                    # Each record gets its own copy of mutable values so modifying one record doesn't modify the others
+                    if isinstance(value, (dict, list)):
+                        value = copy.deepcopy(value)
+                else:
+                    value = field.value.eval(config, **kwargs)
+                _add_field(record, field.path, value, key_path)
+
+        return records
+
     def __eq__(self, other):
         return self.__dict__ == other.__dict__
+
+
+def _add_field(record: Mapping[str, Any], path: FieldPointer, value: Any, key_path: bool):
+    """
+    Set the value at path, creating the missing parent objects. Paths going through lists or through values which are not objects
+    are delegated to dpath.
+    """
+    if key_path:
+        target = record
+        for key in path[:-1]:
+            if not isinstance(target, dict):
+                break
+            if key not in target:
+                target[key] = {}
+            target = target[key]
+        else:
+            if isinstance(target, dict):
+                target[path[-1]] = value
+                return
+    dpath.util.new(record, path, value)
@@ -7,7 +7,10 @@ from typing import Any, List, Mapping
 import dpath.exceptions
 import dpath.util
 from airbyte_cdk.sources.declarative.transformations import RecordTransformation
-from airbyte_cdk.sources.declarative.types import FieldPointer
+from airbyte_cdk.sources.declarative.types import Config, FieldPointer, StreamSlice, StreamState
+
+# Characters dpath interprets as glob patterns
+_GLOB_CHARACTERS = ("*", "?", "[")
 
 
 class RemoveFields(RecordTransformation):
@@ -38,19 +41,55 @@ class RemoveFields(RecordTransformation):
         :param field_pointers: pointers to the fields that should be removed
         """
         self._field_pointers = field_pointers
+        # Pointers made of plain keys are removed with dict accesses instead of dpath
+        self._key_pointers = [
+            bool(pointer) and all(isinstance(key, str) and not any(c in key for c in _GLOB_CHARACTERS) for key in pointer)
+            for pointer in field_pointers
+        ]
 
-    def transform(self, record: Mapping[str, Any], **kwargs) -> Mapping[str, Any]:
+    def transform(
+        self, record: Mapping[str, Any], config: Config = None, stream_state: StreamState = None, stream_slice: StreamSlice = None
+    ) -> Mapping[str, Any]:
         """
         :param record: The record to be transformed
         :return: the input record with the requested fields removed
         """
-        for pointer in self._field_pointers:
-            # the dpath library by default doesn't delete fields from arrays
-
-            try:
-                dpath.util.delete(record, pointer)
-            except dpath.exceptions.PathNotFound:
-                # if the (potentially nested) property does not exist, silently skip
-                pass
+        for pointer, key_pointer in zip(self._field_pointers, self._key_pointers):
+            if not key_pointer or not _remove_key_path(record, pointer):
+                _remove_path(record, pointer)
 
         return record
+
+    def transform_batch(
+        self, records: List[Mapping[str, Any]], config: Config = None, stream_state: StreamState = None, stream_slice: StreamSlice = None
+    ) -> List[Mapping[str, Any]]:
+        for record in records:
+            self.transform(record)
+        return records
+
+
+def _remove_key_path(record: Mapping[str, Any], pointer: FieldPointer) -> bool:
+    """
+    Remove the field at a pointer made of plain keys.
+    :return: False if the pointer goes through a value which is not an object and must be handled by dpath
+    """
+    target = record
+    for key in pointer[:-1]:
+        if not isinstance(target, dict):
+            return False
+        if key not in target:
+            return True
+        target = target[key]
+    if not isinstance(target, dict):
+        return False
+    target.pop(pointer[-1], None)
+    return True
+
+
+def _remove_path(record: Mapping[str, Any], pointer: FieldPointer):
+    # the dpath library by default doesn't delete fields from arrays
+    try:
+        dpath.util.delete(record, pointer)
+    except dpath.exceptions.PathNotFound:
+        # if the (potentially nested) property does not exist, silently skip
+        pass
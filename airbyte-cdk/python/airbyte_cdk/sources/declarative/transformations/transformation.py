@@ -3,7 +3,7 @@
 #
 
 from abc import ABC, abstractmethod
-from typing import Any, Mapping
+from typing import Any, List, Mapping
 
 from airbyte_cdk.sources.declarative.types import Config, StreamSlice, StreamState
 
@@ -22,5 +22,16 @@ class RecordTransformation(ABC):
         :return: the transformed record
         """
 
+    def transform_batch(
+        self, records: List[Mapping[str, Any]], config: Config = None, stream_state: StreamState = None, stream_slice: StreamSlice = None
+    ) -> List[Mapping[str, Any]]:
+        """
+        Transform the records of a page at once. Override it when part of the work, e.g: evaluating values which don't depend on the
+        record, can be done once for all the records instead of once per record.
+        :param records: the input records to be transformed
+        :return: the transformed records
+        """
+        return [self.transform(record, config, stream_state, stream_slice) for record in records]
+
     def __eq__(self, other):
         return other.__dict__ == self.__dict__
@@ -7,7 +7,7 @@ import json
 import logging
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import Any, Dict, Generic, Iterable, Mapping, MutableMapping, TypeVar
+from typing import Any, Dict, Generic, Iterable, List, Mapping, MutableMapping, TypeVar
 
 from airbyte_cdk.connector import BaseConnector, DefaultConnectorMixin, TConfig
 from airbyte_cdk.models import AirbyteCatalog, AirbyteMessage, ConfiguredAirbyteCatalog
@@ -46,9 +46,26 @@ class Source(DefaultConnectorMixin, BaseSource[Mapping[str, Any], MutableMapping
             state_obj = json.loads(open(state_path, "r").read())
         else:
             state_obj = {}
+        if isinstance(state_obj, list):
+            state_obj = connector_state_from_messages(state_obj)
         state = defaultdict(dict, state_obj)
         return state
 
     # can be overridden to change an input catalog
     def read_catalog(self, catalog_path: str) -> ConfiguredAirbyteCatalog:
         return ConfiguredAirbyteCatalog.parse_obj(self.read_config(catalog_path))
+
+
+def connector_state_from_messages(state_messages: List[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    The state of every stream, keyed by stream name, from a list of STATE messages such as the ones emitted by a source outputting
+    per-stream state. Legacy messages, which hold the state of every stream, are merged with the per-stream ones.
+    """
+    connector_state: Dict[str, Any] = {}
+    for message in state_messages:
+        if message.get("type") == "STREAM":
+            stream = message["stream"]
+            connector_state[stream["stream_descriptor"]["name"]] = stream.get("stream_state") or {}
+        elif message.get("data"):
+            connector_state.update(message["data"])
+    return connector_state
@@ -3,6 +3,8 @@
 #
 
 # Initialize Streams Package
+from .checkpoint import CheckpointPolicy
 from .core import IncrementalMixin, Stream
+from .cursor_tracker import CursorTracker, CursorType
 
-__all__ = ["IncrementalMixin", "Stream"]
+__all__ = ["CheckpointPolicy", "CursorTracker", "CursorType", "IncrementalMixin", "Stream"]
@@ -0,0 +1,61 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+from typing import Optional
+
+
+class CheckpointPolicy:
+    """
+    Decides when the state of a stream read incrementally is checkpointed, i.e: when a STATE message is emitted.
+
+    State is checkpointed once any of the thresholds set is reached since the previous checkpoint: a number of records, a number of
+    seconds, or a number of bytes of records emitted, and after every slice if on_slices is set. State is always checkpointed once the
+    stream is fully read. Frequent checkpoints cost serializing the state and flushing the destination, rare ones cost the records
+    re-read after a failure. Thresholds on records, seconds and bytes require the records to be read in ascending order of their cursor
+    within a slice, see Stream.state_checkpoint_interval.
+
+    Subclass and override should_checkpoint for other triggers. Policies are shared by the streams read concurrently, the counters
+    they decide on are tracked by the source for each stream.
+    """
+
+    def __init__(
+        self,
+        every_records: Optional[int] = None,
+        every_seconds: Optional[float] = None,
+        every_bytes: Optional[int] = None,
+        on_slices: bool = True,
+    ):
+        """
+        :param every_records: number of records emitted between two checkpoints, None for no limit
+        :param every_seconds: number of seconds between two checkpoints, checked whenever a record is emitted, None for no limit
+        :param every_bytes: number of bytes of RECORD messages emitted between two checkpoints, as they are output, None for no limit
+        :param on_slices: checkpoint after every slice
+        """
+        self.every_records = every_records
+        self.every_seconds = every_seconds
+        self.every_bytes = every_bytes
+        self.on_slices = on_slices
+
+    @property
+    def measures_records(self) -> bool:
+        """Whether should_checkpoint needs the size of the records emitted, which is only measured if needed. Override if needed."""
+        return self.every_bytes is not None
+
+    @property
+    def measures_time(self) -> bool:
+        """Whether should_checkpoint needs the seconds elapsed since the previous checkpoint, which are only measured if needed"""
+        return self.every_seconds is not None
+
+    def should_checkpoint(self, records: int, size: int, seconds: float) -> bool:
+        """
+        Called after every record emitted.
+        :param records: number of records emitted since the previous checkpoint
+        :param size: number of bytes of the RECORD messages emitted since the previous checkpoint, 0 unless measures_records
+        :param seconds: number of seconds elapsed since the previous checkpoint, 0 unless measures_time
+        """
+        return bool(
+            (self.every_records and records >= self.every_records)
+            or (self.every_seconds and seconds >= self.every_seconds)
+            or (self.every_bytes and size >= self.every_bytes)
+        )
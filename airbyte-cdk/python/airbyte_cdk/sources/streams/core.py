@@ -10,6 +10,8 @@ from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Union
 
 import airbyte_cdk.sources.utils.casing as casing
 from airbyte_cdk.models import AirbyteStream, SyncMode
+from airbyte_cdk.sources.streams.checkpoint import CheckpointPolicy
+from airbyte_cdk.sources.streams.cursor_tracker import CursorTracker
 from airbyte_cdk.sources.utils.schema_helpers import ResourceSchemaLoader
 from airbyte_cdk.sources.utils.transform import TransformConfig, TypeTransformer
 from deprecated.classic import deprecated
@@ -194,6 +196,59 @@ class Stream(ABC):
         """
         return None
 
+    @property
+    def state_checkpoint_seconds(self) -> Optional[float]:
+        """
+        Decides how often to checkpoint state in time, on top of state_checkpoint_interval. E.g: if this returns 60, state is also
+        persisted after the first record read a minute or more after the previous checkpoint, which bounds what a failed sync re-reads
+        for streams whose records come slowly.
+
+        return None to only checkpoint state based on the number of records. The same ordering constraints as state_checkpoint_interval
+        apply.
+        """
+        return None
+
+    @property
+    def checkpoint_policy(self) -> Optional[CheckpointPolicy]:
+        """
+        Decides when to checkpoint state, on a number of records, seconds or bytes of records emitted and on slice boundaries,
+        see CheckpointPolicy. By default, state is checkpointed based on state_checkpoint_interval and state_checkpoint_seconds and
+        after every slice.
+
+        return None to use the default policy of the source, see AbstractSource.checkpoint_policy.
+        """
+        if self.state_checkpoint_interval or self.state_checkpoint_seconds:
+            return CheckpointPolicy(every_records=self.state_checkpoint_interval, every_seconds=self.state_checkpoint_seconds)
+        return None
+
+    @property
+    def cursor_tracker(self) -> Optional[CursorTracker]:
+        """
+        Override to return a new CursorTracker declaring the type of the cursor, e.g: CursorTracker(self.cursor_field, CursorType.DATETIME).
+        The state is then computed by the tracker, which compares the cursor values of the records a batch at a time when state is
+        checkpointed, instead of calling get_updated_state for every record. Streams with a state attribute then checkpoint the state
+        computed by the tracker too.
+
+        :return: None to compute the state with get_updated_state, or the state attribute of the stream.
+        """
+        return None
+
+    @property
+    def max_concurrent_slices(self) -> int:
+        """
+        Override to read several slices of this stream at the same time, e.g: when slices are independent date windows or parent
+        records. Records are still emitted in slice order and a STATE message is only emitted after a slice once every slice before it
+        was fully read.
+
+        When this returns more than 1, read_records is called from worker threads for several slices at once, so it must not rely on
+        attributes shared between slices. In incremental mode each slice is read with the state the sync started from, and the state
+        checkpointed after a slice is computed from the records emitted so far, with get_updated_state or the cursor_tracker of the
+        stream. Slices of streams which define neither are read one after another in incremental mode.
+
+        :return: The maximum number of slices read at the same time, 1 means slices are read one after another.
+        """
+        return 1
+
     @deprecated(version="0.1.49", reason="You should use explicit state property instead, see IncrementalMixin docs.")
     def get_updated_state(self, current_stream_state: MutableMapping[str, Any], latest_record: Mapping[str, Any]):
         """Override to extract state from the latest record. Needed to implement incremental sync.
@@ -0,0 +1,176 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import datetime
+import re
+from enum import Enum
+from typing import Any, Callable, Iterable, List, Mapping, MutableMapping, Optional, Tuple, Union
+
+import pendulum
+
+# Directives of the datetime formats which order values the same way as their text, as long as the text has the same shape
+_ORDERED_DIRECTIVES = ["%Y", "%m", "%d", "%H", "%M", "%S", "%f"]
+_DIGITS_TO_ZERO = str.maketrans("0123456789", "0000000000")
+# Number of cursor values collected before they are compared, which bounds the memory used between two comparisons
+_MAX_PENDING = 1000
+
+
+class CursorType(Enum):
+    # ISO 8601 strings, or strings in the datetime_format of the tracker
+    DATETIME = "datetime"
+    # Seconds or milliseconds since the epoch, as numbers or numeric strings
+    EPOCH = "epoch"
+    INTEGER = "integer"
+    STRING = "string"
+
+
+class CursorTracker:
+    """
+    Tracks the greatest cursor value of the records read by an incremental stream, in place of a get_updated_state comparing the cursor
+    of every record with the state.
+
+    Cursor values are only collected as records are read, and compared a batch at a time when the state is requested, e.g: when state
+    is checkpointed, or once a batch reaches 1000 values. Datetimes are parsed as little as possible: when every datetime of a batch
+    has the same shape, i.e: the same length, the same separators and the same offset, and the format orders them the same way as
+    their text, such as ISO 8601, the greatest one is found by comparing their text and is the only one parsed. The parsed value of
+    the greatest cursor is kept for the next batches.
+
+    The state is a mapping from the cursor field, or the last field of a nested cursor, to the greatest cursor value in its original
+    representation, so it can be sent back to the API as is.
+    """
+
+    def __init__(
+        self,
+        cursor_field: Union[str, List[str]],
+        cursor_type: Union[CursorType, str] = CursorType.DATETIME,
+        datetime_format: Optional[str] = None,
+    ):
+        """
+        :param cursor_field: the field of the records holding the cursor, a path for nested cursors
+        :param cursor_type: how cursor values are compared, see CursorType
+        :param datetime_format: strptime format of datetime cursors, ISO 8601 by default
+        """
+        self._path = [cursor_field] if isinstance(cursor_field, str) else list(cursor_field)
+        self._type = CursorType(cursor_type)
+        self._datetime_format = datetime_format
+        keys: Mapping[CursorType, Callable[[Any], Any]] = {
+            CursorType.DATETIME: self._parse_datetime,
+            CursorType.EPOCH: _to_number,
+            CursorType.INTEGER: int,
+            CursorType.STRING: str,
+        }
+        self._key = keys[self._type]
+        self._compare_text = self._type == CursorType.DATETIME and _is_lexically_ordered(datetime_format)
+        self._pending: List[Any] = []
+        # The greatest cursor value seen and its comparison key
+        self._value: Any = None
+        self._value_key: Any = None
+        # The last value read from a state and its comparison key, states usually hold the value of the previous update
+        self._state_value: Any = None
+        self._state_key: Any = None
+
+    @property
+    def state_key(self) -> str:
+        return self._path[-1]
+
+    @property
+    def value(self) -> Any:
+        """The greatest cursor value of the records read so far, None if there was none"""
+        self._compare_pending()
+        return self._value
+
+    def observe(self, record: Mapping[str, Any]):
+        """Collect the cursor value of a record, records without a cursor value are ignored"""
+        value: Any = record
+        for field in self._path:
+            if not isinstance(value, Mapping):
+                return
+            value = value.get(field)
+        if value is not None:
+            self._pending.append(value)
+            if len(self._pending) >= _MAX_PENDING:
+                self._compare_pending()
+
+    def update(self, records: Iterable[Mapping[str, Any]]):
+        """Collect and compare the cursor values of a batch of records, e.g: a page"""
+        for record in records:
+            self.observe(record)
+        self._compare_pending()
+
+    def get_updated_state(self, stream_state: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
+        """The stream state with the greater of its cursor value and the cursor values of the records read so far"""
+        value = self.value
+        if value is None:
+            return stream_state
+        current = stream_state.get(self.state_key)
+        if current is not None:
+            if current != self._state_value:
+                self._state_value, self._state_key = current, self._key(current)
+            if self._state_key >= self._value_key:
+                return stream_state
+        return {**stream_state, self.state_key: value}
+
+    def _compare_pending(self):
+        if not self._pending:
+            return
+        values, self._pending = self._pending, []
+        value, key = self._batch_max(values)
+        if self._value is None or key > self._value_key:
+            self._value, self._value_key = value, key
+
+    def _batch_max(self, values: List[Any]) -> Tuple[Any, Any]:
+        if self._compare_text and all(isinstance(value, str) for value in values):
+            shape = _shape(values[0])
+            if all(_shape(value) == shape for value in values):
+                value = max(values)
+                return value, self._key(value)
+        keys = [self._key(value) for value in values]
+        index = max(range(len(keys)), key=keys.__getitem__)
+        return values[index], keys[index]
+
+    def _parse_datetime(self, value: Any) -> datetime.datetime:
+        if isinstance(value, datetime.datetime):
+            parsed = value
+        elif self._datetime_format:
+            parsed = datetime.datetime.strptime(value, self._datetime_format)
+        else:
+            try:
+                parsed = datetime.datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+            except ValueError:
+                parsed_value = pendulum.parse(value)
+                if not isinstance(parsed_value, datetime.datetime):
+                    raise ValueError(f"{value} is not a datetime")
+                parsed = parsed_value
+        # Datetimes without an offset are compared as UTC
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+
+def _to_number(value: Any) -> Union[int, float]:
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def _is_lexically_ordered(datetime_format: Optional[str]) -> bool:
+    if datetime_format is None:
+        return True
+    directives = re.findall(r"%.", datetime_format)
+    if directives and directives[-1] == "%z":
+        # The offset is part of the shape, so only values with the same offset are compared as text
+        directives = directives[:-1]
+    return bool(directives) and directives == _ORDERED_DIRECTIVES[: len(directives)]
+
+
+def _shape(value: str) -> str:
+    """The value with its digits replaced by 0, except for its offset"""
+    if value.endswith("Z"):
+        return value[:-1].translate(_DIGITS_TO_ZERO) + "Z"
+    offset_start = max(value.rfind("+"), value.rfind("-"))
+    # The date of ISO 8601 datetimes has dashes too, the offset comes after it
+    if offset_start >= 10:
+        return value[:offset_start].translate(_DIGITS_TO_ZERO) + value[offset_start:]
+    return value.translate(_DIGITS_TO_ZERO)
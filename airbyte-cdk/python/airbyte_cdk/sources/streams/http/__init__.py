@@ -5,5 +5,18 @@
 # Initialize Streams Package
 from .exceptions import UserDefinedBackoffException
 from .http import HttpStream, HttpSubStream
+from .metrics import HttpMetrics
+from .rate_limiting import AdaptiveConcurrency, RateLimiter
+from .response_cache import ResponseCache
+from .sessions import SessionRegistry
 
-__all__ = ["HttpStream", "HttpSubStream", "UserDefinedBackoffException"]
+__all__ = [
+    "AdaptiveConcurrency",
+    "HttpMetrics",
+    "HttpStream",
+    "HttpSubStream",
+    "RateLimiter",
+    "ResponseCache",
+    "SessionRegistry",
+    "UserDefinedBackoffException",
+]
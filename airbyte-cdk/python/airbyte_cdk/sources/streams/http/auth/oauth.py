@@ -9,6 +9,7 @@ import pendulum
 import requests
 from deprecated import deprecated
 
+from ..sessions import SessionRegistry
 from .core import HttpAuthenticator
 
 
@@ -17,8 +18,11 @@ class Oauth2Authenticator(HttpAuthenticator):
     """
     Generates OAuth2.0 access tokens from an OAuth2.0 refresh token and client credentials.
     The generated access token is attached to each request via the Authorization header.
+    Tokens are refreshed through session_registry, which HttpStream sets to its own registry, and with requests.request otherwise.
     """
 
+    session_registry: Optional[SessionRegistry] = None
+
     def __init__(
         self,
         token_refresh_endpoint: str,
@@ -74,7 +78,8 @@ class Oauth2Authenticator(HttpAuthenticator):
         returns a tuple of (access_token, token_lifespan_in_seconds)
         """
         try:
-            response = requests.request(
+            request = self.session_registry.request if self.session_registry else requests.request
+            response = request(
                 method="POST",
                 url=self.token_refresh_endpoint,
                 data=self.get_refresh_request_body(),
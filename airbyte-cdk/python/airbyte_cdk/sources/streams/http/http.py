@@ -5,20 +5,30 @@
 
 import logging
 import os
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Union
+from typing import Any, Iterable, List, Mapping, MutableMapping, Optional, Tuple, Union
 from urllib.parse import urljoin
 
 import requests
 import vcr
-import vcr.cassette as Cassette
 from airbyte_cdk.models import SyncMode
 from airbyte_cdk.sources.streams.core import Stream
+from airbyte_cdk.sources.utils.concurrency import ordered, prefetch
+from airbyte_cdk.sources.utils.parent_records import ParentRecordStore, project, store_key
+from deprecated.classic import deprecated
 from requests.auth import AuthBase
+from vcr.cassette import Cassette
 
 from .auth.core import HttpAuthenticator, NoAuth
+from .auth.oauth import Oauth2Authenticator
 from .exceptions import DefaultBackoffException, RequestBodyException, UserDefinedBackoffException
-from .rate_limiting import default_backoff_handler, user_defined_backoff_handler
+from .metrics import HttpMetrics
+from .payload_logging import HttpPayloadLogger, capped_text
+from .rate_limiting import AdaptiveConcurrency, RateLimiter, default_backoff_handler, user_defined_backoff_handler
+from .requests_native_auth.abstract_oauth import AbstractOauth2Authenticator
+from .response_cache import ResponseCache
+from .sessions import SessionRegistry
 
 # list of all possible HTTP methods which can be used for sending of request bodies
 BODY_REQUEST_METHODS = ("GET", "POST", "PUT", "PATCH")
@@ -33,20 +43,33 @@ class HttpStream(Stream, ABC):
 
     source_defined_cursor = True  # Most HTTP streams use a source defined cursor (i.e: the user can't configure it like on a SQL table)
     page_size: Optional[int] = None  # Use this variable to define page size for API http requests with pagination support
+    http_metrics: Optional[HttpMetrics] = None  # Set by the source to collect the metrics of the requests of the stream
 
     # TODO: remove legacy HttpAuthenticator authenticator references
-    def __init__(self, authenticator: Union[AuthBase, HttpAuthenticator] = None):
-        self._session = requests.Session()
+    def __init__(self, authenticator: Union[AuthBase, HttpAuthenticator] = None, rate_limiter: RateLimiter = None):
+        """
+        :param rate_limiter: limiter consulted before every request, share the same instance between the streams of a source
+        """
+        # Responses recorded by a VCR cassette, see cache_file, are recorded while they are sent, on connections which must not be
+        # shared with the other streams
+        registry = None if self.use_cache else self.session_registry
+        self._session = registry.session() if registry else requests.Session()
+        self._rate_limiter = rate_limiter
+        self._payload_logger: Optional[HttpPayloadLogger] = None
 
         self._authenticator: HttpAuthenticator = NoAuth()
         if isinstance(authenticator, AuthBase):
             self._session.auth = authenticator
         elif authenticator:
             self._authenticator = authenticator
+        # OAuth authenticators refresh their tokens through the pools of the first stream they authenticate
+        if isinstance(authenticator, (AbstractOauth2Authenticator, Oauth2Authenticator)) and authenticator.session_registry is None:
+            authenticator.session_registry = registry
 
+        self._response_cache: Optional[Union[ResponseCache, Cassette]] = None
+        self._cassette: Optional[Cassette] = None
         if self.use_cache:
-            self.cache_file = self.request_cache()
-            # we need this attr to get metadata about cassettes, such as record play count, all records played, etc.
+            # Deprecated, metadata of the VCR cassette for the streams which still send their requests within cache_file
             self.cassete = None
 
     @property
@@ -54,7 +77,7 @@ class HttpStream(Stream, ABC):
         """
         Override if needed. Return the name of cache file
         """
-        return f"{self.name}.yml"
+        return f"{self.name}.sqlite"
 
     @property
     def use_cache(self):
@@ -63,19 +86,44 @@ class HttpStream(Stream, ABC):
         """
         return False
 
-    def request_cache(self) -> Cassette:
+    @property
+    def response_cache(self) -> Union[ResponseCache, Cassette]:
+        """The cache of the responses of the stream returned by request_cache, opened when it is first used"""
+        if self._response_cache is None:
+            self._response_cache = self.request_cache()
+        return self._response_cache
+
+    def request_cache(self) -> ResponseCache:
         """
-        Builds VCR instance.
-        It deletes file everytime we create it, normally should be called only once.
-        We can't use NamedTemporaryFile here because yaml serializer doesn't work well with empty files.
+        Override if needed, e.g: to set a TTL or a maximum size. Builds the cache of the responses of the stream.
+        Streams with the same cache_filename share the same cache, which is emptied when it is first opened by the sync.
+
+        Returning a VCR cassette, e.g: from vcr.use_cassette, is deprecated but still supported: requests are then sent within it.
         """
+        return ResponseCache.open(self.cache_filename)
 
-        try:
-            os.remove(self.cache_filename)
-        except FileNotFoundError:
-            pass
+    @property
+    @deprecated(version="0.1.66", reason="Responses are cached by response_cache, see request_cache.")
+    def cache_file(self) -> Cassette:
+        """
+        The VCR cassette returned by request_cache, for the streams which still send their requests within it. Streams whose
+        request_cache returns a ResponseCache get a cassette recording to a YAML file named after cache_filename.
+        """
+        if self._cassette is None:
+            cache = self.response_cache
+            if isinstance(cache, ResponseCache):
+                cassette_filename = f"{os.path.splitext(self.cache_filename)[0]}.cassette.yml"
+                try:
+                    os.remove(cassette_filename)
+                except FileNotFoundError:
+                    pass
+                cache = vcr.use_cassette(cassette_filename, record_mode="new_episodes", serializer="yaml")
+            self._cassette = cache
+        return self._cassette
 
-        return vcr.use_cassette(self.cache_filename, record_mode="new_episodes", serializer="yaml")
+    @property
+    def _uses_cassette(self) -> bool:
+        return self.use_cache and not isinstance(self.response_cache, ResponseCache)
 
     @property
     @abstractmethod
@@ -116,6 +164,41 @@ class HttpStream(Stream, ABC):
     def authenticator(self) -> HttpAuthenticator:
         return self._authenticator
 
+    @property
+    def payload_logger(self) -> HttpPayloadLogger:
+        """
+        Override if needed. Logs the requests and responses of the stream when debug logging is enabled, e.g: to capture larger
+        bodies or to only log a sample of the requests.
+        """
+        if self._payload_logger is None:
+            self._payload_logger = HttpPayloadLogger(self.logger)
+        return self._payload_logger
+
+    @property
+    def session_registry(self) -> Optional[SessionRegistry]:
+        """
+        Override if needed. The registry of connection pools the session of the stream shares with the other streams of the source.
+        Return None for the stream to open its own connections.
+        """
+        return SessionRegistry.default()
+
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        """
+        Override if needed. The limiter to acquire before sending every request, None to send requests as fast as possible.
+        """
+        return self._rate_limiter
+
+    @property
+    def concurrency_controller(self) -> Optional[AdaptiveConcurrency]:
+        """
+        Override to limit the number of requests in flight when streams, slices or pages are read concurrently, e.g: with
+        AdaptiveConcurrency.for_url(self.url_base), shared by every stream sending requests to the same host. The controller judges
+        the latency of each request against the fastest responses received by the same stream.
+        By default, requests are only limited by the number of workers.
+        """
+        return None
+
     @abstractmethod
     def next_page_token(self, response: requests.Response) -> Optional[Mapping[str, Any]]:
         """
@@ -286,11 +369,28 @@ class HttpStream(Stream, ABC):
         Unexpected transient exceptions use the default backoff parameters.
         Unexpected persistent exceptions are not handled and will cause the sync to fail.
         """
-        self.logger.debug(
-            "Making outbound API request", extra={"headers": request.headers, "url": request.url, "request_body": request.body}
-        )
-        response: requests.Response = self._session.send(request, **request_kwargs)
-        self.logger.debug("Receiving response", extra={"headers": response.headers, "status": response.status_code, "body": response.text})
+        payload_logger = self.payload_logger
+        logged_request = payload_logger.log_request(request)
+        metrics = self.http_metrics
+        rate_limiter = self.rate_limiter
+        if rate_limiter:
+            waited = rate_limiter.acquire(request)
+            if metrics:
+                metrics.record_rate_limit(waited)
+        controller = self.concurrency_controller
+        started = controller.acquire() if controller else 0
+        response: Optional[requests.Response] = None
+        sent_at = time.monotonic() if metrics else 0
+        try:
+            response = self._session.send(request, **request_kwargs)
+        finally:
+            if controller:
+                controller.release(started, response, endpoint=self.name)
+            if metrics:
+                metrics.record_request(request, response, time.monotonic() - sent_at)
+        if rate_limiter:
+            rate_limiter.update(response)
+        payload_logger.log_response(response, logged_request)
         if self.should_retry(response):
             custom_backoff_time = self.backoff_time(response)
             if custom_backoff_time:
@@ -302,7 +402,7 @@ class HttpStream(Stream, ABC):
             try:
                 response.raise_for_status()
             except requests.HTTPError as exc:
-                self.logger.error(response.text)
+                self.logger.error(capped_text(response.content, payload_logger.max_body_size, response.encoding))
                 raise exc
         return response
 
@@ -334,8 +434,9 @@ class HttpStream(Stream, ABC):
         if max_tries is not None:
             max_tries = max(0, max_tries) + 1
 
-        user_backoff_handler = user_defined_backoff_handler(max_tries=max_tries)(self._send)
-        backoff_handler = default_backoff_handler(max_tries=max_tries, factor=self.retry_factor)
+        on_retry = self.http_metrics.record_retry if self.http_metrics else None
+        user_backoff_handler = user_defined_backoff_handler(max_tries=max_tries, on_retry=on_retry)(self._send)
+        backoff_handler = default_backoff_handler(max_tries=max_tries, factor=self.retry_factor, on_retry=on_retry)
         return backoff_handler(user_backoff_handler)(request, request_kwargs)
 
     @classmethod
@@ -387,6 +488,36 @@ class HttpStream(Stream, ABC):
             return self.parse_response_error_message(exception.response)
         return None
 
+    def remaining_page_tokens(self, response: requests.Response) -> Optional[List[Mapping[str, Any]]]:
+        """
+        Override when the tokens of all the pages of a slice can be known from its first response, e.g: from a total count of records.
+        The remaining pages are then requested concurrently, up to max_concurrent_pages at a time, while their records are still
+        returned in page order.
+
+        :param response: the response to the first request of the slice
+        :return: the tokens of the remaining pages, None to paginate with next_page_token instead
+        """
+        return None
+
+    @property
+    def max_concurrent_pages(self) -> int:
+        """
+        Maximum number of the pages returned by remaining_page_tokens which are requested at the same time.
+        """
+        return 1
+
+    @property
+    def prefetch_pages(self) -> int:
+        """
+        Override to request up to this many pages ahead in the background while the records of the pages already received are consumed,
+        so the network isn't idle while the records are processed. By default, the next page is only requested once the records of the
+        current page are consumed.
+
+        Pages requested ahead are parsed and their next page token is computed in the background as well: the request options,
+        parse_response and next_page_token must not rely on anything updated while records are consumed, e.g: the stream state.
+        """
+        return 0
+
     def read_records(
         self,
         sync_mode: SyncMode,
@@ -394,39 +525,115 @@ class HttpStream(Stream, ABC):
         stream_slice: Mapping[str, Any] = None,
         stream_state: Mapping[str, Any] = None,
     ) -> Iterable[Mapping[str, Any]]:
+        for records in self._read_pages(stream_slice, stream_state):
+            yield from records
+
+        # Always return an empty generator just in case no records were ever yielded
+        yield from []
+
+    def _read_pages(self, stream_slice: Mapping[str, Any] = None, stream_state: Mapping[str, Any] = None) -> Iterable[Iterable[Mapping]]:
+        """
+        Request every page of the slice and yield the records parsed from each response.
+        Unless pages are prefetched, the records of a page must be consumed before the next page is requested.
+        """
+        return (records for _, records in self._read_responses(stream_slice, stream_state))
+
+    def _read_responses(
+        self, stream_slice: Mapping[str, Any] = None, stream_state: Mapping[str, Any] = None
+    ) -> Iterable[Tuple[requests.Response, Iterable[Mapping]]]:
+        """
+        Same as _read_pages, with the response each page was parsed from. Use it rather than attributes set by parse_response, which
+        are already set by the next pages when pages are prefetched.
+        """
+        if self.prefetch_pages > 0:
+            return prefetch(self._fetch_pages(stream_slice, stream_state, prefetched=True), depth=self.prefetch_pages)
+        return self._fetch_pages(stream_slice, stream_state)
+
+    def _fetch_pages(
+        self, stream_slice: Mapping[str, Any] = None, stream_state: Mapping[str, Any] = None, prefetched: bool = False
+    ) -> Iterable[Tuple[requests.Response, Iterable[Mapping]]]:
+        pages = self._fetch_slice_pages(stream_slice, stream_state, prefetched)
+        metrics = self.http_metrics
+        if not metrics:
+            return pages
+        return self._count_pages(pages, metrics)
+
+    @staticmethod
+    def _count_pages(pages: Iterable[Any], metrics: HttpMetrics) -> Iterable[Any]:
+        count = 0
+        try:
+            for page in pages:
+                count += 1
+                yield page
+        finally:
+            metrics.record_slice(count)
+
+    def _fetch_slice_pages(
+        self, stream_slice: Mapping[str, Any] = None, stream_state: Mapping[str, Any] = None, prefetched: bool = False
+    ) -> Iterable[Tuple[requests.Response, Iterable[Mapping]]]:
         stream_state = stream_state or {}
         pagination_complete = False
 
         next_page_token = None
         while not pagination_complete:
-            request_headers = self.request_headers(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token)
-            request = self._create_prepared_request(
-                path=self.path(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token),
-                headers=dict(request_headers, **self.authenticator.get_auth_header()),
-                params=self.request_params(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token),
-                json=self.request_body_json(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token),
-                data=self.request_body_data(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token),
-            )
-            request_kwargs = self.request_kwargs(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token)
-
-            if self.use_cache:
-                # use context manager to handle and store cassette metadata
-                with self.cache_file as cass:
-                    self.cassete = cass
-                    # vcr tries to find records based on the request, if such records exist, return from cache file
-                    # else make a request and save record in cache file
-                    response = self._send_request(request, request_kwargs)
+            response = self._fetch_page(stream_slice, stream_state, next_page_token)
+            records = self.parse_response(response, stream_state=stream_state, stream_slice=stream_slice)
+            # Prefetched pages are parsed right away so the next page can be requested while the consumer processes this one
+            yield response, list(records) if prefetched else records
 
-            else:
-                response = self._send_request(request, request_kwargs)
-            yield from self.parse_response(response, stream_state=stream_state, stream_slice=stream_slice)
+            remaining_page_tokens = self.remaining_page_tokens(response) if next_page_token is None else None
+            if remaining_page_tokens is not None:
+                yield from self._fetch_remaining_pages(stream_slice, stream_state, remaining_page_tokens, prefetched)
+                return
 
             next_page_token = self.next_page_token(response)
             if not next_page_token:
                 pagination_complete = True
 
-        # Always return an empty generator just in case no records were ever yielded
-        yield from []
+    def _fetch_remaining_pages(
+        self,
+        stream_slice: Optional[Mapping[str, Any]],
+        stream_state: Mapping[str, Any],
+        page_tokens: List[Mapping[str, Any]],
+        prefetched: bool,
+    ) -> Iterable[Tuple[requests.Response, Iterable[Mapping]]]:
+        # Only the requests are sent concurrently, the responses are parsed in page order from this thread. VCR cassettes record the
+        # requests sent within them one at a time.
+        max_workers = 1 if self._uses_cassette else self.max_concurrent_pages
+        responses = ordered(page_tokens, lambda token: [self._fetch_page(stream_slice, stream_state, token)], max_workers=max_workers)
+        for _, page_responses in responses:
+            for response in page_responses:
+                records = self.parse_response(response, stream_state=stream_state, stream_slice=stream_slice)
+                yield response, list(records) if prefetched else records
+
+    def _fetch_page(
+        self, stream_slice: Optional[Mapping[str, Any]], stream_state: Mapping[str, Any], next_page_token: Optional[Mapping[str, Any]]
+    ) -> requests.Response:
+        request_headers = self.request_headers(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token)
+        request = self._create_prepared_request(
+            path=self.path(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token),
+            headers=dict(request_headers, **self.authenticator.get_auth_header()),
+            params=self.request_params(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token),
+            json=self.request_body_json(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token),
+            data=self.request_body_data(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token),
+        )
+        request_kwargs = self.request_kwargs(stream_state=stream_state, stream_slice=stream_slice, next_page_token=next_page_token)
+
+        if self.use_cache:
+            cache = self.response_cache
+            if not isinstance(cache, ResponseCache):
+                # vcr replays the response of the request if it was recorded, and records it otherwise
+                with cache as cassette:
+                    self.cassete = cassette
+                    return self._send_request(request, request_kwargs)
+            response = cache.get(request)
+            if response is None:
+                response = self._send_request(request, request_kwargs)
+                # Failed requests which were not raised, e.g: because raise_on_http_errors is False, are sent again next time
+                if response.ok:
+                    cache.put(request, response)
+            return response
+        return self._send_request(request, request_kwargs)
 
 
 class HttpSubStream(HttpStream, ABC):
@@ -437,9 +644,36 @@ class HttpSubStream(HttpStream, ABC):
         super().__init__(**kwargs)
         self.parent = parent
 
+    @property
+    def parent_fields(self) -> Optional[List[str]]:
+        """
+        Override if needed. The top level fields of the parent records used by this stream, the only ones kept in the slices and
+        stored for the other substreams of the parent. None keeps the full records.
+        """
+        return None
+
+    @property
+    def memoize_parent_records(self) -> bool:
+        """
+        Override if needed. Whether the parent records read during a sync are stored and shared with the other substreams of the same
+        parent, so the parent is only read once. Only enable it if the records of the parent don't depend on the substream reading them,
+        e.g: on its state.
+        """
+        return False
+
     def stream_slices(
         self, sync_mode: SyncMode, cursor_field: List[str] = None, stream_state: Mapping[str, Any] = None
     ) -> Iterable[Optional[Mapping[str, Any]]]:
+        parent_records: Iterable[Any]
+        if self.memoize_parent_records:
+            key = store_key(self.parent, cursor_field, self.parent_fields)
+            parent_records = ParentRecordStore.default().records(key, lambda: self._read_parent_records(cursor_field, stream_state))
+        else:
+            parent_records = self._read_parent_records(cursor_field, stream_state)
+        for record in parent_records:
+            yield {"parent": record}
+
+    def _read_parent_records(self, cursor_field: Optional[List[str]], stream_state: Optional[Mapping[str, Any]]) -> Iterable[Any]:
         parent_stream_slices = self.parent.stream_slices(
             sync_mode=SyncMode.full_refresh, cursor_field=cursor_field, stream_state=stream_state
         )
@@ -452,4 +686,4 @@ class HttpSubStream(HttpStream, ABC):
 
             # iterate over all parent records with current stream_slice
             for record in parent_records:
-                yield {"parent": record}
+                yield project(record, self.parent_fields)
@@ -0,0 +1,165 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, List, Mapping, Optional, Sequence
+
+import requests
+
+# Upper bounds, in seconds, of the buckets of the latency histogram
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Histogram:
+    """Fixed buckets histogram, percentiles are estimated as the upper bound of the bucket they fall in"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self._buckets = buckets
+        self._counts: List[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        index = 0
+        for bound in self._buckets:
+            if value <= bound:
+                break
+            index += 1
+        self._counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, ratio: float) -> float:
+        rank = ratio * self.count
+        seen = 0
+        for bound, count in zip(self._buckets, self._counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def summary(self) -> Mapping[str, Any]:
+        if not self.count:
+            return {"count": 0}
+        buckets = {f"<={bound}": count for bound, count in zip(self._buckets, self._counts) if count}
+        if self._counts[-1]:
+            buckets[f">{self._buckets[-1]}"] = self._counts[-1]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": round(self.max, 4),
+            "buckets": buckets,
+        }
+
+
+class HttpMetrics:
+    """
+    Metrics of the requests sent by a stream: latency histogram, status codes, bytes transferred, retries, time spent backing off or
+    waiting for the rate limiter, and pages read per slice.
+
+    Latencies only cover the time between sending a request and receiving its response headers, so a slow API shows as high latencies
+    while a slow connector shows as low latencies and a long sync. Metrics are logged as JSON every interval seconds, checked whenever
+    a request is recorded, and once more by log_summary at the end of the sync.
+    """
+
+    def __init__(self, stream_name: str, logger: logging.Logger, interval: Optional[float] = 60.0):
+        """
+        :param interval: number of seconds between two logs of the metrics, None to only log the summary
+        """
+        self._stream_name = stream_name
+        self._logger = logger
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._latency = _Histogram(LATENCY_BUCKETS)
+        self._pages_per_slice = _Histogram((1, 2, 5, 10, 50, 100, 1000))
+        self._status_codes: Counter = Counter()
+        self._counters = {
+            "requests": 0,
+            "errors": 0,
+            "retries": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+            "backoff_seconds": 0.0,
+            "rate_limited_seconds": 0.0,
+        }
+        self._last_logged = time.monotonic()
+
+    def record_request(self, request: requests.PreparedRequest, response: Optional[requests.Response], latency: float):
+        """
+        Record a request sent by the stream.
+        :param response: the response received, None if the request failed without a response, e.g: on a connection error
+        :param latency: number of seconds between sending the request and receiving the response
+        """
+        body = request.body or b""
+        sent = len(body.encode("utf-8") if isinstance(body, str) else body)
+        received = _response_size(response) if response is not None else 0
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["bytes_sent"] += sent
+            self._counters["bytes_received"] += received
+            if response is None:
+                self._counters["errors"] += 1
+            else:
+                self._status_codes[response.status_code] += 1
+                self._latency.add(latency)
+        self._log_periodically()
+
+    def record_retry(self, wait: float):
+        """Record a retry, after backing off for wait seconds"""
+        with self._lock:
+            self._counters["retries"] += 1
+            self._counters["backoff_seconds"] += wait
+
+    def record_rate_limit(self, wait: float):
+        """Record the number of seconds a request waited for the rate limiter"""
+        if wait:
+            with self._lock:
+                self._counters["rate_limited_seconds"] += wait
+
+    def record_slice(self, pages: int):
+        """Record the number of pages read for a slice"""
+        with self._lock:
+            self._pages_per_slice.add(pages)
+
+    def snapshot(self) -> Mapping[str, Any]:
+        with self._lock:
+            return {
+                "stream": self._stream_name,
+                **{key: round(value, 3) if isinstance(value, float) else value for key, value in self._counters.items()},
+                "status_codes": {str(status): count for status, count in sorted(self._status_codes.items())},
+                "latency_seconds": self._latency.summary(),
+                "slices": self._pages_per_slice.count,
+                "pages_per_slice": self._pages_per_slice.summary(),
+            }
+
+    def log_summary(self):
+        self._logger.info(f"HTTP metrics summary of stream {self._stream_name}: {json.dumps(self.snapshot())}")
+
+    def _log_periodically(self):
+        if self._interval is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_logged < self._interval:
+                return
+            self._last_logged = now
+        self._logger.info(f"HTTP metrics of stream {self._stream_name}: {json.dumps(self.snapshot())}")
+
+
+def _response_size(response: requests.Response) -> int:
+    # The body of streamed responses isn't downloaded yet, reading it would consume the stream the records are decoded from
+    if response._content is not False:
+        return len(response._content or b"")
+    try:
+        return int(response.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
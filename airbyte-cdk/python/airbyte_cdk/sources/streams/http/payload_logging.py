@@ -0,0 +1,112 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import itertools
+import logging
+from typing import Any, Callable, Optional, Union
+
+import requests
+
+DEFAULT_MAX_BODY_SIZE = 64 * 1024
+
+
+class LazyPayload:
+    """
+    Value of a log record extra which is only computed when the record is formatted, i.e: never if the level of the record is disabled.
+
+        logger.debug("Receiving response", extra={"body": LazyPayload(lambda: response.text)})
+    """
+
+    __slots__ = ("_produce",)
+
+    def __init__(self, produce: Callable[[], Any]):
+        self._produce = produce
+
+    def __str__(self) -> str:
+        return str(self._produce())
+
+    def __repr__(self) -> str:
+        return repr(self._produce())
+
+
+def capped_text(body: Union[bytes, str, None], max_size: int = DEFAULT_MAX_BODY_SIZE, encoding: Optional[str] = None) -> str:
+    """
+    Decode at most max_size bytes or characters of a body, mentioning how much was left out.
+    Bytes are decoded with encoding, utf-8 by default, so the body doesn't go through charset detection like response.text does.
+    """
+    if body is None:
+        return ""
+    truncated = len(body) - max_size
+    if truncated > 0:
+        body = body[:max_size]
+    text = body.decode(encoding or "utf-8", errors="replace") if isinstance(body, bytes) else body
+    return f"{text}... ({truncated} more)" if truncated > 0 else text
+
+
+def response_body(response: requests.Response, max_size: int = DEFAULT_MAX_BODY_SIZE) -> str:
+    """The body of a response capped at max_size bytes, without downloading the body of streamed responses"""
+    # requests doesn't expose whether the body was already downloaded, reading it would consume the stream the records are decoded from
+    if response._content is False:
+        return "<streamed body>"
+    return capped_text(response.content, max_size, response.encoding)
+
+
+class HttpPayloadLogger:
+    """
+    Logs the requests sent and the responses received by an HTTP stream at the debug level.
+
+    Nothing is built unless debug logging is enabled, and the headers and bodies are only serialized once the records are formatted.
+    Bodies are capped at max_body_size bytes. To keep debug logs of large syncs manageable, only a sample_rate fraction of the requests
+    is logged along with its response, e.g: 0.01 logs one request out of a hundred.
+    """
+
+    def __init__(self, logger: logging.Logger, max_body_size: int = DEFAULT_MAX_BODY_SIZE, sample_rate: float = 1.0):
+        self._logger = logger
+        self._max_body_size = max_body_size
+        self._sample_rate = sample_rate
+        self._requests = itertools.count(1)
+
+    @property
+    def max_body_size(self) -> int:
+        return self._max_body_size
+
+    def log_request(self, request: requests.PreparedRequest) -> bool:
+        """
+        Log a request if debug logging is enabled and the request is part of the sample.
+        :return: whether the request was logged, to pass to log_response
+        """
+        if not self._logger.isEnabledFor(logging.DEBUG) or not self._sampled():
+            return False
+        max_size = self._max_body_size
+        self._logger.debug(
+            "Making outbound API request",
+            extra={
+                "headers": LazyPayload(lambda: request.headers),
+                "url": request.url,
+                "request_body": LazyPayload(lambda: capped_text(request.body, max_size)),
+            },
+        )
+        return True
+
+    def log_response(self, response: requests.Response, logged_request: bool):
+        """
+        Log the response to a request logged by log_request.
+        :param logged_request: the value returned by log_request for the request of this response
+        """
+        if not logged_request:
+            return
+        max_size = self._max_body_size
+        self._logger.debug(
+            "Receiving response",
+            extra={
+                "headers": LazyPayload(lambda: response.headers),
+                "status": response.status_code,
+                "body": LazyPayload(lambda: response_body(response, max_size)),
+            },
+        )
+
+    def _sampled(self) -> bool:
+        # Deterministic sampling: a request is logged when the sample_rate fraction of the requests counted so far reaches a new integer
+        count = next(self._requests)
+        return int(count * self._sample_rate) > int((count - 1) * self._sample_rate)
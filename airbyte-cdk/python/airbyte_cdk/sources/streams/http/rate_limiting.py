@@ -3,14 +3,21 @@
 #
 
 import logging
+import re
 import sys
+import threading
 import time
-from typing import Optional
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
 
 import backoff
+import requests
 from requests import codes, exceptions
 
 from .exceptions import DefaultBackoffException, UserDefinedBackoffException
+from .payload_logging import response_body
 
 TRANSIENT_EXCEPTIONS = (
     DefaultBackoffException,
@@ -23,11 +30,17 @@ TRANSIENT_EXCEPTIONS = (
 logger = logging.getLogger("airbyte")
 
 
-def default_backoff_handler(max_tries: Optional[int], factor: float, **kwargs):
+def default_backoff_handler(max_tries: Optional[int], factor: float, on_retry: Callable[[float], None] = None, **kwargs):
+    """
+    :param on_retry: called with the number of seconds waited before every retry
+    """
+
     def log_retry_attempt(details):
+        if on_retry:
+            on_retry(details["wait"])
         _, exc, _ = sys.exc_info()
         if exc.response:
-            logger.info(f"Status code: {exc.response.status_code}, Response Content: {exc.response.content}")
+            logger.info(f"Status code: {exc.response.status_code}, Response Content: {response_body(exc.response)}")
         logger.info(
             f"Caught retryable error '{str(exc)}' after {details['tries']} tries. Waiting {details['wait']} seconds then retrying..."
         )
@@ -51,13 +64,19 @@ def default_backoff_handler(max_tries: Optional[int], factor: float, **kwargs):
     )
 
 
-def user_defined_backoff_handler(max_tries: Optional[int], **kwargs):
+def user_defined_backoff_handler(max_tries: Optional[int], on_retry: Callable[[float], None] = None, **kwargs):
+    """
+    :param on_retry: called with the number of seconds waited before every retry
+    """
+
     def sleep_on_ratelimit(details):
         _, exc, _ = sys.exc_info()
         if isinstance(exc, UserDefinedBackoffException):
             if exc.response:
-                logger.info(f"Status code: {exc.response.status_code}, Response Content: {exc.response.content}")
+                logger.info(f"Status code: {exc.response.status_code}, Response Content: {response_body(exc.response)}")
             retry_after = exc.backoff
+            if on_retry:
+                on_retry(retry_after + 1)
             logger.info(f"Retrying. Sleeping for {retry_after} seconds")
             time.sleep(retry_after + 1)  # extra second to cover any fractions of second
 
@@ -75,3 +94,258 @@ def user_defined_backoff_handler(max_tries: Optional[int], **kwargs):
         max_tries=max_tries,
         **kwargs,
     )
+
+
+@dataclass
+class _Bucket:
+    capacity: int
+    interval: float
+    tokens: float
+    updated: float
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.interval)
+        self.updated = now
+
+    def wait_time(self, weight: float) -> float:
+        """Seconds until the bucket holds enough tokens for a request of this weight"""
+        return max(0.0, (min(weight, self.capacity) - self.tokens) * self.interval / self.capacity)
+
+    def take(self, weight: float):
+        self.tokens -= min(weight, self.capacity)
+
+
+class RateLimiter:
+    """
+    Token buckets shared by all the streams of a source, consulted by HttpStream before every request so the source stays under the
+    rate limit of the API instead of backing off once it starts rejecting requests.
+
+    Every rate allows a number of requests per interval, e.g: [(10, 1), (1000, 3600)] allows bursts of 10 requests per second but no
+    more than 1000 requests per hour. Endpoints which count for more than one request are given a weight by matching a regular
+    expression against the path of their URL. The limiter also learns from the responses: it pauses until the time given by the
+    Retry-After header, and never allows more requests than what the X-RateLimit-Remaining header says is left.
+
+    Pass the same instance to every stream of the source:
+
+        rate_limiter = RateLimiter(rates=[(100, 60)], weights={r"/search$": 10})
+        return [Users(authenticator=auth, rate_limiter=rate_limiter), Search(authenticator=auth, rate_limiter=rate_limiter)]
+    """
+
+    remaining_header = "X-RateLimit-Remaining"
+    reset_header = "X-RateLimit-Reset"
+    retry_after_header = "Retry-After"
+
+    def __init__(self, rates: List[Tuple[int, float]], weights: Mapping[str, float] = None):
+        """
+        :param rates: (requests, seconds) pairs, each one allowing that many requests within every interval of that many seconds
+        :param weights: number of requests counted for a request, by regular expression searched in the path of its URL. The first
+        matching expression wins and requests to other endpoints count for 1.
+        """
+        now = time.monotonic()
+        self._buckets = [_Bucket(capacity=count, interval=seconds, tokens=count, updated=now) for count, seconds in rates]
+        self._weights = [(re.compile(pattern), weight) for pattern, weight in (weights or {}).items()]
+        self._paused_until = now
+        self._lock = threading.Lock()
+
+    def weight(self, request: requests.PreparedRequest) -> float:
+        path = urlparse(request.url).path
+        for pattern, weight in self._weights:
+            if pattern.search(path):
+                return weight
+        return 1
+
+    def acquire(self, request: requests.PreparedRequest) -> float:
+        """
+        Block until the request can be sent without exceeding any of the rates, and count it.
+        :return: the number of seconds spent waiting
+        """
+        weight = self.weight(request)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    for bucket in self._buckets:
+                        bucket.refill(now)
+                    wait = max((bucket.wait_time(weight) for bucket in self._buckets), default=0.0)
+                    if wait <= 0:
+                        for bucket in self._buckets:
+                            bucket.take(weight)
+                        return waited
+            time.sleep(wait)
+            waited += wait
+
+    def update(self, response: requests.Response):
+        """Adjust the buckets to the rate limit status the API reports in the headers of a response"""
+        retry_after = self._seconds_until(response.headers.get(self.retry_after_header), epoch=False)
+        remaining = response.headers.get(self.remaining_header)
+        try:
+            remaining = float(remaining) if remaining is not None else None
+        except ValueError:
+            remaining = None
+
+        with self._lock:
+            now = time.monotonic()
+            if remaining is not None:
+                for bucket in self._buckets:
+                    bucket.refill(now)
+                    bucket.tokens = min(bucket.tokens, remaining)
+                if remaining <= 0 and retry_after is None:
+                    retry_after = self._seconds_until(response.headers.get(self.reset_header), epoch=True)
+            if retry_after:
+                if now + retry_after > self._paused_until:
+                    logger.info(f"Rate limit reached, pausing requests for {retry_after} seconds")
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    @staticmethod
+    def _seconds_until(value: Optional[str], epoch: bool) -> Optional[float]:
+        """
+        Parse a header giving either a number of seconds to wait or a time to wait until, as an HTTP date or, if epoch is set, as
+        seconds since the epoch when the number is too large to be a delay
+        """
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+            if epoch and seconds > 10**9:
+                seconds -= time.time()
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return max(0.0, seconds)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD controller of the number of requests in flight to an API, shared by all the streams sending requests to the same host.
+
+    HttpStream acquires a slot from the controller before sending every request, so the worker threads reading streams, slices
+    or pages concurrently only send as many requests at a time as the API handles well. The limit grows by one every time a full
+    window of requests completes while at least half of the limit is used and their latency stays within latency_tolerance times
+    the fastest latency observed for their endpoint. It is multiplied by decrease_ratio when a request is throttled, i.e: 429 and
+    5XX responses or connection errors, and by latency_decrease_ratio when a response is too slow. Only the requests started after
+    the last decrease can trigger the next one, so a burst of failures of requests sent concurrently only decreases the limit once.
+
+    Each endpoint, e.g: each stream, keeps its own latency baseline, so the fast responses of a cheap endpoint don't make the
+    responses of a slow one look congested.
+    """
+
+    _controllers: Dict[str, "AdaptiveConcurrency"] = {}
+    _controllers_lock = threading.Lock()
+
+    def __init__(
+        self,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        decrease_ratio: float = 0.5,
+        latency_decrease_ratio: float = 0.9,
+        latency_tolerance: float = 2.0,
+    ):
+        """
+        :param initial_limit: number of requests allowed in flight before any response is received
+        :param min_limit: the limit never goes below this number of requests
+        :param max_limit: the limit never goes above this number of requests
+        :param decrease_ratio: factor applied to the limit when a request is throttled
+        :param latency_decrease_ratio: factor applied to the limit when a response is too slow
+        :param latency_tolerance: how many times slower than the fastest latency observed for its endpoint a response can be before it
+        is too slow
+        """
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._decrease_ratio = decrease_ratio
+        self._latency_decrease_ratio = latency_decrease_ratio
+        self._latency_tolerance = latency_tolerance
+        self._baseline_latencies: Dict[str, float] = {}
+        self._last_decrease = float("-inf")
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._metrics = {"requests": 0, "throttled": 0, "slow": 0, "increases": 0, "decreases": 0, "waits": 0, "wait_seconds": 0.0}
+
+    @classmethod
+    def for_url(cls, url: str) -> "AdaptiveConcurrency":
+        """The controller shared by every stream sending requests to the host of url"""
+        host = urlparse(url).netloc
+        with cls._controllers_lock:
+            if host not in cls._controllers:
+                cls._controllers[host] = cls()
+            return cls._controllers[host]
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def metrics(self) -> Mapping[str, Any]:
+        """
+        Current limit and number of requests in flight, with counters of the requests sent, the throttled and too slow responses,
+        the decisions to increase and decrease the limit, and the times and seconds requests waited for a slot
+        """
+        with self._condition:
+            return {"limit": self.limit, "in_flight": self._in_flight, **self._metrics}
+
+    def acquire(self) -> float:
+        """
+        Block until fewer requests than the limit are in flight.
+        :return: the time the request started, to pass to release
+        """
+        with self._condition:
+            if self._in_flight >= self.limit:
+                waiting_since = time.monotonic()
+                while self._in_flight >= self.limit:
+                    self._condition.wait()
+                self._metrics["waits"] += 1
+                self._metrics["wait_seconds"] += time.monotonic() - waiting_since
+            self._in_flight += 1
+            self._metrics["requests"] += 1
+            return time.monotonic()
+
+    def release(self, started: float, response: Optional[requests.Response], endpoint: str = ""):
+        """
+        Free the slot of a completed request and adjust the limit to its outcome.
+        :param started: the value returned by acquire for this request
+        :param response: the response received, None if the request failed without a response
+        :param endpoint: the endpoint the request was sent to, its latency is only compared to the latencies of the same endpoint
+        """
+        latency = time.monotonic() - started
+        baseline = self._baseline_latencies.get(endpoint)
+        with self._condition:
+            # The limit is only known to be sustainable if it is used, i.e: at least half of it is in flight
+            saturated = self._in_flight * 2 >= self.limit
+            self._in_flight -= 1
+            if response is None or response.status_code == codes.too_many_requests or response.status_code >= 500:
+                self._metrics["throttled"] += 1
+                self._decrease(started, self._decrease_ratio)
+            elif baseline is not None and latency > baseline * self._latency_tolerance:
+                self._metrics["slow"] += 1
+                self._decrease(started, self._latency_decrease_ratio)
+            elif saturated and self._limit < self._max_limit:
+                limit = self.limit
+                self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+                if self.limit > limit:
+                    self._metrics["increases"] += 1
+                    logger.debug(f"Increasing the number of concurrent requests to {self.limit}", extra={"concurrency": self.metrics})
+            if response is not None:
+                self._update_baseline(endpoint, latency)
+            self._condition.notify_all()
+
+    def _decrease(self, started: float, ratio: float):
+        # Requests sent before the last decrease were sent with the previous limit, they don't say anything about the current one
+        if started < self._last_decrease:
+            return
+        self._limit = max(self._min_limit, self._limit * ratio)
+        self._last_decrease = time.monotonic()
+        self._metrics["decreases"] += 1
+        logger.debug(f"Decreasing the number of concurrent requests to {self.limit}", extra={"concurrency": self.metrics})
+
+    def _update_baseline(self, endpoint: str, latency: float):
+        # The baseline follows the fastest latency, drifting slowly upwards so it adapts when the API becomes slower for good
+        baseline = self._baseline_latencies.get(endpoint)
+        if baseline is None or latency < baseline:
+            self._baseline_latencies[endpoint] = latency
+        else:
+            self._baseline_latencies[endpoint] = baseline + (latency - baseline) * 0.01
@@ -3,10 +3,12 @@
 #
 
 from abc import abstractmethod
-from typing import Any, Mapping, MutableMapping, Tuple
+from typing import Any, Mapping, MutableMapping, Optional, Tuple
 
 import pendulum
 import requests
+from airbyte_cdk.sources.streams.http.requests_native_auth.token_manager import OAuthTokenManager
+from airbyte_cdk.sources.streams.http.sessions import SessionRegistry
 from requests.auth import AuthBase
 
 
@@ -15,8 +17,14 @@ class AbstractOauth2Authenticator(AuthBase):
     Abstract class for an OAuth authenticators that implements the OAuth token refresh flow. The authenticator
     is designed to generically perform the refresh flow without regard to how config fields are get/set by
     delegating that behavior to the classes implementing the interface.
+
+    The access token is shared through an OAuthTokenManager by all the authenticators using the same credentials, and refreshed in the
+    background ahead of its expiry. Tokens are refreshed through session_registry, which HttpStream sets to its own registry, and
+    with requests.request when the authenticator has no registry.
     """
 
+    session_registry: Optional[SessionRegistry] = None
+
     def __call__(self, request):
         request.headers.update(self.get_auth_header())
         return request
@@ -25,14 +33,26 @@ class AbstractOauth2Authenticator(AuthBase):
         return {"Authorization": f"Bearer {self.get_access_token()}"}
 
     def get_access_token(self):
-        if self.token_has_expired():
-            t0 = pendulum.now()
-            token, expires_in = self.refresh_access_token()
+        token, expiry_date = self.token_manager.get_token(self.refresh_access_token)
+        if token != self.access_token:
             self.access_token = token
-            self.token_expiry_date = t0.add(seconds=expires_in)
+            self.token_expiry_date = expiry_date
 
         return self.access_token
 
+    @property
+    def token_manager(self) -> OAuthTokenManager:
+        """
+        Override if needed. The manager of the access token, shared by the authenticators with the same token endpoint, client and
+        refresh token, so streams authenticated separately don't each refresh their own token.
+        """
+        if getattr(self, "_token_manager", None) is None:
+            scopes = tuple(self.scopes or ())
+            self._token_manager = OAuthTokenManager.for_credentials(
+                self.token_refresh_endpoint, self.client_id, self.client_secret, self.refresh_token, scopes
+            )
+        return self._token_manager
+
     def token_has_expired(self) -> bool:
         return pendulum.now() > self.token_expiry_date
 
@@ -61,7 +81,8 @@ class AbstractOauth2Authenticator(AuthBase):
         returns a tuple of (access_token, token_lifespan_in_seconds)
         """
         try:
-            response = requests.request(method="POST", url=self.token_refresh_endpoint, data=self.get_refresh_request_body())
+            request = self.session_registry.request if self.session_registry else requests.request
+            response = request(method="POST", url=self.token_refresh_endpoint, data=self.get_refresh_request_body())
             response.raise_for_status()
             response_json = response.json()
             return response_json[self.access_token_name], response_json[self.expires_in_name]
@@ -0,0 +1,181 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import contextlib
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterator, Mapping, Optional, Tuple
+
+import pendulum
+
+logger = logging.getLogger("airbyte")
+
+# How long to wait before retrying a background refresh which failed, at most
+BACKGROUND_RETRY_SECONDS = 30
+
+
+class OAuthTokenManager:
+    """
+    Access token shared by the OAuth authenticators using the same credentials, whatever the stream or thread they authenticate
+    requests for.
+
+    Only one refresh runs at a time: requests needing a token while there is no valid one wait for the refresh in flight instead of
+    sending their own. Once the token enters the last refresh_before_expiry seconds of its lifetime, it is refreshed in the background,
+    by a timer or by the first request sent in that window, while requests keep using the current token. Requests therefore only wait
+    for a refresh when there is no valid token at all, e.g: at the beginning of a sync.
+
+    The managers shared by credentials are closed and dropped once the sync ends, i.e: when the last sync() running exits, which
+    AbstractSource.read opens. Their authenticators keep using them, refreshing their token when a request needs it.
+    """
+
+    _managers: Dict[str, "OAuthTokenManager"] = {}
+    _managers_lock = threading.Lock()
+    _syncs = 0
+
+    def __init__(self, refresh_before_expiry: float = 300):
+        """
+        :param refresh_before_expiry: number of seconds before its expiry the token is refreshed, at most half of its lifetime
+        """
+        self._refresh_before_expiry = refresh_before_expiry
+        self._lock = threading.Lock()
+        self._refreshed = threading.Condition(self._lock)
+        self._token: Optional[str] = None
+        self._expiry_date: Optional[pendulum.DateTime] = None
+        self._refresh_date: Optional[pendulum.DateTime] = None
+        self._refreshing = False
+        self._attempts = 0
+        self._error: Optional[BaseException] = None
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self._metrics = {"refreshes": 0, "background_refreshes": 0, "failures": 0}
+
+    @classmethod
+    def for_credentials(cls, *credentials: Hashable) -> "OAuthTokenManager":
+        """The manager shared by the authenticators using the same credentials, e.g: token endpoint, client id and refresh token"""
+        # Secrets aren't kept as keys, only their hash
+        key = hashlib.sha256(json.dumps(credentials, default=str).encode()).hexdigest()
+        with cls._managers_lock:
+            if key not in cls._managers:
+                cls._managers[key] = cls()
+            return cls._managers[key]
+
+    @classmethod
+    @contextlib.contextmanager
+    def sync(cls) -> Iterator[None]:
+        """Share the managers until the sync ends, the managers are closed and dropped once the last sync running ends"""
+        with cls._managers_lock:
+            cls._syncs += 1
+        try:
+            yield
+        finally:
+            with cls._managers_lock:
+                cls._syncs -= 1
+                managers = list(cls._managers.values()) if cls._syncs == 0 else []
+                if managers:
+                    cls._managers = {}
+            for manager in managers:
+                manager.close()
+
+    def __deepcopy__(self, memo) -> "OAuthTokenManager":
+        # Copies of the authenticators keep sharing the token
+        return self
+
+    @property
+    def metrics(self) -> Mapping[str, Any]:
+        """Number of refreshes, how many of them ran in the background, and how many failed"""
+        with self._lock:
+            return dict(self._metrics)
+
+    def get_token(self, refresh: Callable[[], Tuple[str, int]]) -> Tuple[str, pendulum.DateTime]:
+        """
+        The current access token and its expiry date, refreshed first if there is no valid token.
+        :param refresh: requests a new token, returns the token and its lifetime in seconds
+        """
+        with self._lock:
+            while True:
+                now = pendulum.now()
+                token, expiry_date, refresh_date = self._token, self._expiry_date, self._refresh_date
+                if token is not None and expiry_date is not None and now < expiry_date:
+                    if refresh_date is not None and now >= refresh_date and not self._refreshing:
+                        self._start_background_refresh(refresh)
+                    return token, expiry_date
+                if not self._refreshing:
+                    break
+                attempt = self._attempts
+                self._refreshed.wait()
+                if self._attempts != attempt and self._error is not None:
+                    raise self._error
+            self._refreshing = True
+        return self._refresh(refresh)
+
+    def close(self):
+        """Stop refreshing the token in the background, it is still refreshed when a request needs it"""
+        with self._lock:
+            self._closed = True
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+    def _refresh(self, refresh: Callable[[], Tuple[str, int]], background: bool = False) -> Tuple[str, pendulum.DateTime]:
+        """Run a refresh started by setting _refreshing, and wake up the requests waiting for it"""
+        started = pendulum.now()
+        try:
+            token, expires_in = refresh()
+        except BaseException as error:
+            with self._lock:
+                self._refreshing = False
+                self._attempts += 1
+                self._error = error
+                self._metrics["failures"] += 1
+                if background and self._expiry_date is not None:
+                    # The current token is still valid, retry later rather than on every request
+                    remaining = (self._expiry_date - pendulum.now()).total_seconds()
+                    self._refresh_date = pendulum.now().add(seconds=min(BACKGROUND_RETRY_SECONDS, max(remaining, 0) / 2))
+                self._refreshed.notify_all()
+            raise
+        with self._lock:
+            self._refreshing = False
+            self._attempts += 1
+            self._error = None
+            self._metrics["refreshes"] += 1
+            expiry_date = self._set_token(token, started, expires_in, refresh)
+            self._refreshed.notify_all()
+            return token, expiry_date
+
+    def _set_token(
+        self, token: str, started: pendulum.DateTime, expires_in: int, refresh: Callable[[], Tuple[str, int]]
+    ) -> pendulum.DateTime:
+        expiry_date: pendulum.DateTime = started.add(seconds=expires_in)
+        refresh_date: pendulum.DateTime = expiry_date.subtract(seconds=min(self._refresh_before_expiry, float(expires_in) / 2))
+        self._token, self._expiry_date, self._refresh_date = token, expiry_date, refresh_date
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        delay = (refresh_date - pendulum.now()).total_seconds()
+        # Tokens expiring immediately are refreshed by the next request rather than in a loop, closed managers by the next request
+        # in the refresh window
+        if delay > 0 and not self._closed:
+            self._timer = threading.Timer(delay, self._refresh_on_timer, args=(refresh,))
+            self._timer.daemon = True
+            self._timer.start()
+        return expiry_date
+
+    def _refresh_on_timer(self, refresh: Callable[[], Tuple[str, int]]):
+        with self._lock:
+            if not self._refreshing:
+                self._start_background_refresh(refresh)
+
+    def _start_background_refresh(self, refresh: Callable[[], Tuple[str, int]]):
+        # Called with the lock held
+        self._refreshing = True
+        self._metrics["background_refreshes"] += 1
+        threading.Thread(target=self._refresh_in_background, args=(refresh,), name="oauth-token-refresh", daemon=True).start()
+
+    def _refresh_in_background(self, refresh: Callable[[], Tuple[str, int]]):
+        try:
+            self._refresh(refresh, background=True)
+        except Exception as error:
+            logger.warning(f"Failed to refresh the access token ahead of its expiry, the current token is used until then: {error}")
@@ -0,0 +1,168 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    status_code INTEGER NOT NULL,
+    reason TEXT,
+    url TEXT NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class ResponseCache:
+    """
+    Cache of HTTP responses stored in a SQLite file, keyed by normalized request: its method, its URL with the query parameters
+    sorted, and a hash of its body. Headers are not part of the key so requests with a refreshed access token still hit the cache.
+
+    Entries expire ttl seconds after they are stored, and the least recently used ones are evicted once the bodies stored take
+    more than max_size bytes. The cache can be used from several threads at once.
+
+    Streams caching their responses in the same file share the same cache, e.g: the instances of a parent stream created for each of
+    its substreams, so the parent pages read for one substream are reused by the others. The file is emptied the first time it is
+    opened by the process so a sync never reuses the responses of a previous one.
+    """
+
+    _caches: Dict[str, "ResponseCache"] = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_size: Optional[int] = DEFAULT_MAX_SIZE):
+        """
+        :param path: the SQLite file, emptied if it exists
+        :param ttl: number of seconds a response stays in the cache, None to keep them until they are evicted
+        :param max_size: number of bytes of response bodies the cache holds before evicting the least recently used, None for no limit
+        """
+        self._path = path
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0}
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # The cache is rebuilt by every sync, durability isn't worth syncing the file to disk
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.executescript(_SCHEMA)
+        self._size = 0
+
+    @classmethod
+    def open(cls, path: str, **kwargs) -> "ResponseCache":
+        """The cache stored in path, created and emptied the first time it is opened"""
+        key = os.path.abspath(path)
+        with cls._caches_lock:
+            if key not in cls._caches:
+                cls._caches[key] = cls(path, **kwargs)
+            return cls._caches[key]
+
+    def __deepcopy__(self, memo) -> "ResponseCache":
+        # Copies of the streams using the cache keep sharing it
+        return self
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def metrics(self) -> Mapping[str, Any]:
+        """Number of requests found and not found in the cache, of evicted responses, and the size of the bodies stored"""
+        with self._lock:
+            return {**self._metrics, "size": self._size}
+
+    @staticmethod
+    def key(request: requests.PreparedRequest) -> str:
+        scheme, netloc, path, query, _ = urlsplit(request.url)
+        url = urlunsplit((scheme.lower(), netloc.lower(), path, urlencode(sorted(parse_qsl(query, keep_blank_values=True))), ""))
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body or b""
+        return hashlib.sha256(b"\n".join([request.method.upper().encode("utf-8"), url.encode("utf-8"), body])).hexdigest()
+
+    def get(self, request: requests.PreparedRequest) -> Optional[requests.Response]:
+        """The cached response to the request, None if it isn't cached or expired"""
+        key = self.key(request)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status_code, reason, url, headers, body, size, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self._ttl is not None and now - row[6] > self._ttl:
+                self._delete(key, row[5])
+                row = None
+            if not row:
+                self._metrics["misses"] += 1
+                return None
+            self._metrics["hits"] += 1
+            if self._max_size is not None:
+                self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+
+        status_code, reason, url, headers, body, _, _ = row
+        response = requests.Response()
+        response.status_code = status_code
+        response.reason = reason
+        response.url = url
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response._content = bytes(body)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.request = request
+        response.elapsed = datetime.timedelta(0)
+        return response
+
+    def put(self, request: requests.PreparedRequest, response: requests.Response):
+        """Store the response to the request, its body is downloaded if it was streamed"""
+        body = response.content or b""
+        now = time.time()
+        key = self.key(request)
+        with self._lock:
+            previous = self._connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if previous:
+                self._size -= previous[0]
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.status_code, response.reason, response.url, json.dumps(dict(response.headers)), body, len(body), now, now),
+            )
+            self._size += len(body)
+            if self._max_size is not None and self._size > self._max_size:
+                self._evict()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _evict(self):
+        while self._size > self._max_size:
+            rows = self._connection.execute("SELECT key, size FROM responses ORDER BY accessed_at LIMIT 100").fetchall()
+            if not rows:
+                return
+            for key, size in rows:
+                if self._size <= self._max_size:
+                    return
+                self._delete(key, size)
+                self._metrics["evictions"] += 1
+
+    def _delete(self, key: str, size: int):
+        self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._size -= size
@@ -0,0 +1,170 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import socket
+import threading
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import DEFAULT_POOLSIZE, BaseAdapter, HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class _CountingPoolMixin:
+    """Connection pool counting the connections it opens, including the reconnections of connections closed by the server"""
+
+    connections_opened = 0
+
+    def _new_conn(self):
+        connection = super()._new_conn()
+        connect = connection.connect
+
+        def counting_connect():
+            self.connections_opened += 1
+            connect()
+
+        connection.connect = counting_connect
+        return connection
+
+
+class _HTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _HTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter holding the connections to one base URL, counting the requests it sends"""
+
+    def __init__(self, pool_size: int, keep_alive: bool):
+        self._keep_alive = keep_alive
+        self._requests_lock = threading.Lock()
+        self.requests_sent = 0
+        super().__init__(pool_connections=1, pool_maxsize=pool_size)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self._keep_alive:
+            # Probe idle connections so the ones waiting in the pool are not silently dropped by proxies and load balancers
+            pool_kwargs["socket_options"] = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPConnectionPool, "https": _HTTPSConnectionPool}
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if not self._keep_alive:
+            request.headers["Connection"] = "close"
+        with self._requests_lock:
+            self.requests_sent += 1
+        return super().send(request, **kwargs)
+
+    @property
+    def connections_opened(self) -> int:
+        pools = self.poolmanager.pools
+        return sum(pool.connections_opened for pool in (pools.get(key) for key in pools.keys()) if pool)
+
+
+class _RegistryAdapter(BaseAdapter):
+    """Adapter mounted on every session of a registry, sending each request through the pool of its base URL"""
+
+    def __init__(self, registry: "SessionRegistry"):
+        super().__init__()
+        self._registry = registry
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        return self._registry.adapter(request.url).send(request, **kwargs)
+
+    def close(self):
+        # The pools are shared with the other sessions of the registry, they are only closed with the registry
+        pass
+
+
+class SessionRegistry:
+    """
+    Connection pools shared by the HTTP sessions of a source, one per base URL, i.e: scheme and host.
+
+    Every stream of a source gets its own session, which keeps its own authentication, headers and cookies, but sends its requests
+    through the pools of the registry. Streams reading from the same API therefore reuse the same connections instead of each
+    opening and handshaking its own.
+
+    HttpStream uses the default registry, and its OAuth authenticators refresh their tokens through the registry of the stream. A source
+    needing larger pools, e.g: because it reads many streams concurrently, overrides HttpStream.session_registry to return a registry
+    of its own shared by all its streams.
+    """
+
+    _default: Optional["SessionRegistry"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, pool_size: int = DEFAULT_POOLSIZE, keep_alive: bool = True):
+        """
+        :param pool_size: maximum number of idle connections kept open to each base URL
+        :param keep_alive: keep connections open between requests, with TCP keep-alive enabled on them. If False, every
+        connection is closed once its response is read.
+        """
+        self._pool_size = pool_size
+        self._keep_alive = keep_alive
+        self._adapters: Dict[str, _PooledAdapter] = {}
+        self._lock = threading.Lock()
+        self._registry_adapter = _RegistryAdapter(self)
+
+    @classmethod
+    def default(cls) -> "SessionRegistry":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def session(self) -> requests.Session:
+        """A new session sending its requests through the pools of the registry"""
+        session = requests.Session()
+        session.mount("https://", self._registry_adapter)
+        session.mount("http://", self._registry_adapter)
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a single request through the pools of the registry, like requests.request"""
+        return self.session().request(method=method, url=url, **kwargs)
+
+    def adapter(self, url: str) -> _PooledAdapter:
+        """The adapter holding the pool of connections to the base URL of url"""
+        parsed = urlparse(url)
+        base_url = f"{parsed.scheme}://{parsed.netloc}"
+        with self._lock:
+            if base_url not in self._adapters:
+                self._adapters[base_url] = _PooledAdapter(pool_size=self._pool_size, keep_alive=self._keep_alive)
+            return self._adapters[base_url]
+
+    @property
+    def metrics(self) -> Mapping[str, Mapping[str, Any]]:
+        """Number of requests sent, connections opened and requests sent on a reused connection, by base URL"""
+        with self._lock:
+            adapters = dict(self._adapters)
+        metrics = {}
+        for base_url, adapter in adapters.items():
+            connections = adapter.connections_opened
+            metrics[base_url] = {
+                "requests": adapter.requests_sent,
+                "connections": connections,
+                "reused_connections": max(0, adapter.requests_sent - connections),
+            }
+        return metrics
+
+    def __deepcopy__(self, memo) -> "SessionRegistry":
+        # Copies of the sessions and streams using the registry keep sharing its pools
+        return self
+
+    def __getstate__(self) -> Mapping[str, Any]:
+        # Connections and locks can't be pickled, the unpickled registry opens its own
+        return {"pool_size": self._pool_size, "keep_alive": self._keep_alive}
+
+    def __setstate__(self, state: Mapping[str, Any]):
+        SessionRegistry.__init__(self, **state)
+
+    def close(self):
+        with self._lock:
+            for adapter in self._adapters.values():
+                adapter.close()
+            self._adapters = {}
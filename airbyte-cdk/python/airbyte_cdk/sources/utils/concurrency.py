@@ -0,0 +1,186 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Iterable, Iterator, Tuple, TypeVar
+
+K = TypeVar("K")
+T = TypeVar("T")
+
+# How long a worker waits on a full output queue before re-checking whether the consumer went away
+_PUT_TIMEOUT_SECONDS = 0.1
+
+_DONE = object()
+
+
+@dataclass
+class _Failure:
+    exception: BaseException
+
+
+def _put(output: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """
+    Put an item on a bounded queue, giving up as soon as the consumer signals it stopped reading.
+    :return: True if the item was enqueued, False if the consumer stopped
+    """
+    while not stop.is_set():
+        try:
+            output.put(item, timeout=_PUT_TIMEOUT_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _drain(producer: Callable[[], Iterable[T]], output: queue.Queue, stop: threading.Event):
+    try:
+        for item in producer():
+            if not _put(output, item, stop):
+                return
+        _put(output, _DONE, stop)
+    except BaseException as exception:
+        _put(output, _Failure(exception), stop)
+
+
+def interleave(producers: Iterable[Callable[[], Iterable[T]]], max_workers: int, buffer_size: int = 1000) -> Iterator[T]:
+    """
+    Run every producer on a bounded pool of worker threads and yield their items as soon as they are produced.
+
+    Items coming from the same producer keep their relative order while items from different producers are interleaved.
+    Workers block once buffer_size items are waiting to be consumed, so memory stays bounded when the consumer is slower
+    than the producers. The first exception raised by a producer stops the other workers and is re-raised to the consumer.
+
+    :param producers: callables returning the iterables to consume, each one is called from a worker thread
+    :param max_workers: maximum number of producers consumed at the same time
+    :param buffer_size: maximum number of produced items waiting to be consumed
+    """
+    output: queue.Queue = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending = 0
+        for producer in producers:
+            executor.submit(_drain, producer, output, stop)
+            pending += 1
+
+        while pending:
+            item = output.get()
+            if item is _DONE:
+                pending -= 1
+            elif isinstance(item, _Failure):
+                raise item.exception
+            else:
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _consume(output: queue.Queue) -> Iterator[T]:
+    while True:
+        item = output.get()
+        if item is _DONE:
+            return
+        elif isinstance(item, _Failure):
+            raise item.exception
+        yield item
+
+
+def ordered(
+    inputs: Iterable[K], produce: Callable[[K], Iterable[T]], max_workers: int, buffer_size: int = 1000
+) -> Iterator[Tuple[K, Iterator[T]]]:
+    """
+    Call produce for each input on worker threads, running up to max_workers inputs ahead of the consumer, and yield every input
+    with an iterator over the items produced for it, in the order of the inputs.
+
+    Inputs are pulled lazily, so at most max_workers of them have been started but not fully consumed yet. Each yielded iterator
+    must be exhausted before the next one is requested. A worker blocks once buffer_size of its items are waiting to be consumed.
+    An exception raised while producing the items of an input is re-raised when its iterator reaches it.
+
+    :param inputs: the inputs to produce items for, e.g: the slices of a stream
+    :param produce: callable returning the items of an input, called from a worker thread
+    :param max_workers: maximum number of inputs processed at the same time
+    :param buffer_size: maximum number of produced items waiting to be consumed, per input
+    """
+    inputs = iter(inputs)
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending: Deque[Tuple[K, queue.Queue]] = deque()
+
+    def _drain_input(_input: K, output: queue.Queue):
+        _drain(lambda: produce(_input), output, stop)
+
+    try:
+        while True:
+            for _input in inputs:
+                output: queue.Queue = queue.Queue(maxsize=buffer_size)
+                executor.submit(_drain_input, _input, output)
+                pending.append((_input, output))
+                if len(pending) >= max_workers:
+                    break
+            if not pending:
+                return
+            _input, output = pending.popleft()
+            yield _input, _consume(output)
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _acquire(permits: threading.Semaphore, stop: threading.Event) -> bool:
+    """
+    Acquire a permit, giving up as soon as the consumer signals it stopped reading.
+    :return: True if the permit was acquired, False if the consumer stopped
+    """
+    while not stop.is_set():
+        if permits.acquire(timeout=_PUT_TIMEOUT_SECONDS):
+            return True
+    return False
+
+
+def _prefetch(items: Iterable[T], output: queue.Queue, permits: threading.Semaphore, stop: threading.Event):
+    iterator = iter(items)
+    try:
+        while _acquire(permits, stop):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                output.put(_DONE)
+                return
+            output.put(item)
+    except BaseException as exception:
+        output.put(_Failure(exception))
+    finally:
+        # Run the cleanup of generators from the thread which iterated over them
+        if hasattr(iterator, "close"):
+            iterator.close()
+
+
+def prefetch(items: Iterable[T], depth: int) -> Iterator[T]:
+    """
+    Iterate over items on a background thread, producing up to depth items ahead of the consumer, and yield them in order.
+
+    Useful to overlap slow producers such as network requests with the processing of the items already produced. An exception raised
+    while producing an item is re-raised to the consumer once it reaches it.
+
+    :param items: the iterable to prefetch, only iterated from the background thread
+    :param depth: maximum number of items produced but not consumed yet
+    """
+    output: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    permits = threading.Semaphore(depth)
+    worker = threading.Thread(target=_prefetch, args=(items, output, permits, stop), name="prefetch", daemon=True)
+    worker.start()
+    item: T
+    try:
+        for item in _consume(output):
+            permits.release()
+            yield item
+    finally:
+        stop.set()
+        worker.join()
@@ -0,0 +1,205 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import contextlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, BinaryIO, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+
+def store_key(parent: Any, *inputs: Any) -> str:
+    """
+    A key identifying the records of a parent stream, built from the identity of the parent, i.e: its class, name, namespace and the
+    base URL of HTTP streams, and the inputs it is read with
+    """
+    parent_type = type(parent)
+    identity = [
+        f"{parent_type.__module__}.{parent_type.__qualname__}",
+        getattr(parent, "name", None),
+        getattr(parent, "namespace", None),
+        getattr(parent, "url_base", None),
+    ]
+    return json.dumps([identity, inputs], sort_keys=True, default=str)
+
+
+def project(record: Any, fields: Optional[List[str]]) -> Any:
+    """The top level fields of a record, the full record if fields is None or the record isn't a mapping"""
+    if fields is None or not isinstance(record, Mapping):
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+class _Entry:
+    """Records of a parent stream, pickled in memory until the store runs out of memory and appended to a temporary file afterwards"""
+
+    def __init__(self, directory: Optional[str]):
+        self._directory = directory
+        self.chunks: List[bytes] = []
+        self.memory = 0
+        self.path: Optional[str] = None
+        self._file: Optional[BinaryIO] = None
+
+    def write(self, data: bytes):
+        file = self._file
+        if file is None:
+            fd, self.path = tempfile.mkstemp(prefix="parent_records_", dir=self._directory)
+            file = self._file = os.fdopen(fd, "wb")
+        file.write(data)
+
+    @property
+    def spilled(self) -> bool:
+        return self.path is not None
+
+    def seal(self):
+        if self._file is not None:
+            self._file.close()
+
+    def replay(self) -> Iterator[Any]:
+        for data in self.chunks:
+            yield pickle.loads(data)
+        if self.path:
+            with open(self.path, "rb") as file:
+                while True:
+                    try:
+                        yield pickle.load(file)
+                    except EOFError:
+                        return
+
+    def discard(self):
+        self.seal()
+        self.chunks = []
+        if self.path:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.path)
+
+
+class ParentRecordStore:
+    """
+    Records read from parent streams during a sync, shared by the substreams of the same parent which opt in so the parent is only read
+    once, see HttpSubStream.memoize_parent_records.
+
+    The records of a parent are stored once every one of them was read, so a substream which stops reading its parent early leaves
+    nothing behind. They are pickled, so every substream gets its own copy, and kept in memory until the records stored take more than
+    memory_limit bytes, after which they are written to temporary files. Substreams should only store the fields they use to keep
+    the store small.
+
+    Records are only stored while a sync is running, i.e: inside sync(), which AbstractSource.read opens on the default store, and the
+    store is emptied once the sync ends. Outside of a sync, records are read from the parent every time.
+    """
+
+    _default: Optional["ParentRecordStore"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, memory_limit: int = DEFAULT_MEMORY_LIMIT, directory: Optional[str] = None):
+        """
+        :param memory_limit: number of bytes of pickled records kept in memory before the next ones are written to disk
+        :param directory: directory of the temporary files, the system temporary directory by default
+        """
+        self._memory_limit = memory_limit
+        self._directory = directory
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._memory = 0
+        self._syncs = 0
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def default(cls) -> "ParentRecordStore":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def __deepcopy__(self, memo) -> "ParentRecordStore":
+        # Copies of the streams using the store keep sharing it
+        return self
+
+    @contextlib.contextmanager
+    def sync(self) -> Iterator["ParentRecordStore"]:
+        """Store records until the sync ends, the store is emptied once the last sync running ends"""
+        with self._lock:
+            self._syncs += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._syncs -= 1
+                if self._syncs == 0:
+                    self._clear()
+
+    @property
+    def metrics(self) -> Mapping[str, Any]:
+        """Number of parents read from the store and from their stream, and the bytes of records held in memory and on disk"""
+        with self._lock:
+            entries = list(self._entries.values())
+            memory = self._memory
+            metrics = dict(self._metrics)
+        disk = sum(os.path.getsize(entry.path) for entry in entries if entry.path)
+        return {**metrics, "memory_size": memory, "disk_size": disk}
+
+    def records(self, key: Hashable, read: Callable[[], Iterable[T]]) -> Iterator[T]:
+        """
+        Yield the records stored under key, or the records returned by read, storing them once they are all read.
+        :param key: identifies the parent and how it is read, see store_key
+        :param read: reads the records of the parent, only called if they aren't stored yet
+        """
+        with self._lock:
+            syncing = self._syncs > 0
+            entry = self._entries.get(key)
+            if syncing:
+                self._metrics["hits" if entry else "misses"] += 1
+        if not syncing:
+            yield from read()
+            return
+        if entry:
+            yield from entry.replay()
+            return
+
+        entry = _Entry(self._directory)
+        completed = False
+        try:
+            for record in read():
+                self._append(entry, pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))
+                yield record
+            completed = True
+        finally:
+            entry.seal()
+            with self._lock:
+                # Another substream may have stored the same parent meanwhile, or the sync may have ended
+                stored = completed and self._syncs > 0 and key not in self._entries
+                if stored:
+                    self._entries[key] = entry
+                else:
+                    self._memory -= entry.memory
+            if not stored:
+                entry.discard()
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _append(self, entry: _Entry, data: bytes):
+        with self._lock:
+            # Once an entry spilled, its next records go to disk too so they are replayed in order
+            in_memory = not entry.spilled and self._memory + len(data) <= self._memory_limit
+            if in_memory:
+                self._memory += len(data)
+        if in_memory:
+            entry.chunks.append(data)
+            entry.memory += len(data)
+        else:
+            entry.write(data)
+
+    def _clear(self):
+        for entry in self._entries.values():
+            self._memory -= entry.memory
+            entry.discard()
+        self._entries = {}
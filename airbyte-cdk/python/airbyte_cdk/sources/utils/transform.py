@@ -3,9 +3,10 @@
 #
 
 import logging
+from collections import OrderedDict
 from distutils.util import strtobool
 from enum import Flag, auto
-from typing import Any, Callable, Dict, Mapping, Optional
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
 
 from jsonschema import Draft7Validator, validators
 
@@ -31,28 +32,121 @@ class TransformConfig(Flag):
     CustomSchemaNormalization = auto()
 
 
+# resolved subschema of a property or of the array items, value converter compiled for it, plan of the node to descend into
+_Entry = Tuple[Dict[str, Any], Callable[[Any], Any], "_SchemaPlan"]
+
+
+class _SchemaPlan:
+    """
+    Normalization plan of a schema node: how to convert the values of the object properties or array items the node describes,
+    and the plans of the nodes to descend into afterwards. It follows the same traversal as jsonschema does with the "type",
+    "$ref", "properties" and "items" keywords.
+
+    Like jsonschema, references are only resolved when a record has a value for them, so entries are compiled on first use.
+    """
+
+    def __init__(self, compiler: "_SchemaCompiler", node: Any):
+        self._compiler = compiler
+        self._node = node
+        self._built = False
+        self.property_schemas: Dict[str, Any] = {}
+        self.items_schema: Optional[Dict[str, Any]] = None
+        self._entries: Dict[Any, _Entry] = {}
+
+    def build(self):
+        if self._built:
+            return
+        node = self._node
+        while isinstance(node, dict) and "$ref" in node:
+            node = self._compiler.resolve(node)
+        if isinstance(node, dict):
+            properties = node.get("properties")
+            if isinstance(properties, dict):
+                self.property_schemas = properties
+            items = node.get("items")
+            # Tuple validation (a list of item schemas) is not normalized
+            if isinstance(items, dict):
+                self.items_schema = items
+        self._built = True
+
+    def entry(self, key: Any, subschema: Dict[str, Any]) -> _Entry:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = self._compiler.entry(subschema)
+        return entry
+
+
+class _SchemaCompiler:
+    def __init__(self, transformer: "TypeTransformer", schema: Mapping[str, Any], validator: Any):
+        # Keep a reference to the schema so its id is not reused by another object while it is cached
+        self.schema = schema
+        self.validator = validator
+        self.transformed_records = 0
+        self._transformer = transformer
+        self._plans: Dict[int, _SchemaPlan] = {}
+        self.plan = self.node_plan(schema)
+
+    def resolve(self, subschema: Dict[str, Any]) -> Dict[str, Any]:
+        if "$ref" in subschema:
+            _, resolved = self.validator.resolver.resolve(subschema["$ref"])
+            return resolved
+        return subschema
+
+    def node_plan(self, node: Any) -> _SchemaPlan:
+        # Nodes are shared by identity so recursive references reuse the plan being built
+        plan = self._plans.get(id(node))
+        if plan is None:
+            plan = self._plans[id(node)] = _SchemaPlan(self, node)
+        return plan
+
+    def entry(self, subschema: Dict[str, Any]) -> _Entry:
+        resolved = self.resolve(subschema)
+        return resolved, self._transformer._compile_converter(resolved), self.node_plan(subschema)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return strtobool(value) == 1
+    return bool(value)
+
+
+_TYPE_CASTS: Dict[str, Callable[[Any], Any]] = {"string": str, "number": float, "integer": int, "boolean": _to_bool}
+
+
 class TypeTransformer:
     """
     Class for transforming object before output.
+
+    Each schema is compiled once into a normalization plan, cached by schema identity, which is then applied directly to the
+    records. The schema must therefore not be modified once records were transformed with it. Only the plans of the
+    MAX_COMPILED_SCHEMAS most recently used schemas are kept.
     """
 
+    MAX_COMPILED_SCHEMAS = 32
+
     _custom_normalizer: Optional[Callable[[Any, Dict[str, Any]], Any]] = None
 
-    def __init__(self, config: TransformConfig):
+    def __init__(self, config: TransformConfig, validation_sample_interval: Optional[int] = 1000):
         """
         Initialize TypeTransformer instance.
         :param config Transform config that would be applied to object
+        :param validation_sample_interval validate one transformed record out of this many against its schema, starting with the first
+        one, and log a warning for each validation error. None disables validation.
         """
         if TransformConfig.NoTransform in config and config != TransformConfig.NoTransform:
             raise Exception("NoTransform option cannot be combined with other flags.")
         self._config = config
-        all_validators = {
-            key: self.__get_normalizer(key, orig_validator)
-            for key, orig_validator in Draft7Validator.VALIDATORS.items()
-            # Do not validate field we do not transform for maximum performance.
-            if key in ["type", "array", "$ref", "properties", "items"]
-        }
-        self._normalizer = validators.create(meta_schema=Draft7Validator.META_SCHEMA, validators=all_validators)
+        self._validation_sample_interval = validation_sample_interval
+        self._compiled_schemas: "OrderedDict[int, _SchemaCompiler]" = OrderedDict()
+        # Only validate keywords we transform for maximum performance.
+        self._validator = validators.create(
+            meta_schema=Draft7Validator.META_SCHEMA,
+            validators={key: Draft7Validator.VALIDATORS[key] for key in ["type", "$ref", "properties", "items"]},
+        )
 
     def registerCustomTransform(self, normalization_callback: Callable[[Any, Dict[str, Any]], Any]) -> Callable:
         """
@@ -68,16 +162,15 @@ class TypeTransformer:
         self._custom_normalizer = normalization_callback
         return normalization_callback
 
-    def __normalize(self, original_item: Any, subschema: Dict[str, Any]) -> Any:
+    def __normalize(self, original_item: Any, subschema: Dict[str, Any], converter: Callable[[Any], Any]) -> Any:
         """
         Applies different transform function to object's field according to config.
         :param original_item original value of field.
         :param subschema part of the jsonschema containing field type/format data.
+        :param converter the default_convert function compiled for the subschema.
         :return Final field value.
         """
-        if TransformConfig.DefaultSchemaNormalization in self._config:
-            original_item = self.default_convert(original_item, subschema)
-
+        original_item = converter(original_item)
         if self._custom_normalizer:
             original_item = self._custom_normalizer(original_item, subschema)
         return original_item
@@ -118,47 +211,49 @@ class TypeTransformer:
             return original_item
         return original_item
 
-    def __get_normalizer(self, schema_key: str, original_validator: Callable):
+    def _compile_converter(self, subschema: Dict[str, Any]) -> Callable[[Any], Any]:
         """
-        Traverse through object fields using native jsonschema validator and apply normalization function.
-        :param schema_key related json schema key that currently being validated/normalized.
-        :original_validator: native jsonschema validator callback.
+        Build a function equivalent to default_convert for the given subschema, so the target type is only worked out once.
         """
+        if TransformConfig.DefaultSchemaNormalization not in self._config:
+            return _identity
+        if type(self).default_convert is not TypeTransformer.default_convert:
+            return lambda value: self.default_convert(value, subschema)
+
+        target_type = subschema.get("type", [])
+        nullable = "null" in target_type
+        if isinstance(target_type, list):
+            target_type = [t for t in target_type if t != "null"]
+            if len(target_type) != 1:
+                return _identity
+            target_type = target_type[0]
+        if target_type not in _TYPE_CASTS:
+            return _identity
+        cast = _TYPE_CASTS[target_type]
+
+        def convert(value: Any) -> Any:
+            if value is None and nullable:
+                return None
+            try:
+                return cast(value)
+            except (ValueError, TypeError):
+                return value
 
-        def normalizator(validator_instance: Callable, property_value: Any, instance: Any, schema: Dict[str, Any]):
-            """
-            Jsonschema validator callable it uses for validating instance. We
-            override default Draft7Validator to perform value transformation
-            before validation take place. We do not take any action except
-            logging warn if object does not conform to json schema, just using
-            jsonschema algorithm to traverse through object fields.
-            Look
-            https://python-jsonschema.readthedocs.io/en/stable/creating/?highlight=validators.create#jsonschema.validators.create
-            validators parameter for detailed description.
-            :
-            """
-
-            def resolve(subschema):
-                if "$ref" in subschema:
-                    _, resolved = validator_instance.resolver.resolve(subschema["$ref"])
-                    return resolved
-                return subschema
-
-            # Transform object and array values before running json schema type checking for each element.
-            if schema_key == "properties":
-                for k, subschema in property_value.items():
-                    if k in (instance or {}):
-                        subschema = resolve(subschema)
-                        instance[k] = self.__normalize(instance[k], subschema)
-            elif schema_key == "items":
-                subschema = resolve(property_value)
-                for index, item in enumerate((instance or [])):
-                    instance[index] = self.__normalize(item, subschema)
-
-            # Running native jsonschema traverse algorithm after field normalization is done.
-            yield from original_validator(validator_instance, property_value, instance, schema)
-
-        return normalizator
+        return convert
+
+    def _apply(self, plan: _SchemaPlan, instance: Any):
+        plan.build()
+        if plan.property_schemas and isinstance(instance, dict):
+            for key, subschema in plan.property_schemas.items():
+                if key in instance:
+                    resolved, converter, property_plan = plan.entry(key, subschema)
+                    value = instance[key] = self.__normalize(instance[key], resolved, converter)
+                    self._apply(property_plan, value)
+        if plan.items_schema and isinstance(instance, list):
+            resolved, converter, items_plan = plan.entry(None, plan.items_schema)
+            for index, item in enumerate(instance):
+                value = instance[index] = self.__normalize(item, resolved, converter)
+                self._apply(items_plan, value)
 
     def transform(self, record: Dict[str, Any], schema: Mapping[str, Any]):
         """
@@ -168,10 +263,26 @@ class TypeTransformer:
         """
         if TransformConfig.NoTransform in self._config:
             return
-        normalizer = self._normalizer(schema)
-        for e in normalizer.iter_errors(record):
-            """
-            just calling normalizer.validate() would throw an exception on
-            first validation occurences and stop processing rest of schema.
-            """
-            logger.warning(e.message)
+        self._transform(self._compile(schema), record)
+
+    def _compile(self, schema: Mapping[str, Any]) -> _SchemaCompiler:
+        compiled = self._compiled_schemas.get(id(schema))
+        if compiled is None or compiled.schema is not schema:
+            compiled = self._compiled_schemas[id(schema)] = _SchemaCompiler(self, schema, self._validator(schema))
+            if len(self._compiled_schemas) > self.MAX_COMPILED_SCHEMAS:
+                self._compiled_schemas.popitem(last=False)
+        self._compiled_schemas.move_to_end(id(schema))
+        return compiled
+
+    def _transform(self, compiled: _SchemaCompiler, record: Dict[str, Any]):
+        self._apply(compiled.plan, record)
+
+        interval = self._validation_sample_interval
+        if interval and compiled.transformed_records % interval == 0:
+            for e in compiled.validator.iter_errors(record):
+                """
+                just calling validator.validate() would throw an exception on
+                first validation occurences and stop processing rest of schema.
+                """
+                logger.warning(e.message)
+        compiled.transformed_records += 1
@@ -2,7 +2,8 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
-from typing import Any, List, Mapping
+import re
+from typing import Any, List, Mapping, Optional, Pattern
 
 import dpath.util
 
@@ -54,18 +55,24 @@ def get_secrets(connection_specification: Mapping[str, Any], config: Mapping[str
 
 
 __SECRETS_FROM_CONFIG: List[str] = []
+__SECRETS_MATCHER: Optional[Pattern[str]] = None
+__SHORTEST_SECRET_LENGTH = 0
 
 
 def update_secrets(secrets: List[str]):
     """Update the list of secrets to be replaced"""
-    global __SECRETS_FROM_CONFIG
+    global __SECRETS_FROM_CONFIG, __SECRETS_MATCHER, __SHORTEST_SECRET_LENGTH
+    # Empty secrets would match everywhere. Longer secrets come first so the alternation always picks the longest secret matching at
+    # a given position, e.g: "xk" rather than "x".
+    values = sorted({str(secret) for secret in secrets if str(secret)}, key=len, reverse=True)
     __SECRETS_FROM_CONFIG = secrets
+    __SHORTEST_SECRET_LENGTH = len(values[-1]) if values else 0
+    __SECRETS_MATCHER = re.compile("|".join(map(re.escape, values))) if values else None
 
 
 def filter_secrets(string: str) -> str:
-    """Filter secrets from a string by replacing them with ****"""
-    # TODO this should perform a maximal match for each secret. if "x" and "xk" are both secret values, and this method is called twice on
-    #  the input "xk", then depending on call order it might only obfuscate "*k". This is a bug.
-    for secret in __SECRETS_FROM_CONFIG:
-        string = string.replace(str(secret), "****")
-    return string
+    """Filter secrets from a string by replacing them with ****, all secrets are matched in a single pass over the string"""
+    matcher = __SECRETS_MATCHER
+    if matcher is None or len(string) < __SHORTEST_SECRET_LENGTH:
+        return string
+    return matcher.sub("****", string)
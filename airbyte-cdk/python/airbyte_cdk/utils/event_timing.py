@@ -32,12 +32,20 @@ class EventTimer:
         self.count += 1
         self.stack.insert(0, self.events[name])
 
-    def finish_event(self):
+    def finish_event(self, name: Optional[str] = None):
         """
         Finish the current event and pop it from the stack.
+        :param name: finish the named event instead of the current one, used when events run concurrently and do not nest
         """
 
-        if self.stack:
+        if name is not None:
+            event = self.events.get(name)
+            if event in self.stack:
+                self.stack.remove(event)
+                event.finish()
+            else:
+                logger.warning(f"{self.name} finish_event called for {name} without start_event")
+        elif self.stack:
             event = self.stack.pop(0)
             event.finish()
         else:
@@ -70,6 +78,9 @@ class Event:
         return float("+inf")
 
     def __str__(self):
+        if not self.end:
+            # Events overlap when streams are read concurrently, so a report may include events still in progress
+            return f"{self.name} in progress"
         return f"{self.name} {datetime.timedelta(seconds=self.duration)}"
 
     def finish(self):
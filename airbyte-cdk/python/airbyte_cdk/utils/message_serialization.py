@@ -0,0 +1,30 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import json
+
+from airbyte_cdk.models import AirbyteMessage, Type
+from pydantic.json import pydantic_encoder
+
+# Same settings as BaseModel.json() so both paths output the exact same bytes. The encoder is built once instead of on every call.
+_ENCODER = json.JSONEncoder(default=pydantic_encoder)
+
+_RECORD_MESSAGE_FIELDS = {"type", "record"}
+# Field order of AirbyteRecordMessage, which is the order BaseModel.json() outputs them in
+_RECORD_FIELDS = ("namespace", "stream", "data", "emitted_at")
+
+
+def airbyte_message_to_string(message: AirbyteMessage) -> str:
+    """
+    Serialize a message the way message.json(exclude_unset=True) does.
+
+    RECORD messages are encoded straight from their fields instead of going through pydantic's recursive dict conversion, which
+    dominates the cost of serializing records.
+    """
+    record = message.record
+    if message.type == Type.RECORD and record is not None and message.__fields_set__ == _RECORD_MESSAGE_FIELDS:
+        fields_set = record.__fields_set__
+        record_dict = {field: getattr(record, field) for field in _RECORD_FIELDS if field in fields_set}
+        return _ENCODER.encode({"type": Type.RECORD.value, "record": record_dict})
+    return message.json(exclude_unset=True)
@@ -0,0 +1,143 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import logging
+import sys
+import threading
+import time
+from typing import Any, List, Optional, TextIO
+
+
+class OutputSink:
+    """
+    Writes the serialized messages of a connector to its output in large buffered writes instead of one write per message.
+
+    The buffer is flushed once it holds buffer_size characters, once flush_interval seconds went by since the last flush, and
+    right after every message written with flush=True, e.g: STATE messages, so the platform receives them as soon as possible.
+
+    While the sink is open, print() and the log handlers writing to the same output go through the sink as well, so log lines
+    are written in the order they were emitted relative to the messages and are never interleaved with them. The flushes of the
+    handlers are left to the sink, they would otherwise flush it after every log line, while sys.stdout.flush() still flushes it.
+
+        with OutputSink(sys.stdout) as sink:
+            for message in messages:
+                sink.write_message(serialized_message, flush=message.type == Type.STATE)
+    """
+
+    def __init__(self, stream: TextIO = None, buffer_size: int = 64 * 1024, flush_interval: float = 1.0):
+        """
+        :param stream: the output to write to, sys.stdout by default
+        :param buffer_size: number of buffered characters which triggers a flush
+        :param flush_interval: maximum number of seconds output stays buffered
+        """
+        self._stream = stream or sys.stdout
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._buffered_size = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._writer = _SinkWriter(self)
+        self._handler_writer = _HandlerWriter(self)
+        self._redirected_handlers: List[logging.StreamHandler] = []
+        self._original_stdout: Optional[TextIO] = None
+
+    def write_message(self, message: str, flush: bool = False):
+        """
+        Buffer a serialized message, a newline is appended to it.
+        :param flush: flush the buffer right after the message
+        """
+        with self._lock:
+            self._append(message)
+            self._append("\n")
+            if flush or self._buffered_size >= self._buffer_size:
+                self.flush()
+
+    def write(self, text: str) -> int:
+        """Buffer raw text"""
+        with self._lock:
+            self._append(text)
+            if self._buffered_size >= self._buffer_size:
+                self.flush()
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            if self._buffer:
+                self._stream.write("".join(self._buffer))
+                self._buffer = []
+                self._buffered_size = 0
+            self._stream.flush()
+            self._last_flush = time.monotonic()
+
+    def _append(self, text: str):
+        self._buffer.append(text)
+        self._buffered_size += len(text)
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self._flush_interval):
+            with self._lock:
+                if self._buffer and time.monotonic() - self._last_flush >= self._flush_interval:
+                    self.flush()
+
+    def open(self):
+        # Log records are formatted as protocol messages by the handlers of the root logger which write to the same output
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is self._stream:
+                handler.setStream(self._handler_writer)
+                self._redirected_handlers.append(handler)
+        self._original_stdout = sys.stdout
+        if sys.stdout is self._stream:
+            sys.stdout = self._writer
+        self._closed.clear()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="output-sink-flusher", daemon=True)
+        self._flusher.start()
+
+    def close(self):
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join()
+            self._flusher = None
+        for handler in self._redirected_handlers:
+            handler.setStream(self._stream)
+        self._redirected_handlers = []
+        if sys.stdout is self._writer:
+            sys.stdout = self._original_stdout
+        self.flush()
+
+    def __enter__(self) -> "OutputSink":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _SinkWriter:
+    """
+    The output as seen by print() while the sink is open: text is written to the sink, flushes flush the sink, and other attributes,
+    e.g: encoding or fileno, are those of the output.
+    """
+
+    def __init__(self, sink: OutputSink):
+        self._sink = sink
+
+    def write(self, text: str) -> int:
+        return self._sink.write(text)
+
+    def flush(self):
+        self._sink.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._sink._stream, name)
+
+
+class _HandlerWriter(_SinkWriter):
+    """The output as seen by the log handlers while the sink is open, which leaves their flushes to the sink"""
+
+    def flush(self):
+        # StreamHandler flushes after every log record, which would defeat the buffering of the sink
+        pass
@@ -10,7 +10,7 @@ from typing import Any, Dict, Iterable, List, Mapping, Union
 from unittest.mock import ANY
 
 import pytest
-from airbyte_cdk.destinations import Destination
+from airbyte_cdk.destinations import Destination, RecordBatch
 from airbyte_cdk.models import (
     AirbyteCatalog,
     AirbyteConnectionStatus,
@@ -233,3 +233,15 @@ class TestRun:
     def test_run_cmd_with_incorrect_args_fails(self, args, destination: Destination):
         with pytest.raises(Exception):
             list(destination.run_cmd(parsed_args=argparse.Namespace(**args)))
+
+    def test_parse_input_stream_in_record_batches(self, destination: Destination):
+        destination.batch_input_records = True
+        destination.input_batch_size = 2
+        records = [_record("s1", {"id": i}) for i in range(3)]
+        state = _wrapped(_state({"s1": 2}))
+        content = "\n".join(message.json(exclude_unset=True) for message in [*map(_wrapped, records), state])
+        input_stream = io.TextIOWrapper(io.BytesIO(content.encode("utf-8")))
+
+        parsed = list(destination._parse_input_stream(input_stream))
+
+        assert parsed == [RecordBatch("s1", None, records[:2]), RecordBatch("s1", None, records[2:]), state]
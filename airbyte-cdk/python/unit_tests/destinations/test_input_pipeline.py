@@ -0,0 +1,91 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import io
+import json
+import logging
+
+import pytest
+from airbyte_cdk.destinations import RecordBatch, parse_input_messages
+from airbyte_cdk.models import AirbyteMessage, AirbyteRecordMessage, AirbyteStateMessage, Type
+
+
+def _record(stream, data, namespace=None):
+    return AirbyteMessage(type=Type.RECORD, record=AirbyteRecordMessage(stream=stream, namespace=namespace, data=data, emitted_at=1))
+
+
+def _state(data):
+    return AirbyteMessage(type=Type.STATE, state=AirbyteStateMessage(data=data))
+
+
+def _input(messages, text=False):
+    content = "\n".join(message if isinstance(message, str) else message.json(exclude_unset=True) for message in messages)
+    if text:
+        return io.StringIO(content)
+    return io.TextIOWrapper(io.BytesIO(content.encode("utf-8")), encoding="utf-8")
+
+
+@pytest.mark.parametrize("text", [False, True])
+def test_messages_are_parsed_in_order(text):
+    messages = [_record("s1", {"id": 1}), _record("s2", {"id": 2}, namespace="ns"), _state({"s1": 1}), _record("s1", {"id": 3})]
+
+    parsed = list(parse_input_messages(_input(messages, text), chunk_size=16))
+
+    assert parsed == messages
+    assert [message.json(exclude_unset=True) for message in parsed] == [message.json(exclude_unset=True) for message in messages]
+
+
+def test_invalid_messages_are_ignored(caplog):
+    lines = [
+        "not json",
+        json.dumps({"type": "RECORD", "record": {"stream": "s1", "data": {}}}),
+        json.dumps({"type": "RECORD", "record": {"stream": "s1", "data": {"id": 1}, "emitted_at": "1"}}),
+        "",
+        json.dumps([1]),
+    ]
+    with caplog.at_level(logging.INFO):
+        parsed = list(parse_input_messages(_input(lines)))
+
+    # Records with fields of the wrong type are validated, and coerced, by pydantic
+    assert parsed == [_record("s1", {"id": 1})]
+    assert sum("ignoring input which can't be deserialized as Airbyte Message" in message for message in caplog.messages) == 3
+
+
+def test_records_are_grouped_per_stream_between_states():
+    r1, r2, r3, r4, r5 = (
+        _record("s1", {"id": 1}),
+        _record("s2", {"id": 2}),
+        _record("s1", {"id": 3}),
+        _record("s1", {"id": 4}),
+        _record("s2", {"id": 5}),
+    )
+    state = _state({"s1": 4})
+
+    parsed = list(parse_input_messages(_input([r1, r2, r3, r4, state, r5]), group_records=True, batch_size=2))
+
+    assert parsed == [
+        RecordBatch("s1", None, [r1.record, r3.record]),
+        RecordBatch("s2", None, [r2.record]),
+        RecordBatch("s1", None, [r4.record]),
+        state,
+        RecordBatch("s2", None, [r5.record]),
+    ]
+    assert list(parsed[0].messages()) == [r1, r3]
+
+
+def test_streams_are_grouped_by_namespace():
+    r1, r2 = _record("s1", {"id": 1}, namespace="a"), _record("s1", {"id": 2}, namespace="b")
+
+    parsed = list(parse_input_messages(_input([r1, r2]), group_records=True))
+
+    assert parsed == [RecordBatch("s1", "a", [r1.record]), RecordBatch("s1", "b", [r2.record])]
+
+
+def test_reader_errors_are_raised_to_the_consumer():
+    class FailingInput(io.StringIO):
+        def __iter__(self):
+            raise IOError("broken pipe")
+
+    with pytest.raises(IOError, match="broken pipe"):
+        list(parse_input_messages(FailingInput()))
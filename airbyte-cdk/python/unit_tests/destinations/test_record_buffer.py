@@ -0,0 +1,139 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import random
+import threading
+import time
+
+import pytest
+from airbyte_cdk.destinations import RecordBatch, RecordBuffer
+from airbyte_cdk.models import AirbyteMessage, AirbyteRecordMessage, AirbyteStateMessage, Type
+
+
+def _record(stream, data, namespace=None):
+    return AirbyteMessage(type=Type.RECORD, record=AirbyteRecordMessage(stream=stream, namespace=namespace, data=data, emitted_at=1))
+
+
+def _state(data):
+    return AirbyteMessage(type=Type.STATE, state=AirbyteStateMessage(data=data))
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def __call__(self, batch: RecordBatch):
+        with self._lock:
+            self.batches.append((batch.namespace, batch.stream, [record.data["id"] for record in batch.records]))
+
+
+def test_streams_are_flushed_on_max_records():
+    recorder = Recorder()
+    messages = [_record("s1", {"id": 1}), _record("s2", {"id": 2}), _record("s1", {"id": 3}), _record("s1", {"id": 4}, namespace="ns")]
+
+    assert list(RecordBuffer(recorder, max_records=2).write(messages)) == []
+
+    assert recorder.batches == [(None, "s1", [1, 3]), (None, "s2", [2]), ("ns", "s1", [4])]
+
+
+def test_streams_are_flushed_on_max_bytes():
+    recorder = Recorder()
+    buffer = RecordBuffer(recorder, max_records=None, max_bytes=30)
+    # Each record takes 21 bytes
+    messages = [_record("s1", {"id": i, "pad": "x"}) for i in range(5)]
+
+    list(buffer.write(messages))
+
+    assert recorder.batches == [(None, "s1", [0, 1]), (None, "s1", [2, 3]), (None, "s1", [4])]
+    assert buffer.metrics["flushed_bytes"] == 105
+
+
+def test_streams_are_flushed_on_max_seconds(mocker):
+    recorder = Recorder()
+    monotonic = mocker.patch("airbyte_cdk.destinations.record_buffer.time.monotonic", return_value=0)
+    buffer = RecordBuffer(recorder, max_records=None, max_seconds=10)
+
+    buffer.add(_record("s1", {"id": 1}).record)
+    monotonic.return_value = 5
+    buffer.add(_record("s2", {"id": 2}).record)
+    monotonic.return_value = 10
+    buffer.add_state(_state({}))
+    buffer.close()
+
+    assert recorder.batches == [(None, "s1", [1])]
+
+
+def test_states_are_acknowledged_once_the_records_before_them_are_flushed():
+    flushed = threading.Event()
+    buffer = RecordBuffer(lambda batch: flushed.wait(5), max_records=2)
+    first_state, second_state = _state({"s1": 1}), _state({"s1": 2})
+
+    buffer.add(_record("s1", {"id": 1}).record)
+    buffer.add(_record("s1", {"id": 2}).record)
+    buffer.add_state(first_state)
+    buffer.add(_record("s1", {"id": 3}).record)
+    buffer.add_state(second_state)
+    assert buffer.acknowledged_states() == []
+
+    flushed.set()
+    for _ in range(100):
+        acknowledged = buffer.acknowledged_states()
+        if acknowledged:
+            break
+        time.sleep(0.01)
+    # The record before the second state is still buffered
+    assert acknowledged == [first_state]
+
+    buffer.flush_all()
+    assert buffer.acknowledged_states() == [second_state]
+    buffer.close()
+
+
+def test_states_are_yielded_in_order():
+    messages = [_state({"n": 0}), _record("s1", {"id": 1}), _state({"n": 1}), _record("s2", {"id": 2}), _state({"n": 2})]
+
+    acknowledged = list(RecordBuffer(Recorder(), max_records=1, max_concurrent_flushes=2).write(messages))
+
+    assert acknowledged == [message for message in messages if message.type == Type.STATE]
+
+
+def test_flushes_of_a_stream_run_in_order():
+    recorder = Recorder()
+
+    def flush(batch):
+        time.sleep(random.random() / 100)
+        recorder(batch)
+
+    messages = [_record(f"s{i % 3}", {"id": i}) for i in range(60)]
+    buffer = RecordBuffer(flush, max_records=2, max_concurrent_flushes=4)
+    list(buffer.write(messages))
+
+    for stream in ["s0", "s1", "s2"]:
+        ids = [record_id for _, batch_stream, ids in recorder.batches if batch_stream == stream for record_id in ids]
+        assert ids == sorted(ids) and len(ids) == 20
+    assert buffer.metrics["flushes"] == 30
+    assert buffer.metrics["flushed_records"] == 60
+    assert buffer.metrics["buffered_records"] == 0
+
+
+def test_failed_flushes_are_raised_and_states_are_not_acknowledged():
+    def flush(batch):
+        raise RuntimeError("destination unavailable")
+
+    acknowledged = []
+    with pytest.raises(RuntimeError, match="destination unavailable"):
+        for message in RecordBuffer(flush, max_records=1).write([_record("s1", {"id": 1}), _state({}), _record("s1", {"id": 2})]):
+            acknowledged.append(message)
+
+    assert acknowledged == []
+
+
+def test_record_batches_are_buffered():
+    recorder = Recorder()
+    batch = RecordBatch("s1", None, [_record("s1", {"id": i}).record for i in range(3)])
+
+    list(RecordBuffer(recorder, max_records=2).write([batch]))
+
+    assert recorder.batches == [(None, "s1", [0, 1]), (None, "s1", [2])]
@@ -0,0 +1,81 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import io
+import json
+
+import pytest
+import requests
+from airbyte_cdk.sources.declarative.decoders.json_stream_decoder import JsonStreamDecoder
+
+
+def streamed_response(body: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response.raw = io.BytesIO(body.encode("utf-8"))
+    return response
+
+
+@pytest.mark.parametrize(
+    "test_name, body, path, expected_records, expected_remainder",
+    [
+        ("test_array_at_root", [{"id": 1}, {"id": 2}], [], [{"id": 1}, {"id": 2}], []),
+        ("test_nested_array", {"data": {"items": [{"id": 1}, {"id": 2}]}}, ["data", "items"], [{"id": 1}, {"id": 2}], None),
+        (
+            "test_other_fields_are_kept",
+            {"meta": {"next": "cursor", "ids": [1, 2]}, "data": [{"id": 1}], "count": 1, "ok": True, "none": None},
+            ["data"],
+            [{"id": 1}],
+            {"meta": {"next": "cursor", "ids": [1, 2]}, "data": [], "count": 1, "ok": True, "none": None},
+        ),
+        ("test_empty_array", {"data": []}, ["data"], [], {"data": []}),
+        ("test_missing_path", {"other": [{"id": 1}]}, ["data"], [], {"other": [{"id": 1}]}),
+        ("test_single_object", {"data": {"id": 1}}, ["data"], [{"id": 1}], {"data": {"id": 1}}),
+        ("test_scalar", {"data": "value"}, ["data"], [], {"data": "value"}),
+        ("test_not_an_object", [1, 2], ["data"], [], [1, 2]),
+        (
+            "test_special_characters",
+            {"data": [{"text": 'with "quotes", \\ backslashes, [brackets] and {braces}', "emoji": "é☃"}, ["nested", ["array"]], 1.5e3]},
+            ["data"],
+            [{"text": 'with "quotes", \\ backslashes, [brackets] and {braces}', "emoji": "é☃"}, ["nested", ["array"]], 1500.0],
+            {"data": []},
+        ),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_decode_array(test_name, body, path, expected_records, expected_remainder, chunk_size, ensure_ascii):
+    response = streamed_response(json.dumps(body, indent=2, ensure_ascii=ensure_ascii))
+    assert list(JsonStreamDecoder(chunk_size=chunk_size).decode_array(response, path)) == expected_records
+    if expected_remainder is not None:
+        assert response.json() == expected_remainder
+
+
+def test_records_are_decoded_before_the_body_is_downloaded():
+    response = streamed_response(json.dumps({"data": [{"id": i} for i in range(1000)]}))
+    records = JsonStreamDecoder(chunk_size=16).decode_array(response, ["data"])
+    assert next(records) == {"id": 0}
+    assert response.raw.tell() < 100
+
+
+def test_body_already_downloaded():
+    response = requests.Response()
+    response._content = json.dumps({"data": [{"id": 1}]}).encode("utf-8")
+    assert list(JsonStreamDecoder().decode_array(response, ["data"])) == [{"id": 1}]
+    assert response.json() == {"data": [{"id": 1}]}
+
+
+@pytest.mark.parametrize(
+    "test_name, body",
+    [
+        ("test_truncated_document", '{"data": [{"id": 1}, {"id": '),
+        ("test_truncated_string", '{"data": [{"id": "abc'),
+        ("test_missing_separator", '{"data": [{"id": 1} {"id": 2}]}'),
+        ("test_trailing_data", '{"data": []} []'),
+    ],
+)
+def test_invalid_json(test_name, body):
+    with pytest.raises(ValueError):
+        list(JsonStreamDecoder(chunk_size=4).decode_array(streamed_response(body), ["data"]))
@@ -0,0 +1,23 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import io
+import json
+
+import requests
+from airbyte_cdk.sources.declarative.extractors.json_stream_extractor import JsonStreamExtractor
+
+
+def test_extract_records():
+    body = {"data": {"records": [{"id": 1}, {"id": 2}]}, "next_page": "cursor"}
+    response = requests.Response()
+    response.raw = io.BytesIO(json.dumps(body).encode("utf-8"))
+
+    extractor = JsonStreamExtractor(
+        ["{{ config['field'] }}", "{{ kwargs['data_field'] }}"], config={"field": "data"}, kwargs={"data_field": "records"}
+    )
+
+    assert extractor.stream_response
+    assert list(extractor.extract_records(response)) == [{"id": 1}, {"id": 2}]
+    assert response.json() == {"data": {"records": []}, "next_page": "cursor"}
@@ -5,6 +5,7 @@
 import datetime
 
 import pytest
+from airbyte_cdk.sources.declarative.interpolation import jinja
 from airbyte_cdk.sources.declarative.interpolation.jinja import JinjaInterpolation
 
 interpolation = JinjaInterpolation()
@@ -78,3 +79,31 @@ def test_macros(test_name, s, expected_value):
     config = {}
     val = interpolation.eval(s, config)
     assert val == expected_value
+
+
+def test_templates_are_compiled_once(mocker):
+    from_string = mocker.spy(jinja._environment, "from_string")
+    s = "{{ config['cached'] }}"
+    assert [JinjaInterpolation().eval(s, {"cached": i}) for i in range(3)] == [0, 1, 2]
+    assert from_string.call_count <= 1
+
+
+@pytest.mark.parametrize(
+    "test_name, s, expected_value",
+    [
+        ("test_static_string", "static value", "static value"),
+        ("test_static_string_with_trailing_newline", "static value\n", "static value"),
+        ("test_static_number", "42", 42),
+        ("test_static_list", "[1, 2]", [1, 2]),
+        ("test_string_which_is_not_a_literal", "2022-01-01", "2022-01-01"),
+        ("test_static_negative_number", "-1", -1),
+    ],
+)
+def test_static_strings(test_name, s, expected_value):
+    assert interpolation.eval(s, {}) == expected_value
+
+
+def test_literal_eval_is_skipped_for_outputs_which_are_not_literals(mocker):
+    literal_eval = mocker.spy(jinja.ast, "literal_eval")
+    assert interpolation.eval("{{ config['name'] }}", {"name": "airbyte"}) == "airbyte"
+    literal_eval.assert_not_called()
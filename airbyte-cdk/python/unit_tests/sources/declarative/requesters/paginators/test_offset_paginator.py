@@ -2,6 +2,9 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
+import json
+
+import pytest
 import requests
 from airbyte_cdk.sources.declarative.requesters.paginators.offset_paginator import OffsetPaginator
 from airbyte_cdk.sources.declarative.states.dict_state import DictState
@@ -45,3 +48,30 @@ def test_return_next_offset_limit_2():
 
     next_page_token = paginator.next_page_token(response, [{"id": 2}])
     assert next_page_token is None
+
+
+def test_remaining_page_tokens_from_total_count():
+    paginator = OffsetPaginator(2, DictState(), tag, total_count_pointer=["meta", "total"], max_concurrent_pages=3)
+    first_response = requests.Response()
+    first_response._content = json.dumps({"meta": {"total": 7}, "data": last_responses}).encode("utf-8")
+
+    assert paginator.remaining_page_tokens(first_response, last_responses) == [{tag: 2}, {tag: 4}, {tag: 6}]
+    assert paginator._get_offset() == 6
+    assert paginator.max_concurrent_pages == 3
+
+
+@pytest.mark.parametrize(
+    "test_name, total_count_pointer, body, records",
+    [
+        ("test_no_total_count_pointer", None, {"meta": {"total": 7}}, last_responses),
+        ("test_total_count_is_missing", ["meta", "total"], {"meta": {}}, last_responses),
+        ("test_total_count_is_not_a_number", ["meta", "total"], {"meta": {"total": "many"}}, last_responses),
+        ("test_last_page", ["meta", "total"], {"meta": {"total": 7}}, [{"id": 0}]),
+    ],
+)
+def test_no_remaining_page_tokens(test_name, total_count_pointer, body, records):
+    paginator = OffsetPaginator(2, DictState(), tag, total_count_pointer=total_count_pointer)
+    first_response = requests.Response()
+    first_response._content = json.dumps(body).encode("utf-8")
+
+    assert paginator.remaining_page_tokens(first_response, records) is None
@@ -47,6 +47,7 @@ def test_http_requester():
         request_options_provider=request_options_provider,
         authenticator=authenticator,
         error_handler=error_handler,
+        use_cache=True,
         config=config,
     )
 
@@ -58,3 +59,5 @@ def test_http_requester():
     assert requester.request_body_data(stream_state={}, stream_slice=None, next_page_token=None) == request_body_data
     assert requester.request_body_json(stream_state={}, stream_slice=None, next_page_token=None) == request_body_json
     assert requester.should_retry(requests.Response()) == should_retry
+    assert requester.use_cache
+    assert requester.cache_filename == "stream_name.sqlite"
@@ -2,7 +2,7 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import airbyte_cdk.sources.declarative.requesters.error_handlers.response_status as response_status
 import pytest
@@ -12,6 +12,8 @@ from airbyte_cdk.sources.declarative.requesters.error_handlers.response_action i
 from airbyte_cdk.sources.declarative.requesters.error_handlers.response_status import ResponseStatus
 from airbyte_cdk.sources.declarative.requesters.requester import HttpMethod
 from airbyte_cdk.sources.declarative.retrievers.simple_retriever import SimpleRetriever
+from airbyte_cdk.sources.declarative.states.dict_state import DictState
+from airbyte_cdk.sources.streams.http import HttpStream
 
 primary_key = "pk"
 records = [{"id": 1}, {"id": 2}]
@@ -28,6 +30,7 @@ def test_simple_retriever():
 
     record_selector = MagicMock()
     record_selector.select_records.return_value = records
+    record_selector.stream_response = False
 
     iterator = MagicMock()
     stream_slices = [{"date": "2022-01-01"}, {"date": "2022-01-02"}]
@@ -166,3 +169,77 @@ def test_backoff_time(test_name, response_action, retry_in, expected_backoff_tim
             assert False
         except ValueError:
             pass
+
+
+def test_read_pages():
+    record_selector = MagicMock()
+    state = MagicMock()
+    state.get_stream_state.return_value = {}
+    retriever = SimpleRetriever(
+        "stream_name", primary_key, requester=MagicMock(), paginator=MagicMock(), record_selector=record_selector, state=state
+    )
+    retriever._state = state
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}]]
+    responses = [MagicMock(), MagicMock()]
+
+    with patch.object(HttpStream, "_read_responses", return_value=iter(zip(responses, pages))):
+        assert list(retriever.read_pages(SyncMode.full_refresh, stream_slice={"date": "2022-01-01"})) == pages
+
+    updates = [(c.kwargs["last_record"], c.kwargs["last_response"]) for c in state.update_state.call_args_list if "last_record" in c.kwargs]
+    # each record is tracked with the response of its own page, even if later pages were already requested
+    assert updates == [({"id": 1}, responses[0]), ({"id": 2}, responses[0]), ({"id": 3}, responses[1])]
+
+
+def test_read_pages_state_only_covers_emitted_pages():
+    state = DictState({"id": "{{ last_record['id'] }}"})
+    retriever = SimpleRetriever(
+        "stream_name", primary_key, requester=MagicMock(), paginator=MagicMock(), record_selector=MagicMock(), state=state
+    )
+    pages = [[{"id": 1}, {"id": 2}], [{"id": 3}]]
+
+    with patch.object(HttpStream, "_read_responses", return_value=iter((MagicMock(), page) for page in pages)):
+        read_pages = retriever.read_pages(SyncMode.incremental, stream_slice={})
+        assert next(read_pages) == pages[0]
+        assert retriever.state == {}
+        assert next(read_pages) == pages[1]
+        assert retriever.state == {"id": 2}
+        assert list(read_pages) == []
+        assert retriever.state == {"id": 3}
+
+
+def test_streamed_records():
+    requester = MagicMock()
+    requester.request_kwargs.return_value = {"kwarg": "value"}
+    requester.should_retry.return_value = response_status.SUCCESS
+    record_selector = MagicMock()
+    record_selector.stream_response = True
+    record_selector.select_records.return_value = iter(records)
+    retriever = SimpleRetriever("stream_name", primary_key, requester=requester, paginator=MagicMock(), record_selector=record_selector)
+
+    assert retriever.request_kwargs(None, None, None) == {"kwarg": "value", "stream": True}
+
+    parsed_records = retriever.parse_response(requests.Response(), stream_state={})
+    assert retriever._last_records == []
+    assert list(parsed_records) == records
+    assert retriever._last_records == records
+
+
+def test_prefetch_pages():
+    requester = MagicMock()
+    assert SimpleRetriever("stream_name", primary_key, requester=requester, record_selector=MagicMock()).prefetch_pages == 0
+    assert (
+        SimpleRetriever("stream_name", primary_key, requester=requester, record_selector=MagicMock(), prefetch_pages=2).prefetch_pages == 2
+    )
+
+
+def test_remaining_page_tokens_come_from_the_paginator():
+    paginator = MagicMock()
+    paginator.remaining_page_tokens.return_value = [{"offset": 10}]
+    paginator.max_concurrent_pages = 4
+    retriever = SimpleRetriever("stream_name", primary_key, requester=MagicMock(), record_selector=MagicMock(), paginator=paginator)
+    retriever._last_records = records
+    response = requests.Response()
+
+    assert retriever.remaining_page_tokens(response) == [{"offset": 10}]
+    paginator.remaining_page_tokens.assert_called_once_with(response, records)
+    assert retriever.max_concurrent_pages == 4
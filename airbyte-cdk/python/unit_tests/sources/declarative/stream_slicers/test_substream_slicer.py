@@ -9,6 +9,7 @@ from airbyte_cdk.models import SyncMode
 from airbyte_cdk.sources.declarative.states.dict_state import DictState
 from airbyte_cdk.sources.declarative.stream_slicers.substream_slicer import SubstreamSlicer
 from airbyte_cdk.sources.streams.core import Stream
+from airbyte_cdk.sources.utils.parent_records import ParentRecordStore
 
 parent_records = [{"id": 1, "data": "data1"}, {"id": 2, "data": "data2"}]
 more_records = [{"id": 10, "data": "data10", "slice": "second_parent"}, {"id": 20, "data": "data20", "slice": "second_parent"}]
@@ -104,3 +105,46 @@ def test_substream_slicer(test_name, parent_streams, slice_definition, expected_
     slicer = SubstreamSlicer(parent_streams, state, slice_definition)
     slices = [s for s in slicer.stream_slices(SyncMode.incremental, stream_state=None)]
     assert slices == expected_slices
+
+
+class CountingMockStream(MockStream):
+    reads = 0
+
+    def read_records(self, *args, **kwargs) -> Iterable[Mapping[str, Any]]:
+        CountingMockStream.reads += 1
+        yield from super().read_records(*args, **kwargs)
+
+
+def test_substream_slicers_share_their_parent_records_during_a_sync():
+    CountingMockStream.reads = 0
+    slicers = [
+        SubstreamSlicer(
+            [CountingMockStream(parent_slices, all_parent_data, "first_stream")], DictState(), slice_definition, memoize_parent_records=True
+        )
+        for _ in range(3)
+    ]
+    with ParentRecordStore.default().sync():
+        slices = [list(slicer.stream_slices(SyncMode.full_refresh, stream_state=None)) for slicer in slicers]
+
+    assert slices[0] == slices[1] == slices[2]
+    assert slices[0][-1] == {"parent_slice": "third", "first_stream_id": None}
+    assert CountingMockStream.reads == len(parent_slices)
+
+
+def test_substream_slicer_projects_parent_records():
+    state = DictState()
+    slicer = SubstreamSlicer([MockStream([{}], parent_records, "first_stream")], state, slice_definition, parent_fields=["id"])
+
+    assert [s["first_stream_id"] for s in slicer.stream_slices(SyncMode.full_refresh, stream_state=None)] == [1, 2]
+    assert state.get_state("parent_record") == {"id": 2}
+
+
+def test_substream_slicer_reads_the_parent_every_time_by_default():
+    CountingMockStream.reads = 0
+    parent = CountingMockStream([{}], parent_records, "first_stream")
+    slicer = SubstreamSlicer([parent], DictState(), slice_definition)
+    with ParentRecordStore.default().sync():
+        list(slicer.stream_slices(SyncMode.full_refresh, stream_state=None))
+        list(slicer.stream_slices(SyncMode.full_refresh, stream_state=None))
+
+    assert CountingMockStream.reads == 2
@@ -8,6 +8,7 @@ from unittest.mock import MagicMock, call
 from airbyte_cdk.models import SyncMode
 from airbyte_cdk.sources.declarative.declarative_stream import DeclarativeStream
 from airbyte_cdk.sources.declarative.transformations import RecordTransformation
+from airbyte_cdk.sources.streams import CheckpointPolicy
 
 
 def test():
@@ -26,11 +27,11 @@ def test():
 
     retriever = MagicMock()
     retriever.state = state
-    retriever.read_records.return_value = records
+    retriever.read_pages.return_value = [records]
     retriever.stream_slices.return_value = stream_slices
 
     no_op_transform = mock.create_autospec(spec=RecordTransformation)
-    no_op_transform.transform = MagicMock(side_effect=lambda x: x)
+    no_op_transform.transform_batch = MagicMock(side_effect=lambda x: x)
     transformations = [no_op_transform]
 
     stream = DeclarativeStream(
@@ -52,6 +53,48 @@ def test():
     assert stream.stream_slices(sync_mode=SyncMode.incremental, cursor_field=cursor_field, stream_state=None) == stream_slices
     assert stream.state_checkpoint_interval == checkpoint_interval
     for transformation in transformations:
-        assert len(transformation.transform.call_args_list) == len(records)
-        expected_calls = [call(record) for record in records]
-        transformation.transform.assert_has_calls(expected_calls, any_order=False)
+        transformation.transform_batch.assert_called_once_with(records)
+
+
+def test_read_records_without_transformations():
+    records = [{"pk": 1234, "field": "value"}, {"pk": 4567, "field": "different_value"}]
+    retriever = MagicMock()
+    retriever.read_records.return_value = records
+
+    stream = DeclarativeStream(name="stream", primary_key="pk", schema_loader=MagicMock(), retriever=retriever)
+
+    assert list(stream.read_records(SyncMode.full_refresh, None, None, None)) == records
+    retriever.read_pages.assert_not_called()
+
+
+def test_transformations_are_applied_per_page():
+    pages = [[{"pk": 1}, {"pk": 2}], [{"pk": 3}]]
+    retriever = MagicMock()
+    retriever.read_pages.return_value = pages
+    first = mock.create_autospec(spec=RecordTransformation)
+    first.transform_batch = MagicMock(side_effect=lambda records: [dict(r, first=True) for r in records])
+    second = mock.create_autospec(spec=RecordTransformation)
+    second.transform_batch = MagicMock(side_effect=lambda records: [dict(r, second=True) for r in records])
+
+    stream = DeclarativeStream(
+        name="stream", primary_key="pk", schema_loader=MagicMock(), retriever=retriever, transformations=[first, second]
+    )
+
+    assert list(stream.read_records(SyncMode.full_refresh, None, None, None)) == [
+        {"pk": 1, "first": True, "second": True},
+        {"pk": 2, "first": True, "second": True},
+        {"pk": 3, "first": True, "second": True},
+    ]
+    assert first.transform_batch.call_args_list == [call(page) for page in pages]
+    assert second.transform_batch.call_count == len(pages)
+
+
+def test_checkpoint_policy():
+    policy = CheckpointPolicy(every_bytes=1000)
+    stream = DeclarativeStream(
+        name="stream", primary_key="pk", schema_loader=MagicMock(), retriever=MagicMock(), checkpoint_interval=10, checkpoint_policy=policy
+    )
+    assert stream.checkpoint_policy is policy
+
+    stream = DeclarativeStream(name="stream", primary_key="pk", schema_loader=MagicMock(), retriever=MagicMock(), checkpoint_interval=10)
+    assert stream.checkpoint_policy.every_records == 10
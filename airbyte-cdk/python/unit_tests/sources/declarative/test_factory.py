@@ -26,6 +26,7 @@ from airbyte_cdk.sources.declarative.schema.json_schema import JsonSchema
 from airbyte_cdk.sources.declarative.stream_slicers.datetime_stream_slicer import DatetimeStreamSlicer
 from airbyte_cdk.sources.declarative.transformations import AddFields, RemoveFields
 from airbyte_cdk.sources.declarative.transformations.add_fields import AddedFieldDefinition
+from airbyte_cdk.sources.streams import CheckpointPolicy
 from airbyte_cdk.sources.streams.http.requests_native_auth.token import TokenAuthenticator
 
 factory = DeclarativeComponentFactory()
@@ -425,3 +426,21 @@ class TestCreateTransformations:
         assert isinstance(component, DeclarativeStream)
         expected = [AddFields([AddedFieldDefinition(["field1"], "static_value")])]
         assert expected == component._transformations
+
+    def test_checkpoint_policy(self):
+        content = f"""
+        the_stream:
+            type: DeclarativeStream
+            options:
+                {self.base_options}
+                checkpoint_policy:
+                    every_seconds: 60
+                    every_bytes: 1000000
+                    on_slices: false
+        """
+        config = parser.parse(content)
+        component = factory.create_component(config["the_stream"], input_config)()
+        assert isinstance(component, DeclarativeStream)
+        policy = component.checkpoint_policy
+        assert isinstance(policy, CheckpointPolicy)
+        assert (policy.every_records, policy.every_seconds, policy.every_bytes, policy.on_slices) == (None, 60, 1000000, False)
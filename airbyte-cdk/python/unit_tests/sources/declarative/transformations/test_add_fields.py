@@ -3,8 +3,10 @@
 #
 
 from typing import Any, List, Mapping, Tuple
+from unittest.mock import patch
 
 import pytest
+from airbyte_cdk.sources.declarative.interpolation.interpolated_string import InterpolatedString
 from airbyte_cdk.sources.declarative.transformations import AddFields
 from airbyte_cdk.sources.declarative.transformations.add_fields import AddedFieldDefinition
 from airbyte_cdk.sources.declarative.types import FieldPointer
@@ -108,3 +110,42 @@ def test_add_fields(
 ):
     inputs = [AddedFieldDefinition(v[0], v[1]) for v in field]
     assert AddFields(inputs).transform(input_record, **kwargs) == expected
+
+
+def test_add_fields_batch():
+    fields = [
+        AddedFieldDefinition(["shop"], "{{ config.shop }}"),
+        AddedFieldDefinition(["tags"], "['a', 'b']"),
+        AddedFieldDefinition(["nested", "id"], "{{ record.id }}"),
+        AddedFieldDefinition(["start_date"], "{{ stream_slice.start_date }}"),
+    ]
+    records = [{"id": 1}, {"id": 2, "nested": {"k": "v"}}]
+
+    transformed = AddFields(fields).transform_batch(records, config={"shop": "in-n-out"}, stream_slice={"start_date": "oct1"})
+
+    assert transformed == [
+        {"id": 1, "shop": "in-n-out", "tags": ["a", "b"], "nested": {"id": 1}, "start_date": "oct1"},
+        {"id": 2, "shop": "in-n-out", "tags": ["a", "b"], "nested": {"k": "v", "id": 2}, "start_date": "oct1"},
+    ]
+    # values evaluated once per page are not shared between records
+    assert transformed[0]["tags"] is not transformed[1]["tags"]
+
+
+def test_add_fields_batch_evaluates_page_values_once():
+    page_value = InterpolatedString("{{ config.shop }}")
+    record_value = InterpolatedString("{{ record.id }}")
+    macro_value = InterpolatedString("{{ today_utc() }}")
+    fields = [
+        AddedFieldDefinition(["shop"], page_value),
+        AddedFieldDefinition(["k"], record_value),
+        AddedFieldDefinition(["d"], macro_value),
+    ]
+    records = [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    with patch.object(InterpolatedString, "eval", autospec=True, side_effect=lambda self, config, **kwargs: "value") as eval_mock:
+        AddFields(fields).transform_batch(records, config={"shop": "in-n-out"})
+
+    evaluated = [c.args[0] for c in eval_mock.call_args_list]
+    assert evaluated.count(page_value) == 1
+    assert evaluated.count(record_value) == len(records)
+    assert evaluated.count(macro_value) == len(records)
@@ -46,3 +46,14 @@ from airbyte_cdk.sources.declarative.types import FieldPointer
 def test_remove_fields(input_record: Mapping[str, Any], field_pointers: List[FieldPointer], expected: Mapping[str, Any]):
     transformation = RemoveFields(field_pointers)
     assert transformation.transform(input_record) == expected
+
+
+def test_remove_fields_batch():
+    records = [{"k1": "v", "k2": {"k3": "v", "k4": "v"}}, {"k1": "v", "k2": "not an object"}, {"k5": "v"}]
+    transformation = RemoveFields([["k1"], ["k2", "k3"], ["k*"]])
+    assert transformation.transform_batch(records) == [{}, {}, {}]
+
+
+def test_remove_fields_with_glob():
+    transformation = RemoveFields([["k2", "*"]])
+    assert transformation.transform({"k1": "v", "k2": {"k3": "v", "k4": "v"}}) == {"k1": "v", "k2": {}}
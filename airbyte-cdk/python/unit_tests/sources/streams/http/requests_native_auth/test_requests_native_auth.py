@@ -5,8 +5,10 @@
 import logging
 
 import pendulum
+import pytest
 import requests
 from airbyte_cdk.sources.streams.http.requests_native_auth import MultipleTokenAuthenticator, Oauth2Authenticator, TokenAuthenticator
+from airbyte_cdk.sources.streams.http.requests_native_auth.token_manager import OAuthTokenManager
 from requests import Response
 
 LOGGER = logging.getLogger(__name__)
@@ -14,6 +16,13 @@ LOGGER = logging.getLogger(__name__)
 resp = Response()
 
 
+@pytest.fixture(autouse=True)
+def token_managers():
+    # Authenticators with the same credentials share their token during a sync, each test runs in its own sync
+    with OAuthTokenManager.sync():
+        yield
+
+
 def test_token_authenticator():
     """
     Should match passed in token, no matter how many times token is retrieved.
@@ -151,6 +160,23 @@ class TestOauth2Authenticator:
 
         assert {"Authorization": "Bearer access_token"} == prepared_request.headers
 
+    def test_authenticators_with_the_same_credentials_share_their_token(self, mocker):
+        refresh = mocker.patch.object(Oauth2Authenticator, "refresh_access_token", return_value=("access_token", 1000))
+        authenticators = [
+            Oauth2Authenticator(
+                token_refresh_endpoint=TestOauth2Authenticator.refresh_endpoint,
+                client_id=TestOauth2Authenticator.client_id,
+                client_secret=TestOauth2Authenticator.client_secret,
+                refresh_token=refresh_token,
+            )
+            for refresh_token in [TestOauth2Authenticator.refresh_token, TestOauth2Authenticator.refresh_token, "other_refresh_token"]
+        ]
+
+        assert [authenticator.get_access_token() for authenticator in authenticators] == ["access_token"] * 3
+        assert authenticators[0].token_manager is authenticators[1].token_manager is not authenticators[2].token_manager
+        assert refresh.call_count == 2
+        assert authenticators[1].token_expiry_date == authenticators[0].token_expiry_date
+
 
 def mock_request(method, url, data):
     if url == "refresh_end":
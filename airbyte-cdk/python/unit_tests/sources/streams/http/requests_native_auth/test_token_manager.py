@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pendulum
+import pytest
+from airbyte_cdk.sources.streams.http.requests_native_auth.token_manager import OAuthTokenManager
+
+
+class TokenEndpoint:
+    def __init__(self, expires_in=1000, block=False):
+        self.expires_in = expires_in
+        self.calls = 0
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+        self.error = None
+
+    def refresh(self):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return f"token_{self.calls}", self.expires_in
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_token_is_reused_until_its_expiry():
+    endpoint = TokenEndpoint()
+    manager = OAuthTokenManager()
+
+    token, expiry_date = manager.get_token(endpoint.refresh)
+    assert manager.get_token(endpoint.refresh) == (token, expiry_date) == ("token_1", expiry_date)
+    assert pendulum.now().add(seconds=990) < expiry_date <= pendulum.now().add(seconds=1000)
+    assert endpoint.calls == 1
+
+
+def test_concurrent_requests_share_a_single_refresh():
+    endpoint = TokenEndpoint(block=True)
+    manager = OAuthTokenManager()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(manager.get_token, endpoint.refresh) for _ in range(8)]
+        wait_for(lambda: endpoint.calls == 1)
+        endpoint.release.set()
+        tokens = {future.result()[0] for future in futures}
+
+    assert tokens == {"token_1"}
+    assert endpoint.calls == 1
+
+
+def test_requests_waiting_for_a_failed_refresh_fail_too():
+    endpoint = TokenEndpoint(block=True)
+    endpoint.error = ValueError("invalid_grant")
+    manager = OAuthTokenManager()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(manager.get_token, endpoint.refresh) for _ in range(4)]
+        wait_for(lambda: endpoint.calls == 1)
+        time.sleep(0.05)
+        endpoint.release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+    assert endpoint.calls == 1
+    assert manager.metrics["failures"] == 1
+
+
+def test_token_is_refreshed_in_the_background_ahead_of_its_expiry():
+    endpoint = TokenEndpoint(expires_in=1)
+    manager = OAuthTokenManager(refresh_before_expiry=0.8)
+    assert manager.get_token(endpoint.refresh)[0] == "token_1"
+
+    endpoint.release.clear()
+    wait_for(lambda: endpoint.calls == 2)
+    # Requests keep using the current token while it is refreshed
+    assert manager.get_token(endpoint.refresh)[0] == "token_1"
+
+    endpoint.release.set()
+    wait_for(lambda: manager.metrics["refreshes"] == 2)
+    assert manager.get_token(endpoint.refresh)[0] == "token_2"
+    assert manager.metrics["background_refreshes"] >= 1
+    manager.close()
+
+
+def test_failed_background_refresh_keeps_the_current_token():
+    endpoint = TokenEndpoint(expires_in=2)
+    manager = OAuthTokenManager(refresh_before_expiry=1.8)
+    manager.get_token(endpoint.refresh)
+
+    endpoint.error = ValueError("unavailable")
+    wait_for(lambda: manager.metrics["failures"] == 1)
+
+    assert manager.get_token(endpoint.refresh)[0] == "token_1"
+    assert endpoint.calls == 2
+    manager.close()
+
+
+def test_managers_are_shared_by_credentials():
+    with OAuthTokenManager.sync():
+        manager = OAuthTokenManager.for_credentials("https://example.com/token", "client", "refresh_token")
+
+        assert OAuthTokenManager.for_credentials("https://example.com/token", "client", "refresh_token") is manager
+        assert OAuthTokenManager.for_credentials("https://example.com/token", "client", "other_token") is not manager
+        assert copy.deepcopy(manager) is manager
+        # Only a hash of the credentials is kept
+        assert not any("refresh_token" in key for key in OAuthTokenManager._managers)
+
+
+def test_managers_are_closed_when_the_sync_ends():
+    endpoint = TokenEndpoint(expires_in=60)
+    with OAuthTokenManager.sync():
+        manager = OAuthTokenManager.for_credentials("https://example.com/token", "client", "refresh_token")
+        manager.get_token(endpoint.refresh)
+        assert manager._timer is not None
+
+    assert manager._timer is None
+    assert not OAuthTokenManager._managers
+    with OAuthTokenManager.sync():
+        assert OAuthTokenManager.for_credentials("https://example.com/token", "client", "refresh_token") is not manager
+    # Closed managers still refresh their token when it's needed, without timer
+    assert manager.get_token(endpoint.refresh)[0] == "token_1"
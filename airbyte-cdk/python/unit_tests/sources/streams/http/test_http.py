@@ -4,18 +4,27 @@
 
 
 import json
+import logging
+import threading
+import time
 from http import HTTPStatus
-from typing import Any, Iterable, Mapping, Optional
-from unittest.mock import ANY, MagicMock, patch
+from typing import Any, Iterable, List, Mapping, Optional
+from unittest.mock import ANY, MagicMock, PropertyMock, patch
+from urllib.parse import parse_qsl, urlparse
 
 import pytest
 import requests
+import vcr
 from airbyte_cdk.models import SyncMode
-from airbyte_cdk.sources.streams.http import HttpStream, HttpSubStream
+from airbyte_cdk.sources.streams.http import HttpMetrics, HttpStream, HttpSubStream
 from airbyte_cdk.sources.streams.http.auth import NoAuth
 from airbyte_cdk.sources.streams.http.auth import TokenAuthenticator as HttpTokenAuthenticator
 from airbyte_cdk.sources.streams.http.exceptions import DefaultBackoffException, RequestBodyException, UserDefinedBackoffException
-from airbyte_cdk.sources.streams.http.requests_native_auth import TokenAuthenticator
+from airbyte_cdk.sources.streams.http.rate_limiting import AdaptiveConcurrency, RateLimiter
+from airbyte_cdk.sources.streams.http.requests_native_auth import Oauth2Authenticator, TokenAuthenticator
+from airbyte_cdk.sources.streams.http.sessions import SessionRegistry
+from airbyte_cdk.sources.utils.parent_records import ParentRecordStore
+from vcr.cassette import Cassette
 
 
 class StubBasicReadHttpStream(HttpStream):
@@ -122,6 +131,75 @@ def test_next_page_token_is_input_to_other_methods(mocker):
     assert expected == records
 
 
+class StubPrefetchHttpStream(StubNextPageTokenHttpStream):
+    prefetch_pages = 2
+
+
+def test_prefetched_pages(mocker):
+    stream = StubPrefetchHttpStream(pages=5)
+    send_request = mocker.patch.object(StubPrefetchHttpStream, "_send_request", return_value={})
+    mocker.patch.object(stream, "request_params", wraps=stream.request_params)
+
+    records = stream.read_records(SyncMode.full_refresh)
+    assert next(records) == {"data": 1}
+    time.sleep(0.1)
+    # the first page is being consumed while the next two are requested in the background
+    assert send_request.call_count == 3
+    assert list(records) == [{"data": 2}, {"data": 3}, {"data": 4}, {"data": 5}, {"data": 6}]
+    for token in [None] + [{"page": i} for i in range(5)]:
+        stream.request_params.assert_any_call(next_page_token=token, stream_slice=None, stream_state={})
+
+
+def test_prefetched_pages_come_with_their_response(mocker):
+    stream = StubPrefetchHttpStream(pages=3)
+    responses = [{"response": i} for i in range(4)]
+    mocker.patch.object(StubPrefetchHttpStream, "_send_request", side_effect=responses)
+
+    pages = stream._read_responses()
+    response, records = next(pages)
+    time.sleep(0.1)
+    # the next pages were already requested, the first page is still paired with the first response
+    assert response == responses[0]
+    assert [response for response, _ in pages] == responses[1:]
+
+
+class StubRemainingPagesHttpStream(StubBasicReadHttpStream):
+    max_concurrent_pages = 3
+
+    def remaining_page_tokens(self, response: requests.Response) -> Optional[List[Mapping[str, Any]]]:
+        return [{"page": page} for page in range(1, 6)]
+
+    def next_page_token(self, response: requests.Response) -> Optional[Mapping[str, Any]]:
+        raise AssertionError("the remaining pages are known from the first response")
+
+    def parse_response(self, response: requests.Response, **kwargs) -> Iterable[Mapping]:
+        yield {"page": response["page"]}
+
+
+def test_remaining_pages_are_requested_concurrently(mocker):
+    stream = StubRemainingPagesHttpStream()
+    in_flight = []
+    max_in_flight = []
+    lock = threading.Lock()
+
+    def send_request(request, request_kwargs):
+        page = int(dict(parse_qsl(urlparse(request.url).query)).get("page", 0))
+        with lock:
+            in_flight.append(page)
+            max_in_flight.append(len(in_flight))
+        # later pages answer first
+        time.sleep(0.05 / (page + 1))
+        with lock:
+            in_flight.remove(page)
+        return {"page": page}
+
+    mocker.patch.object(stream, "request_params", side_effect=lambda next_page_token, **kwargs: next_page_token or {})
+    mocker.patch.object(StubRemainingPagesHttpStream, "_send_request", side_effect=send_request)
+
+    assert list(stream.read_records(SyncMode.full_refresh)) == [{"page": page} for page in range(6)]
+    assert max(max_in_flight) == 3
+
+
 class StubBadUrlHttpStream(StubBasicReadHttpStream):
     url_base = "bad_url"
 
@@ -177,6 +255,23 @@ def test_stub_custom_backoff_http_stream_retries(mocker, retries):
         assert send_mock.call_count == stream.max_retries + 1
 
 
+def test_http_metrics_record_requests_retries_and_pages(mocker, requests_mock):
+    mocker.patch("time.sleep", lambda x: None)
+    stream = StubCustomBackoffHttpStream()
+    stream.http_metrics = HttpMetrics(stream.name, stream.logger, interval=None)
+    requests_mock.register_uri("GET", stream.url_base, [{"status_code": 429}, {"status_code": 200, "text": "ok"}])
+
+    list(stream.read_records(SyncMode.full_refresh))
+
+    snapshot = stream.http_metrics.snapshot()
+    assert snapshot["requests"] == 2
+    assert snapshot["status_codes"] == {"200": 1, "429": 1}
+    assert (snapshot["retries"], snapshot["backoff_seconds"]) == (1, 1.5)
+    assert snapshot["bytes_received"] == 2
+    assert snapshot["slices"] == 1
+    assert snapshot["pages_per_slice"]["max"] == 1
+
+
 def test_stub_custom_backoff_http_stream_endless_retries(mocker):
     mocker.patch("time.sleep", lambda x: None)
 
@@ -354,6 +449,12 @@ class CacheHttpStream(StubBasicReadHttpStream):
     use_cache = True
 
 
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
 class CacheHttpSubStream(HttpSubStream):
     url_base = "https://example.com"
     primary_key = ""
@@ -371,32 +472,57 @@ class CacheHttpSubStream(HttpSubStream):
         return ""
 
 
-def test_caching_filename():
+def test_caching_filename(cache_dir):
     stream = CacheHttpStream()
-    assert stream.cache_filename == f"{stream.name}.yml"
+    assert stream.cache_filename == f"{stream.name}.sqlite"
 
 
-def test_caching_cassettes_are_different():
+def test_caching_streams_share_their_cache(cache_dir):
     stream_1 = CacheHttpStream()
     stream_2 = CacheHttpStream()
 
-    assert stream_1.cache_file != stream_2.cache_file
+    assert stream_1.response_cache is stream_2.response_cache
 
 
-def test_parent_attribute_exist():
+def test_parent_attribute_exist(cache_dir):
     parent_stream = CacheHttpStream()
     child_stream = CacheHttpSubStream(parent=parent_stream)
 
     assert child_stream.parent == parent_stream
 
 
-def test_cache_response(mocker):
+def test_cache_response(mocker, requests_mock, cache_dir):
     stream = CacheHttpStream()
-    mocker.patch.object(stream, "url_base", "https://google.com/")
+    requests_mock.register_uri("GET", stream.url_base, text="response")
     list(stream.read_records(sync_mode=SyncMode.full_refresh))
 
-    with open(stream.cache_filename, "r") as f:
-        assert f.read()
+    assert stream.response_cache.metrics["size"] == len("response")
+    assert (cache_dir / stream.cache_filename).stat().st_size
+
+
+class CassetteHttpStream(CacheHttpStream):
+    def request_cache(self):
+        return vcr.use_cassette("cassette.yml", record_mode="new_episodes", serializer="yaml")
+
+
+def test_requests_are_sent_within_the_cassette_of_request_cache(requests_mock, cache_dir):
+    stream = CassetteHttpStream()
+    requests_mock.register_uri("GET", stream.url_base, text="response")
+    records = list(stream.read_records(sync_mode=SyncMode.full_refresh))
+
+    assert records == [{"data": 1}]
+    assert isinstance(stream.cassete, Cassette)
+    assert requests_mock.call_count == 1
+
+
+def test_cache_file_is_a_cassette(cache_dir):
+    stream = CacheHttpStream()
+    with pytest.deprecated_call():
+        cache_file = stream.cache_file
+
+    with cache_file as cassette:
+        assert isinstance(cassette, Cassette)
+        assert cassette._path == f"{stream.name}.cassette.yml"
 
 
 class CacheHttpStreamWithSlices(CacheHttpStream):
@@ -414,19 +540,77 @@ class CacheHttpStreamWithSlices(CacheHttpStream):
 
 
 @patch("airbyte_cdk.sources.streams.core.logging", MagicMock())
-def test_using_cache(mocker):
+def test_using_cache(mocker, requests_mock, cache_dir):
     parent_stream = CacheHttpStreamWithSlices()
     mocker.patch.object(parent_stream, "url_base", "https://google.com/")
+    requests_mock.register_uri("GET", "https://google.com/", text="home")
+    requests_mock.register_uri("GET", "https://google.com/search", text="search")
 
     for _slice in parent_stream.stream_slices():
         list(parent_stream.read_records(sync_mode=SyncMode.full_refresh, stream_slice=_slice))
 
-    child_stream = CacheHttpSubStream(parent=parent_stream)
+    child_stream = CacheHttpSubStream(parent=CacheHttpStreamWithSlices())
+    mocker.patch.object(child_stream.parent, "url_base", "https://google.com/")
 
     for _slice in child_stream.stream_slices(sync_mode=SyncMode.full_refresh):
         pass
 
-    assert parent_stream.cassete.play_count != 0
+    assert requests_mock.call_count == 2
+    assert parent_stream.response_cache.metrics["hits"] == 2
+
+
+class StubParentHttpStream(CacheHttpStreamWithSlices):
+    url_base = "https://google.com/"
+    use_cache = False
+
+    def parse_response(self, response: requests.Response, stream_slice: Mapping[str, Any] = None, **kwargs) -> Iterable[Mapping]:
+        yield {"value": len(response.text), "path": stream_slice["path"]}
+
+
+class MemoizingHttpSubStream(CacheHttpSubStream):
+    memoize_parent_records = True
+
+
+class ProjectingHttpSubStream(MemoizingHttpSubStream):
+    parent_fields = ["value"]
+
+
+def test_substreams_share_their_parent_records_during_a_sync(requests_mock):
+    requests_mock.register_uri("GET", "https://google.com/", text="home")
+    requests_mock.register_uri("GET", "https://google.com/search", text="search")
+    children = [MemoizingHttpSubStream(parent=StubParentHttpStream()), ProjectingHttpSubStream(parent=StubParentHttpStream())]
+
+    with ParentRecordStore.default().sync():
+        slices = [list(child.stream_slices(sync_mode=SyncMode.full_refresh)) for child in children * 2]
+
+    assert slices[0] == slices[2] == [{"parent": {"value": 4, "path": ""}}, {"parent": {"value": 6, "path": "search"}}]
+    assert slices[1] == slices[3] == [{"parent": {"value": 4}}, {"parent": {"value": 6}}]
+    # Substreams projecting the parent records differently don't share them
+    assert requests_mock.call_count == 4
+
+
+def test_substreams_share_their_parent_records_whatever_their_state(requests_mock):
+    requests_mock.register_uri("GET", "https://google.com/", text="home")
+    requests_mock.register_uri("GET", "https://google.com/search", text="search")
+    child = MemoizingHttpSubStream(parent=StubParentHttpStream())
+
+    with ParentRecordStore.default().sync():
+        list(child.stream_slices(sync_mode=SyncMode.full_refresh, stream_state={}))
+        list(child.stream_slices(sync_mode=SyncMode.full_refresh, stream_state={"updated_at": "2022-01-01"}))
+
+    assert requests_mock.call_count == 2
+
+
+def test_substreams_read_their_parent_every_time_by_default(requests_mock):
+    requests_mock.register_uri("GET", "https://google.com/", text="home")
+    requests_mock.register_uri("GET", "https://google.com/search", text="search")
+    child = CacheHttpSubStream(parent=StubParentHttpStream())
+
+    with ParentRecordStore.default().sync():
+        list(child.stream_slices(sync_mode=SyncMode.full_refresh))
+        list(child.stream_slices(sync_mode=SyncMode.full_refresh))
+
+    assert requests_mock.call_count == 4
 
 
 class AutoFailTrueHttpStream(StubBasicReadHttpStream):
@@ -496,3 +680,74 @@ def test_default_get_error_display_message_handles_http_error(mocker):
 
     http_err_msg = stream.get_error_display_message(requests.HTTPError())
     assert http_err_msg == "my custom message"
+
+
+def test_rate_limiter_is_shared_by_streams(mocker, requests_mock):
+    rate_limiter = RateLimiter(rates=[(100, 1)])
+    acquire = mocker.spy(rate_limiter, "acquire")
+    update = mocker.spy(rate_limiter, "update")
+    streams = [StubBasicReadHttpStream(rate_limiter=rate_limiter), StubBasicReadHttpStream(rate_limiter=rate_limiter)]
+    requests_mock.register_uri("GET", StubBasicReadHttpStream.url_base, headers={"X-RateLimit-Remaining": "10"})
+
+    for stream in streams:
+        list(stream.read_records(sync_mode=SyncMode.full_refresh))
+
+    assert acquire.call_count == 2
+    assert update.call_count == 2
+    assert update.call_args[0][0].headers["X-RateLimit-Remaining"] == "10"
+
+
+def test_no_concurrency_controller_by_default():
+    assert StubBasicReadHttpStream().concurrency_controller is None
+
+
+def test_requests_go_through_the_concurrency_controller(mocker, requests_mock):
+    controller = AdaptiveConcurrency()
+    stream = StubBasicReadHttpStream()
+    mocker.patch.object(StubBasicReadHttpStream, "concurrency_controller", controller)
+    mocker.patch.object(StubBasicReadHttpStream, "max_retries", 0)
+    requests_mock.register_uri("GET", stream.url_base, [{"status_code": 200}, {"exc": requests.exceptions.ConnectTimeout}])
+
+    list(stream.read_records(sync_mode=SyncMode.full_refresh))
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        list(stream.read_records(sync_mode=SyncMode.full_refresh))
+
+    assert controller.metrics["requests"] == 2
+    assert controller.metrics["throttled"] == 1
+    assert controller.metrics["in_flight"] == 0
+    assert list(controller._baseline_latencies) == [stream.name]
+
+
+def test_streams_share_the_connections_of_the_session_registry(mocker):
+    registry = SessionRegistry()
+    mocker.patch.object(StubBasicReadHttpStream, "session_registry", registry)
+    streams = [StubBasicReadHttpStream(), StubBasicReadHttpStream(authenticator=TokenAuthenticator("test-token"))]
+
+    adapters = [stream._session.get_adapter(stream.url_base) for stream in streams]
+
+    assert adapters[0] is adapters[1]
+    assert streams[1]._session.auth is not streams[0]._session.auth
+
+
+def test_oauth_tokens_are_refreshed_through_the_session_registry_of_the_stream(mocker):
+    registry = SessionRegistry()
+    mocker.patch.object(StubBasicReadHttpStream, "session_registry", registry)
+    authenticator = Oauth2Authenticator("https://test_base_url.com/token", "client_id", "client_secret", "refresh_token")
+    StubBasicReadHttpStream(authenticator=authenticator)
+    response = MagicMock()
+    response.json.return_value = {"access_token": "token", "expires_in": 3600}
+    request = mocker.patch.object(registry, "request", return_value=response)
+
+    assert authenticator.refresh_access_token() == ("token", 3600)
+    request.assert_called_once_with(method="POST", url="https://test_base_url.com/token", data=ANY)
+
+
+def test_response_bodies_are_not_decoded_when_debug_is_disabled(mocker, requests_mock):
+    stream = StubBasicReadHttpStream()
+    stream.logger.setLevel(logging.INFO)
+    text = mocker.patch.object(requests.Response, "text", new_callable=PropertyMock)
+    requests_mock.register_uri("GET", stream.url_base, json={"data": "x" * 1000})
+
+    list(stream.read_records(sync_mode=SyncMode.full_refresh))
+
+    text.assert_not_called()
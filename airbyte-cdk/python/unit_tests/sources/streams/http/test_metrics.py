@@ -0,0 +1,82 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import json
+import logging
+
+import requests
+from airbyte_cdk.sources.streams.http.metrics import HttpMetrics
+
+
+def _request(body=None):
+    return requests.Request("POST", "https://example.com", data=body).prepare()
+
+
+def _response(status_code=200, content=b"{}"):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+def test_requests_are_recorded():
+    metrics = HttpMetrics("users", logging.getLogger("airbyte"), interval=None)
+    metrics.record_request(_request("a=1"), _response(200, b"12345"), 0.2)
+    metrics.record_request(_request(), _response(429, b""), 0.02)
+    metrics.record_request(_request(), None, 3.0)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == 3
+    assert snapshot["errors"] == 1
+    assert snapshot["bytes_sent"] == 3
+    assert snapshot["bytes_received"] == 5
+    assert snapshot["status_codes"] == {"200": 1, "429": 1}
+    assert snapshot["latency_seconds"] == {
+        "count": 2,
+        "mean": 0.11,
+        "p50": 0.05,
+        "p95": 0.25,
+        "max": 0.2,
+        "buckets": {"<=0.05": 1, "<=0.25": 1},
+    }
+
+
+def test_streamed_responses_are_measured_by_their_headers():
+    metrics = HttpMetrics("users", logging.getLogger("airbyte"), interval=None)
+    response = _response(content=False)
+    response.headers["Content-Length"] = "2048"
+    metrics.record_request(_request(), response, 0.1)
+
+    assert metrics.snapshot()["bytes_received"] == 2048
+
+
+def test_retries_rate_limits_and_pages_are_recorded():
+    metrics = HttpMetrics("users", logging.getLogger("airbyte"), interval=None)
+    metrics.record_retry(5)
+    metrics.record_retry(10.5)
+    metrics.record_rate_limit(0.25)
+    for pages in [1, 3, 200]:
+        metrics.record_slice(pages)
+
+    snapshot = metrics.snapshot()
+    assert (snapshot["retries"], snapshot["backoff_seconds"], snapshot["rate_limited_seconds"]) == (2, 15.5, 0.25)
+    assert snapshot["slices"] == 3
+    assert snapshot["pages_per_slice"]["max"] == 200
+
+
+def test_metrics_are_logged_every_interval(mocker, caplog):
+    now = mocker.patch("airbyte_cdk.sources.streams.http.metrics.time.monotonic", return_value=0)
+    metrics = HttpMetrics("users", logging.getLogger("airbyte"), interval=60)
+    with caplog.at_level(logging.INFO):
+        metrics.record_request(_request(), _response(), 0.1)
+        now.return_value = 61
+        metrics.record_request(_request(), _response(), 0.1)
+        metrics.record_request(_request(), _response(), 0.1)
+        metrics.log_summary()
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 2
+    assert messages[0].startswith("HTTP metrics of stream users: ")
+    assert json.loads(messages[0].split(": ", 1)[1])["requests"] == 2
+    assert json.loads(messages[1].split(": ", 1)[1])["requests"] == 3
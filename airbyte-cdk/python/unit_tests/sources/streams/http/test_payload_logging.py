@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import json
+import logging
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from airbyte_cdk.logger import AirbyteLogFormatter
+from airbyte_cdk.sources.streams.http.payload_logging import HttpPayloadLogger, LazyPayload, capped_text, response_body
+
+
+@pytest.fixture
+def debug_records():
+    logger = logging.getLogger("airbyte.test_payload_logging")
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    yield logger, records
+    logger.removeHandler(handler)
+
+
+def make_response(content=b'{"data": []}', status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.encoding = "utf-8"
+    return response
+
+
+def test_lazy_payload_is_only_computed_when_formatted():
+    produce = MagicMock(return_value={"key": "value"})
+    payload = LazyPayload(produce)
+
+    produce.assert_not_called()
+    assert str(payload) == "{'key': 'value'}"
+    produce.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "body, max_size, expected",
+    [
+        (None, 10, ""),
+        (b"short", 10, "short"),
+        (b"0123456789abcdef", 10, "0123456789... (6 more)"),
+        ("0123456789abcdef", 4, "0123... (12 more)"),
+        ("café".encode(), 4, "caf�... (1 more)"),
+    ],
+)
+def test_capped_text(body, max_size, expected):
+    assert capped_text(body, max_size) == expected
+
+
+def test_streamed_bodies_are_not_downloaded():
+    response = make_response()
+    response._content = False
+    response.raw = MagicMock()
+
+    assert response_body(response) == "<streamed body>"
+    response.raw.read.assert_not_called()
+
+
+def test_nothing_is_logged_when_debug_is_disabled(mocker):
+    logger = logging.getLogger("airbyte.test_payload_logging_disabled")
+    logger.setLevel(logging.INFO)
+    debug = mocker.spy(logger, "debug")
+    payload_logger = HttpPayloadLogger(logger)
+
+    logged_request = payload_logger.log_request(requests.Request("GET", "https://test.com").prepare())
+    payload_logger.log_response(make_response(), logged_request)
+
+    assert not logged_request
+    debug.assert_not_called()
+
+
+def test_requests_and_responses_are_logged_with_capped_bodies(debug_records):
+    logger, records = debug_records
+    payload_logger = HttpPayloadLogger(logger, max_body_size=8)
+    request = requests.Request("POST", "https://test.com/users", json={"name": "a long name"}).prepare()
+
+    logged_request = payload_logger.log_request(request)
+    payload_logger.log_response(make_response(b'{"data": [1, 2, 3]}'), logged_request)
+
+    formatted = [json.loads(AirbyteLogFormatter().format(record)) for record in records]
+    assert [message["message"] for message in formatted] == ["Making outbound API request", "Receiving response"]
+    assert formatted[0]["data"]["url"] == "https://test.com/users"
+    assert formatted[0]["data"]["request_body"] == '{"name":... (15 more)'
+    assert formatted[1]["data"]["status"] == "200"
+    assert formatted[1]["data"]["body"] == '{"data":... (11 more)'
+
+
+def test_only_a_sample_of_the_requests_is_logged(debug_records):
+    logger, records = debug_records
+    payload_logger = HttpPayloadLogger(logger, sample_rate=0.25)
+    request = requests.Request("GET", "https://test.com").prepare()
+
+    logged = []
+    for _ in range(8):
+        logged_request = payload_logger.log_request(request)
+        payload_logger.log_response(make_response(), logged_request)
+        logged.append(logged_request)
+
+    assert logged == [False, False, False, True] * 2
+    assert len(records) == 4
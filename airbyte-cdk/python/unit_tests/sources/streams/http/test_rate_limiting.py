@@ -0,0 +1,226 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import threading
+from email.utils import formatdate
+
+import pytest
+import requests
+from airbyte_cdk.sources.streams.http.rate_limiting import AdaptiveConcurrency, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1_600_000_000 + self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = FakeClock()
+    mocker.patch("airbyte_cdk.sources.streams.http.rate_limiting.time", clock)
+    return clock
+
+
+def request(path="/users"):
+    return requests.Request("GET", f"https://api.test.com{path}").prepare()
+
+
+def response(headers=None, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+def test_requests_wait_once_the_bucket_is_empty(clock):
+    limiter = RateLimiter(rates=[(2, 10)])
+
+    assert limiter.acquire(request()) == 0
+    assert limiter.acquire(request()) == 0
+    assert limiter.acquire(request()) == pytest.approx(5)
+    assert clock.sleeps == [pytest.approx(5)]
+
+
+def test_every_rate_is_enforced(clock):
+    limiter = RateLimiter(rates=[(10, 1), (3, 60)])
+
+    for _ in range(3):
+        limiter.acquire(request())
+    assert limiter.acquire(request()) == pytest.approx(20)
+
+
+def test_endpoint_weights(clock):
+    limiter = RateLimiter(rates=[(10, 10)], weights={r"/search$": 4})
+
+    assert limiter.weight(request("/search")) == 4
+    assert limiter.weight(request("/users")) == 1
+    limiter.acquire(request("/search"))
+    limiter.acquire(request("/search"))
+    assert limiter.acquire(request("/search")) == pytest.approx(2)
+
+
+def test_weight_larger_than_the_capacity_does_not_block_forever(clock):
+    limiter = RateLimiter(rates=[(2, 10)], weights={"/export": 5})
+
+    assert limiter.acquire(request("/export")) == 0
+    assert limiter.acquire(request("/export")) == pytest.approx(10)
+
+
+@pytest.mark.parametrize(
+    "headers, expected_wait",
+    [
+        ({"Retry-After": "30"}, 30),
+        ({"Retry-After": formatdate(1_600_000_000 + 1000 + 45, usegmt=True)}, 45),
+        ({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "20"}, 20),
+        ({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(1_600_000_000 + 1000 + 15)}, 15),
+        ({"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "20"}, 0),
+        ({"Retry-After": "not a delay"}, 0),
+    ],
+)
+def test_pause_from_response_headers(clock, headers, expected_wait):
+    limiter = RateLimiter(rates=[(100, 1)])
+
+    limiter.update(response(headers))
+
+    assert limiter.acquire(request()) == pytest.approx(expected_wait)
+
+
+def test_remaining_requests_reported_by_the_api_cap_the_buckets(clock):
+    limiter = RateLimiter(rates=[(100, 100)])
+
+    limiter.update(response({"X-RateLimit-Remaining": "1"}))
+
+    assert limiter.acquire(request()) == 0
+    assert limiter.acquire(request()) == pytest.approx(1)
+
+
+def send(controller, clock, latency=0.1, status_code=200, endpoint=""):
+    started = controller.acquire()
+    clock.now += latency
+    controller.release(started, response(status_code=status_code), endpoint=endpoint)
+
+
+def test_concurrency_limit_grows_while_it_is_used_and_responses_are_healthy(clock):
+    controller = AdaptiveConcurrency(initial_limit=1, max_limit=4)
+
+    for _ in range(10):
+        started = [controller.acquire() for _ in range(controller.limit)]
+        clock.now += 0.1
+        for start in started:
+            controller.release(start, response())
+
+    assert controller.limit == 4
+    assert controller.metrics["increases"] == 3
+
+
+def test_concurrency_limit_does_not_grow_when_it_is_not_used(clock):
+    controller = AdaptiveConcurrency(initial_limit=3)
+
+    for _ in range(10):
+        send(controller, clock)
+
+    assert controller.limit == 3
+    assert controller.metrics["increases"] == 0
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+def test_concurrency_limit_is_cut_when_requests_are_throttled(clock, status_code):
+    controller = AdaptiveConcurrency(initial_limit=8)
+
+    send(controller, clock, status_code=status_code)
+
+    assert controller.limit == 4
+    assert controller.metrics["throttled"] == 1
+    assert controller.metrics["decreases"] == 1
+
+
+def test_concurrency_limit_is_cut_when_requests_fail_without_response(clock):
+    controller = AdaptiveConcurrency(initial_limit=8)
+
+    started = controller.acquire()
+    controller.release(started, None)
+
+    assert controller.limit == 4
+    assert controller.metrics["in_flight"] == 0
+
+
+def test_failures_of_concurrent_requests_only_cut_the_limit_once(clock):
+    controller = AdaptiveConcurrency(initial_limit=8)
+
+    started = [controller.acquire() for _ in range(4)]
+    clock.now += 0.1
+    for start in started:
+        controller.release(start, response(status_code=429))
+
+    assert controller.limit == 4
+    assert controller.metrics["throttled"] == 4
+    assert controller.metrics["decreases"] == 1
+
+
+def test_concurrency_limit_is_reduced_when_responses_slow_down(clock):
+    controller = AdaptiveConcurrency(initial_limit=10, latency_tolerance=2)
+
+    send(controller, clock, latency=0.1)
+    send(controller, clock, latency=0.15)
+    assert controller.limit == 10
+    send(controller, clock, latency=1)
+
+    assert controller.limit == 9
+    assert controller.metrics["slow"] == 1
+
+
+def test_latencies_are_compared_to_the_baseline_of_their_endpoint(clock):
+    controller = AdaptiveConcurrency(initial_limit=10, latency_tolerance=2)
+
+    send(controller, clock, latency=0.1, endpoint="cheap")
+    send(controller, clock, latency=1, endpoint="expensive")
+    send(controller, clock, latency=1.2, endpoint="expensive")
+    assert controller.limit == 10
+    send(controller, clock, latency=1, endpoint="cheap")
+
+    assert controller.limit == 9
+    assert controller.metrics["slow"] == 1
+
+
+def test_concurrency_limit_stays_within_bounds(clock):
+    controller = AdaptiveConcurrency(initial_limit=2, min_limit=1)
+
+    for _ in range(5):
+        send(controller, clock, status_code=429)
+
+    assert controller.limit == 1
+
+
+def test_requests_wait_for_a_slot_once_the_limit_is_reached(clock):
+    controller = AdaptiveConcurrency(initial_limit=1)
+    started = controller.acquire()
+    waiting = threading.Thread(target=controller.acquire)
+
+    waiting.start()
+    waiting.join(timeout=0.1)
+    assert waiting.is_alive()
+    controller.release(started, response())
+    waiting.join(timeout=1)
+
+    assert not waiting.is_alive()
+    assert controller.metrics["waits"] == 1
+    assert controller.metrics["in_flight"] == 1
+
+
+def test_controllers_are_shared_by_host():
+    controller = AdaptiveConcurrency.for_url("https://shared.test.com/v1/")
+
+    assert AdaptiveConcurrency.for_url("https://shared.test.com/v2/") is controller
+    assert AdaptiveConcurrency.for_url("https://other.test.com/v1/") is not controller
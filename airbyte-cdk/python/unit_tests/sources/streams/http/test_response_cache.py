@@ -0,0 +1,151 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import copy
+import threading
+from io import BytesIO
+
+import pytest
+import requests
+from airbyte_cdk.sources.streams.http.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+
+def make_request(url="https://api.test.com/users?page=2&limit=10", method="GET", body=None):
+    return requests.Request(method, url, data=body).prepare()
+
+
+def make_response(body=b'{"data": [1, 2]}', status_code=200, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "OK"
+    response.url = "https://api.test.com/users"
+    response.headers.update(headers or {"Content-Type": "application/json; charset=utf-8"})
+    response._content = body
+    return response
+
+
+def test_responses_are_served_from_the_cache(cache_path):
+    cache = ResponseCache(cache_path)
+    request = make_request()
+
+    assert cache.get(request) is None
+    cache.put(request, make_response())
+    response = cache.get(request)
+
+    assert response.status_code == 200
+    assert response.json() == {"data": [1, 2]}
+    assert response.headers["content-type"] == "application/json; charset=utf-8"
+    assert response.encoding == "utf-8"
+    assert response.request is request
+    assert cache.metrics == {"hits": 1, "misses": 1, "evictions": 0, "size": len(b'{"data": [1, 2]}')}
+
+
+@pytest.mark.parametrize(
+    "other_request, same_key",
+    [
+        (make_request("https://api.test.com/users?limit=10&page=2"), True),
+        (make_request("HTTPS://API.test.com/users?page=2&limit=10#fragment"), True),
+        (make_request("https://api.test.com/users?page=3&limit=10"), False),
+        (make_request("https://api.test.com/orders?page=2&limit=10"), False),
+        (make_request(method="POST"), False),
+    ],
+)
+def test_requests_are_normalized(other_request, same_key):
+    assert (ResponseCache.key(make_request()) == ResponseCache.key(other_request)) == same_key
+
+
+def test_request_bodies_are_part_of_the_key():
+    url = "https://api.test.com/graphql"
+    assert ResponseCache.key(make_request(url, "POST", "query 1")) != ResponseCache.key(make_request(url, "POST", "query 2"))
+    assert ResponseCache.key(make_request(url, "POST", "query 1")) == ResponseCache.key(make_request(url, "POST", "query 1"))
+
+
+def test_entries_expire_after_the_ttl(cache_path, mocker):
+    now = mocker.patch("airbyte_cdk.sources.streams.http.response_cache.time.time", return_value=1000)
+    cache = ResponseCache(cache_path, ttl=60)
+    cache.put(make_request(), make_response())
+
+    now.return_value = 1059
+    assert cache.get(make_request()) is not None
+    now.return_value = 1061
+    assert cache.get(make_request()) is None
+    assert cache.metrics["size"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_past_the_max_size(cache_path, mocker):
+    now = mocker.patch("airbyte_cdk.sources.streams.http.response_cache.time.time", return_value=1000)
+    cache = ResponseCache(cache_path, max_size=25)
+    requests_by_page = {page: make_request(f"https://api.test.com/users?page={page}") for page in range(3)}
+
+    cache.put(requests_by_page[0], make_response(b"0" * 10))
+    now.return_value += 1
+    cache.put(requests_by_page[1], make_response(b"1" * 10))
+    now.return_value += 1
+    cache.get(requests_by_page[0])
+    now.return_value += 1
+    cache.put(requests_by_page[2], make_response(b"2" * 10))
+
+    assert cache.get(requests_by_page[1]) is None
+    assert cache.get(requests_by_page[0]).content == b"0" * 10
+    assert cache.get(requests_by_page[2]).content == b"2" * 10
+    assert cache.metrics["evictions"] == 1
+    assert cache.metrics["size"] == 20
+
+
+def test_replacing_an_entry_keeps_the_size_right(cache_path):
+    cache = ResponseCache(cache_path)
+
+    cache.put(make_request(), make_response(b"1234"))
+    cache.put(make_request(), make_response(b"12"))
+
+    assert cache.metrics["size"] == 2
+    assert cache.get(make_request()).content == b"12"
+
+
+def test_streamed_responses_are_downloaded_before_they_are_stored(cache_path):
+    cache = ResponseCache(cache_path)
+    response = make_response()
+    response._content = False
+    response.raw = BytesIO(b'{"data": []}')
+
+    cache.put(make_request(), response)
+
+    assert cache.get(make_request()).json() == {"data": []}
+    assert response.json() == {"data": []}
+
+
+def test_caches_are_shared_by_path_and_emptied_when_first_opened(cache_path):
+    previous = ResponseCache(cache_path)
+    previous.put(make_request(), make_response())
+    previous.close()
+
+    cache = ResponseCache.open(cache_path)
+
+    assert ResponseCache.open(cache_path) is cache
+    assert copy.deepcopy(cache) is cache
+    assert cache.get(make_request()) is None
+
+
+def test_cache_is_thread_safe(cache_path):
+    cache = ResponseCache(cache_path)
+
+    def fill(thread):
+        for page in range(50):
+            request = make_request(f"https://api.test.com/users?thread={thread}&page={page}")
+            cache.put(request, make_response(b"x"))
+            assert cache.get(request).content == b"x"
+
+    threads = [threading.Thread(target=fill, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.metrics["hits"] == 200
+    assert cache.metrics["size"] == 200
@@ -0,0 +1,88 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import copy
+import pickle
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from airbyte_cdk.sources.streams.http.sessions import SessionRegistry
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sessions_reuse_the_connections_of_the_registry(server_url):
+    registry = SessionRegistry()
+    sessions = [registry.session(), registry.session()]
+
+    for session in sessions:
+        for path in ["/users", "/orders"]:
+            session.get(f"{server_url}{path}").raise_for_status()
+
+    assert registry.metrics == {server_url: {"requests": 4, "connections": 1, "reused_connections": 3}}
+    registry.close()
+
+
+def test_connections_are_closed_after_each_response_without_keep_alive(server_url):
+    registry = SessionRegistry(keep_alive=False)
+    session = registry.session()
+
+    for _ in range(3):
+        session.get(f"{server_url}/users").raise_for_status()
+
+    assert registry.metrics[server_url]["connections"] == 3
+    registry.close()
+
+
+def test_pools_are_keyed_by_base_url():
+    registry = SessionRegistry(pool_size=20)
+
+    adapter = registry.adapter("https://api.test.com/v1/users")
+
+    assert registry.adapter("https://api.test.com/v2/orders?page=2") is adapter
+    assert registry.adapter("http://api.test.com/v1/users") is not adapter
+    assert registry.adapter("https://auth.test.com/token") is not adapter
+    assert adapter._pool_maxsize == 20
+
+
+def test_closing_a_session_keeps_the_pools_of_the_registry():
+    registry = SessionRegistry()
+    adapter = registry.adapter("https://api.test.com")
+
+    registry.session().close()
+
+    assert registry.adapter("https://api.test.com") is adapter
+
+
+def test_copies_share_the_registry_and_pickles_open_their_own():
+    registry = SessionRegistry(pool_size=5, keep_alive=False)
+
+    assert copy.deepcopy(registry) is registry
+    unpickled = pickle.loads(pickle.dumps(registry))
+    assert unpickled is not registry
+    assert (unpickled._pool_size, unpickled._keep_alive) == (5, False)
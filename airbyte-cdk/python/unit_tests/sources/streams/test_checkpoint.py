@@ -0,0 +1,33 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import pytest
+from airbyte_cdk.sources.streams import CheckpointPolicy
+
+
+@pytest.mark.parametrize(
+    "policy, records, size, seconds, expected",
+    [
+        (CheckpointPolicy(), 1000, 10**9, 3600, False),
+        (CheckpointPolicy(every_records=10), 9, 0, 0, False),
+        (CheckpointPolicy(every_records=10), 10, 0, 0, True),
+        (CheckpointPolicy(every_seconds=60), 1, 0, 59.9, False),
+        (CheckpointPolicy(every_seconds=60), 1, 0, 60, True),
+        (CheckpointPolicy(every_bytes=1000), 1, 999, 0, False),
+        (CheckpointPolicy(every_bytes=1000), 1, 1000, 0, True),
+        (CheckpointPolicy(every_records=10, every_seconds=60, every_bytes=1000), 1, 0, 61, True),
+    ],
+)
+def test_should_checkpoint(policy, records, size, seconds, expected):
+    assert policy.should_checkpoint(records, size, seconds) == expected
+
+
+def test_records_are_only_measured_for_byte_thresholds():
+    assert not CheckpointPolicy(every_records=10, every_seconds=60).measures_records
+    assert CheckpointPolicy(every_bytes=1000).measures_records
+
+
+def test_time_is_only_measured_for_second_thresholds():
+    assert not CheckpointPolicy(every_records=10, every_bytes=1000).measures_time
+    assert CheckpointPolicy(every_seconds=60).measures_time
@@ -0,0 +1,87 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import datetime
+
+import pytest
+from airbyte_cdk.sources.streams import CursorTracker, CursorType
+
+
+@pytest.mark.parametrize(
+    "cursor_type, datetime_format, values, expected",
+    [
+        (CursorType.DATETIME, None, ["2022-01-02T00:00:00Z", "2022-01-10T00:00:00Z", "2022-01-03T00:00:00Z"], "2022-01-10T00:00:00Z"),
+        (CursorType.DATETIME, None, ["2022-01-02T03:00:00+05:00", "2022-01-01T23:00:00Z"], "2022-01-01T23:00:00Z"),
+        (CursorType.DATETIME, None, ["2022-01-02", "2022-01-01T23:00:00.123456"], "2022-01-02"),
+        (CursorType.DATETIME, None, ["2022-01-02T00:00:00.5+00:00", "2022-01-01T23:00:00"], "2022-01-02T00:00:00.5+00:00"),
+        (CursorType.DATETIME, "%d/%m/%Y", ["02/03/2022", "03/02/2022"], "02/03/2022"),
+        (CursorType.DATETIME, "%Y%m%d%H%M%S", ["20220102000000", "20220101235959"], "20220102000000"),
+        (CursorType.EPOCH, None, [1641081600, "1641081601.5", 1641081601], "1641081601.5"),
+        (CursorType.INTEGER, None, [9, "10", 2**63 - 1, 2**63 - 2], 2**63 - 1),
+        (CursorType.STRING, None, ["a", "c", "b"], "c"),
+    ],
+)
+def test_greatest_cursor_value(cursor_type, datetime_format, values, expected):
+    tracker = CursorTracker("updated_at", cursor_type, datetime_format)
+    tracker.update({"updated_at": value} for value in values)
+
+    assert tracker.value == expected
+
+
+def test_values_are_compared_a_batch_at_a_time(mocker):
+    parse = mocker.spy(CursorTracker, "_parse_datetime")
+    tracker = CursorTracker("updated_at")
+    for day in range(1, 29):
+        tracker.observe({"updated_at": f"2022-02-{day:02d}T00:00:00Z"})
+    assert parse.call_count == 0
+
+    assert tracker.value == "2022-02-28T00:00:00Z"
+    # Only the greatest value of the batch is parsed when the values have the same shape
+    assert parse.call_count == 1
+
+    tracker.update([{"updated_at": "2022-03-01T00:00:00Z"}, {"updated_at": "2022-01-01T00:00:00+01:00"}])
+    assert tracker.value == "2022-03-01T00:00:00Z"
+    assert parse.call_count == 3
+
+
+def test_pending_values_are_bounded(mocker):
+    batch_max = mocker.spy(CursorTracker, "_batch_max")
+    tracker = CursorTracker("id", CursorType.INTEGER)
+    for value in range(2500):
+        tracker.observe({"id": value})
+
+    # Values are compared once a batch reaches its maximum size rather than all kept until the state is requested
+    assert batch_max.call_count == 2
+    assert len(tracker._pending) == 500
+    assert tracker.value == 2499
+
+
+def test_records_without_cursor_are_ignored():
+    tracker = CursorTracker(["data", "updated_at"], CursorType.INTEGER)
+    tracker.update([{}, {"data": None}, {"data": {"updated_at": None}}, "not a record"])
+    assert tracker.value is None
+
+    tracker.update([{"data": {"updated_at": 3}}, {"data": {}}])
+    assert tracker.value == 3
+    assert tracker.state_key == "updated_at"
+
+
+def test_get_updated_state():
+    tracker = CursorTracker("updated_at")
+    state = {"updated_at": "2022-01-05T00:00:00Z", "other": "value"}
+    assert tracker.get_updated_state(state) is state
+
+    tracker.update([{"updated_at": "2022-01-04T00:00:00Z"}])
+    assert tracker.get_updated_state(state) is state
+
+    tracker.update([{"updated_at": "2022-01-06T00:00:00Z"}])
+    assert tracker.get_updated_state(state) == {"updated_at": "2022-01-06T00:00:00Z", "other": "value"}
+    assert tracker.get_updated_state({}) == {"updated_at": "2022-01-06T00:00:00Z"}
+
+
+def test_datetime_values():
+    tracker = CursorTracker("updated_at")
+    latest = datetime.datetime(2022, 1, 2, tzinfo=datetime.timezone.utc)
+    tracker.update([{"updated_at": latest}, {"updated_at": "2022-01-01T00:00:00Z"}])
+    assert tracker.value == latest
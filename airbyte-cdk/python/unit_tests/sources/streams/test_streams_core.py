@@ -7,7 +7,7 @@ from typing import Any, Iterable, List, Mapping
 
 import pytest
 from airbyte_cdk.models import AirbyteStream, SyncMode
-from airbyte_cdk.sources.streams import Stream
+from airbyte_cdk.sources.streams import CheckpointPolicy, Stream
 
 
 class StreamStubFullRefresh(Stream):
@@ -173,3 +173,17 @@ def test_wrapped_primary_key_various_argument(test_input, expected):
     wrapped = Stream._wrapped_primary_key(test_input)
 
     assert wrapped == expected
+
+
+def test_checkpoint_policy_defaults_to_the_source_policy():
+    assert StreamStubFullRefresh().checkpoint_policy is None
+
+
+def test_checkpoint_policy_from_checkpoint_interval(mocker):
+    mocker.patch.object(StreamStubFullRefresh, "state_checkpoint_interval", new_callable=mocker.PropertyMock, return_value=100)
+    mocker.patch.object(StreamStubFullRefresh, "state_checkpoint_seconds", new_callable=mocker.PropertyMock, return_value=60)
+
+    policy = StreamStubFullRefresh().checkpoint_policy
+
+    assert isinstance(policy, CheckpointPolicy)
+    assert (policy.every_records, policy.every_seconds, policy.every_bytes, policy.on_slices) == (100, 60, None, True)
@@ -2,28 +2,35 @@
 # Copyright (c) 2022 Airbyte, Inc., all rights reserved.
 #
 
+import json
 import logging
 from collections import defaultdict
 from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 from unittest.mock import call
 
 import pytest
+import requests
 from airbyte_cdk.models import (
     AirbyteCatalog,
     AirbyteConnectionStatus,
     AirbyteMessage,
     AirbyteRecordMessage,
+    AirbyteStateBlob,
     AirbyteStateMessage,
+    AirbyteStateType,
     AirbyteStream,
+    AirbyteStreamState,
     ConfiguredAirbyteCatalog,
     ConfiguredAirbyteStream,
     DestinationSyncMode,
     Status,
+    StreamDescriptor,
     SyncMode,
     Type,
 )
 from airbyte_cdk.sources import AbstractSource
-from airbyte_cdk.sources.streams import Stream
+from airbyte_cdk.sources.streams import CheckpointPolicy, CursorTracker, Stream
+from airbyte_cdk.sources.streams.http import HttpStream
 from airbyte_cdk.utils.traced_exception import AirbyteTracedException
 
 logger = logging.getLogger("airbyte")
@@ -214,6 +221,26 @@ def test_valid_full_refresh_read_no_slices(mocker):
     assert expected == messages
 
 
+def test_records_reusing_the_same_dict_are_emitted_as_they_were_read(mocker):
+    """Tests that a stream updating the dict of its previous record doesn't change the message already emitted for it"""
+
+    def read_records():
+        record = {}
+        for value in range(3):
+            record["k"] = value
+            yield record
+
+    s1 = MockStream([({"sync_mode": SyncMode.full_refresh}, read_records())], name="s1")
+    mocker.patch.object(MockStream, "get_json_schema", return_value={})
+
+    src = MockSource(streams=[s1])
+    catalog = ConfiguredAirbyteCatalog(streams=[_configured_stream(s1, SyncMode.full_refresh)])
+
+    messages = _fix_emitted_at(list(src.read(logger, {}, catalog)))
+
+    assert messages == _as_records("s1", [{"k": 0}, {"k": 1}, {"k": 2}])
+
+
 def test_valid_full_refresh_read_with_slices(mocker):
     """Tests that running a full refresh sync on streams which use slices produces the expected AirbyteMessages"""
     slices = [{"1": "1"}, {"2": "2"}]
@@ -245,10 +272,113 @@ def test_valid_full_refresh_read_with_slices(mocker):
     assert expected == messages
 
 
+def test_valid_full_refresh_read_concurrently(mocker):
+    """Tests that reading streams concurrently outputs every record and keeps the order of the records within each stream"""
+    s1_output = [{"s1": i} for i in range(50)]
+    s2_output = [{"s2": i} for i in range(50)]
+    s1 = MockStream([({"sync_mode": SyncMode.full_refresh}, s1_output)], name="s1")
+    s2 = MockStream([({"sync_mode": SyncMode.full_refresh}, s2_output)], name="s2")
+
+    mocker.patch.object(MockStream, "get_json_schema", return_value={})
+    mocker.patch.object(MockSource, "max_concurrent_streams", new_callable=mocker.PropertyMock, return_value=2)
+
+    src = MockSource(streams=[s1, s2])
+    catalog = ConfiguredAirbyteCatalog(
+        streams=[
+            _configured_stream(s1, SyncMode.full_refresh),
+            _configured_stream(s2, SyncMode.full_refresh),
+        ]
+    )
+
+    messages = _fix_emitted_at(list(src.read(logger, {}, catalog)))
+
+    assert [m for m in messages if m.record.stream == "s1"] == _as_records("s1", s1_output)
+    assert [m for m in messages if m.record.stream == "s2"] == _as_records("s2", s2_output)
+
+
+def test_read_concurrently_raises_stream_error(mocker):
+    s1 = MockStream([({"sync_mode": SyncMode.full_refresh}, [{"k": "v"}])], name="s1")
+    s2 = MockStream(name="s2")
+
+    mocker.patch.object(MockStream, "get_json_schema", return_value={})
+    mocker.patch.object(MockSource, "max_concurrent_streams", new_callable=mocker.PropertyMock, return_value=2)
+
+    src = MockSource(streams=[s1, s2])
+    catalog = ConfiguredAirbyteCatalog(
+        streams=[
+            _configured_stream(s1, SyncMode.full_refresh),
+            _configured_stream(s2, SyncMode.full_refresh),
+        ]
+    )
+
+    with pytest.raises(Exception, match="No mocked output supplied"):
+        list(src.read(logger, {}, catalog))
+
+
+def test_full_refresh_read_slices_concurrently(mocker):
+    """Tests that slices read concurrently output their records in slice order"""
+    slices = [{"slice": i} for i in range(10)]
+    s1 = MockStream([({"sync_mode": SyncMode.full_refresh, "stream_slice": s}, [s, s]) for s in slices], name="s1")
+
+    mocker.patch.object(MockStream, "get_json_schema", return_value={})
+    mocker.patch.object(MockStream, "stream_slices", return_value=slices)
+    mocker.patch.object(MockStream, "max_concurrent_slices", new_callable=mocker.PropertyMock, return_value=3)
+
+    src = MockSource(streams=[s1])
+    catalog = ConfiguredAirbyteCatalog(streams=[_configured_stream(s1, SyncMode.full_refresh)])
+
+    messages = _fix_emitted_at(list(src.read(logger, {}, catalog)))
+
+    assert messages == _as_records("s1", [s for s in slices for _ in range(2)])
+
+
+class MockHttpStream(HttpStream):
+    url_base = "https://example.com"
+    primary_key = "id"
+
+    def path(self, **kwargs) -> str:
+        return "users"
+
+    def next_page_token(self, response: requests.Response) -> Optional[Mapping[str, Any]]:
+        return None
+
+    def parse_response(self, response: requests.Response, **kwargs) -> Iterable[Mapping]:
+        yield from response.json()
+
+
+def test_http_metrics_are_summarized_at_the_end_of_the_sync(mocker, requests_mock, caplog):
+    requests_mock.get("https://example.com/users", json=[{"id": 1}, {"id": 2}])
+    mocker.patch.object(MockHttpStream, "get_json_schema", return_value={})
+    mocker.patch.object(MockSource, "collect_http_metrics", new_callable=mocker.PropertyMock, return_value=True)
+    stream = MockHttpStream()
+    src = MockSource(streams=[stream])
+    catalog = ConfiguredAirbyteCatalog(streams=[_configured_stream(stream, SyncMode.full_refresh)])
+
+    with caplog.at_level(logging.INFO):
+        messages = _fix_emitted_at(list(src.read(logger, {}, catalog)))
+
+    assert messages == _as_records("mock_http_stream", [{"id": 1}, {"id": 2}])
+    summaries = [record.getMessage() for record in caplog.records if record.getMessage().startswith("HTTP metrics summary")]
+    assert len(summaries) == 1
+    assert json.loads(summaries[0].split(": ", 1)[1])["status_codes"] == {"200": 1}
+
+
 def _state(state_data: Dict[str, Any]):
     return AirbyteMessage(type=Type.STATE, state=AirbyteStateMessage(data=state_data))
 
 
+def _stream_state(stream: str, stream_state: Dict[str, Any]):
+    return AirbyteMessage(
+        type=Type.STATE,
+        state=AirbyteStateMessage(
+            type=AirbyteStateType.STREAM,
+            stream=AirbyteStreamState(
+                stream_descriptor=StreamDescriptor(name=stream), stream_state=AirbyteStateBlob.parse_obj(stream_state)
+            ),
+        ),
+    )
+
+
 class TestIncrementalRead:
     def test_with_state_attribute(self, mocker):
         """Test correct state passing for the streams that have a state attribute"""
@@ -387,6 +517,36 @@ class TestIncrementalRead:
 
         assert expected == messages
 
+    def test_concurrent_streams_checkpoint_their_own_state(self, mocker):
+        """Tests that each stream read concurrently outputs a STATE message after its own records"""
+        stream_output = [{"k1": "v1"}, {"k2": "v2"}]
+        s1 = MockStream([({"sync_mode": SyncMode.incremental, "stream_state": {}}, stream_output)], name="s1")
+        s2 = MockStream([({"sync_mode": SyncMode.incremental, "stream_state": {}}, stream_output)], name="s2")
+        state = {"cursor": "value"}
+        mocker.patch.object(MockStream, "get_updated_state", return_value=state)
+        mocker.patch.object(MockStream, "supports_incremental", return_value=True)
+        mocker.patch.object(MockStream, "get_json_schema", return_value={})
+        mocker.patch.object(MockSource, "max_concurrent_streams", new_callable=mocker.PropertyMock, return_value=2)
+
+        src = MockSource(streams=[s1, s2])
+        catalog = ConfiguredAirbyteCatalog(
+            streams=[
+                _configured_stream(s1, SyncMode.incremental),
+                _configured_stream(s2, SyncMode.incremental),
+            ]
+        )
+
+        messages = _fix_emitted_at(list(src.read(logger, {}, catalog, state=defaultdict(dict))))
+
+        for stream_name in ["s1", "s2"]:
+            stream_messages = [m for m in messages if m.type == Type.STATE or m.record.stream == stream_name]
+            records = [m for m in stream_messages if m.type == Type.RECORD]
+            assert records == _as_records(stream_name, stream_output)
+            # the first STATE message including this stream comes right after its last record
+            first_state = next(i for i, m in enumerate(stream_messages) if m.type == Type.STATE and stream_name in m.state.data)
+            assert stream_messages[first_state - 1] == records[-1]
+        assert messages[-1].state.data == {"s1": state, "s2": state}
+
     def test_with_slices(self, mocker):
         """Tests that an incremental read which uses slices outputs each record in the slice followed by a STATE message, for each slice"""
         slices = [{"1": "1"}, {"2": "2"}]
@@ -452,6 +612,53 @@ class TestIncrementalRead:
 
         assert expected == messages
 
+    def test_with_concurrent_slices(self, mocker):
+        """Tests that slices read concurrently checkpoint the state computed from the emitted records after each slice"""
+        slices = [{"slice": i} for i in range(5)]
+        s1 = MockStreamWithState(
+            [({"sync_mode": SyncMode.incremental, "stream_slice": s, "stream_state": {}}, [s]) for s in slices],
+            name="s1",
+        )
+        mocker.patch.object(MockStreamWithState, "get_updated_state", side_effect=lambda state, record: {"cursor": record["slice"]})
+        # the state kept by the stream is ahead of the emitted records while slices are read concurrently
+        mocker.patch.object(MockStreamWithState, "state", new_callable=mocker.PropertyMock, return_value={"cursor": 4})
+        mocker.patch.object(MockStreamWithState, "get_json_schema", return_value={})
+        mocker.patch.object(MockStreamWithState, "stream_slices", return_value=slices)
+        mocker.patch.object(MockStreamWithState, "max_concurrent_slices", new_callable=mocker.PropertyMock, return_value=2)
+
+        src = MockSource(streams=[s1])
+        catalog = ConfiguredAirbyteCatalog(streams=[_configured_stream(s1, SyncMode.incremental)])
+
+        expected = [message for s in slices for message in (_as_record("s1", s), _state({"s1": {"cursor": s["slice"]}}))]
+        expected.append(_state({"s1": {"cursor": 4}}))
+
+        messages = _fix_emitted_at(list(src.read(logger, {}, catalog, state=defaultdict(dict))))
+
+        assert expected == messages
+
+    def test_concurrent_slices_without_get_updated_state(self, mocker):
+        """Tests that the slices of a stream which doesn't compute its state from records are read one after another"""
+        slices = [{"slice": i} for i in range(3)]
+        s1 = MockStreamWithState(
+            [({"sync_mode": SyncMode.incremental, "stream_slice": s, "stream_state": {}}, [s]) for s in slices],
+            name="s1",
+        )
+        mocker.patch.object(MockStreamWithState, "state", new_callable=mocker.PropertyMock, return_value={"cursor": "value"})
+        mocker.patch.object(MockStreamWithState, "get_json_schema", return_value={})
+        mocker.patch.object(MockStreamWithState, "stream_slices", return_value=slices)
+        mocker.patch.object(MockStreamWithState, "max_concurrent_slices", new_callable=mocker.PropertyMock, return_value=2)
+        read_slices_concurrently = mocker.spy(AbstractSource, "_read_slices_concurrently")
+
+        src = MockSource(streams=[s1])
+        catalog = ConfiguredAirbyteCatalog(streams=[_configured_stream(s1, SyncMode.incremental)])
+
+        expected = [message for s in slices for message in (_as_record("s1", s), _state({"s1": {"cursor": "value"}}))]
+
+        messages = _fix_emitted_at(list(src.read(logger, {}, catalog, state=defaultdict(dict))))
+
+        assert expected == messages
+        read_slices_concurrently.assert_not_called()
+
     def test_with_slices_and_interval(self, mocker):
         """
         Tests that an incremental read which uses slices and a checkpoint interval:
@@ -539,3 +746,177 @@ class TestIncrementalRead:
         messages = _fix_emitted_at(list(src.read(logger, {}, catalog, state=defaultdict(dict))))
 
         assert expected == messages
+
+    def test_per_stream_state(self, mocker):
+        """Tests that only per-stream STATE messages are emitted, holding the state of their stream, and skipped when it didn't change"""
+        slices = [{"1": "1"}, {"2": "2"}]
+        stream_output = [{"k1": "v1"}]
+        s1 = MockStream(
+            [({"sync_mode": SyncMode.incremental, "stream_slice": s, "stream_state": mocker.ANY}, stream_output) for s in slices],
+            name="s1",
+        )
+        s2 = MockStream(
+            [({"sync_mode": SyncMode.incremental, "stream_slice": s, "stream_state": mocker.ANY}, stream_output) for s in slices],
+            name="s2",
+        )
+        states = iter([{"cursor": 1}, {"cursor": 1}, {"cursor": 2}, {"cursor": 3}])
+        mocker.patch.object(MockStream, "get_updated_state", side_effect=lambda *args: next(states))
+        mocker.patch.object(MockStream, "supports_incremental", return_value=True)
+        mocker.patch.object(MockStream, "get_json_schema", return_value={})
+        mocker.patch.object(MockStream, "stream_slices", return_value=slices)
+        mocker.patch.object(MockSource, "per_stream_state", new_callable=mocker.PropertyMock, return_value=True)
+
+        src = MockSource(streams=[s1, s2])
+        catalog = ConfiguredAirbyteCatalog(
+            streams=[
+                _configured_stream(s1, SyncMode.incremental),
+                _configured_stream(s2, SyncMode.incremental),
+            ]
+        )
+        input_state = {"s1": {"cursor": 0}, "s3": {"cursor": "untouched"}}
+
+        expected = [
+            _as_record("s1", stream_output[0]),
+            _stream_state("s1", {"cursor": 1}),
+            _as_record("s1", stream_output[0]),
+            _as_record("s2", stream_output[0]),
+            _stream_state("s2", {"cursor": 2}),
+            _as_record("s2", stream_output[0]),
+            _stream_state("s2", {"cursor": 3}),
+        ]
+
+        messages = _fix_emitted_at(list(src.read(logger, {}, catalog, state=input_state)))
+
+        assert expected == messages
+        assert input_state == {"s1": {"cursor": 0}, "s3": {"cursor": "untouched"}}
+
+    def test_with_checkpoint_seconds(self, mocker):
+        """Tests that state is checkpointed once state_checkpoint_seconds elapsed since the previous checkpoint"""
+        stream_output = [{"k1": "v1"}, {"k2": "v2"}, {"k3": "v3"}]
+        s1 = MockStream([({"sync_mode": SyncMode.incremental, "stream_state": {}}, stream_output)], name="s1")
+        state = {"cursor": "value"}
+        mocker.patch.object(MockStream, "get_updated_state", return_value=state)
+        mocker.patch.object(MockStream, "supports_incremental", return_value=True)
+        mocker.patch.object(MockStream, "get_json_schema", return_value={})
+        mocker.patch.object(MockStream, "state_checkpoint_seconds", new_callable=mocker.PropertyMock, return_value=10)
+        # The clock is read when the stream starts, after each record, and after each checkpoint
+        mocker.patch("airbyte_cdk.sources.abstract_source.time.monotonic", side_effect=[0, 5, 10, 10, 15, 20])
+
+        src = MockSource(streams=[s1])
+        catalog = ConfiguredAirbyteCatalog(streams=[_configured_stream(s1, SyncMode.incremental)])
+
+        expected = [
+            _as_record("s1", stream_output[0]),
+            _as_record("s1", stream_output[1]),
+            _state({"s1": state}),
+            _as_record("s1", stream_output[2]),
+            _state({"s1": state}),
+        ]
+
+        messages = _fix_emitted_at(list(src.read(logger, {}, catalog, state=defaultdict(dict))))
+
+        assert expected == messages
+
+    def test_with_checkpoint_policy(self, mocker):
+        """Tests that a checkpoint policy on bytes without slice boundaries checkpoints across slices, and once the stream is read"""
+        slices = [{"1": "1"}, {"2": "2"}]
+        stream_output = [{"k": "x" * 10}, {"k": "y" * 10}, {"k": "z" * 10}]
+        s1 = MockStream(
+            [({"sync_mode": SyncMode.incremental, "stream_slice": s, "stream_state": mocker.ANY}, stream_output) for s in slices],
+            name="s1",
+        )
+        state = {"cursor": "value"}
+        mocker.patch.object(MockStream, "get_updated_state", return_value=state)
+        mocker.patch.object(MockStream, "supports_incremental", return_value=True)
+        mocker.patch.object(MockStream, "get_json_schema", return_value={})
+        mocker.patch.object(MockStream, "stream_slices", return_value=slices)
+        # Each RECORD message takes 104 bytes, the policy checkpoints every 4 records
+        policy = CheckpointPolicy(every_bytes=400, on_slices=False)
+        mocker.patch.object(MockStream, "checkpoint_policy", new_callable=mocker.PropertyMock, return_value=policy)
+
+        src = MockSource(streams=[s1])
+        catalog = ConfiguredAirbyteCatalog(streams=[_configured_stream(s1, SyncMode.incremental)])
+
+        expected = [
+            *_as_records("s1", stream_output),
+            _as_record("s1", stream_output[0]),
+            _state({"s1": state}),
+            _as_record("s1", stream_output[1]),
+            _as_record("s1", stream_output[2]),
+            _state({"s1": state}),
+        ]
+
+        messages = _fix_emitted_at(list(src.read(logger, {}, catalog, state=defaultdict(dict))))
+
+        assert expected == messages
+
+    def test_with_source_checkpoint_policy(self, mocker):
+        """Tests that streams without a checkpoint policy use the default policy of the source, which doesn't measure time per record"""
+        stream_output = [{"k1": "v1"}, {"k2": "v2"}, {"k3": "v3"}]
+        s1 = MockStream([({"sync_mode": SyncMode.incremental, "stream_state": {}}, stream_output)], name="s1")
+        state = {"cursor": "value"}
+        mocker.patch.object(MockStream, "get_updated_state", return_value=state)
+        mocker.patch.object(MockStream, "supports_incremental", return_value=True)
+        mocker.patch.object(MockStream, "get_json_schema", return_value={})
+        mocker.patch.object(
+            MockSource, "checkpoint_policy", new_callable=mocker.PropertyMock, return_value=CheckpointPolicy(every_records=2)
+        )
+        monotonic = mocker.patch("airbyte_cdk.sources.abstract_source.time.monotonic", return_value=0)
+
+        src = MockSource(streams=[s1])
+        catalog = ConfiguredAirbyteCatalog(streams=[_configured_stream(s1, SyncMode.incremental)])
+
+        expected = [
+            _as_record("s1", stream_output[0]),
+            _as_record("s1", stream_output[1]),
+            _state({"s1": state}),
+            _as_record("s1", stream_output[2]),
+            _state({"s1": state}),
+        ]
+
+        messages = _fix_emitted_at(list(src.read(logger, {}, catalog, state=defaultdict(dict))))
+
+        assert expected == messages
+        # Only when the read starts and at each checkpoint
+        assert monotonic.call_count == 3
+
+    def test_with_cursor_tracker(self, mocker):
+        """Tests that the state of a stream with a cursor tracker is computed by the tracker instead of get_updated_state"""
+        slices = [{"1": "1"}, {"2": "2"}]
+        outputs = {
+            "1": [{"updated_at": "2022-01-03"}, {"updated_at": "2022-01-02"}],
+            "2": [{"updated_at": "2022-01-04"}, {"other": "value"}],
+        }
+        s1 = MockStream(
+            [
+                (
+                    {"sync_mode": SyncMode.incremental, "stream_slice": slices[0], "stream_state": {"updated_at": "2022-01-01"}},
+                    outputs["1"],
+                ),
+                (
+                    {"sync_mode": SyncMode.incremental, "stream_slice": slices[1], "stream_state": {"updated_at": "2022-01-03"}},
+                    outputs["2"],
+                ),
+            ],
+            name="s1",
+        )
+        get_updated_state = mocker.patch.object(MockStream, "get_updated_state")
+        mocker.patch.object(MockStream, "supports_incremental", return_value=True)
+        mocker.patch.object(MockStream, "get_json_schema", return_value={})
+        mocker.patch.object(MockStream, "stream_slices", return_value=slices)
+        mocker.patch.object(MockStream, "cursor_tracker", new_callable=mocker.PropertyMock, side_effect=lambda: CursorTracker("updated_at"))
+
+        src = MockSource(streams=[s1])
+        catalog = ConfiguredAirbyteCatalog(streams=[_configured_stream(s1, SyncMode.incremental)])
+
+        expected = [
+            *_as_records("s1", outputs["1"]),
+            _state({"s1": {"updated_at": "2022-01-03"}}),
+            *_as_records("s1", outputs["2"]),
+            _state({"s1": {"updated_at": "2022-01-04"}}),
+        ]
+
+        messages = _fix_emitted_at(list(src.read(logger, {}, catalog, state={"s1": {"updated_at": "2022-01-01"}})))
+
+        assert expected == messages
+        get_updated_state.assert_not_called()
@@ -103,6 +103,20 @@ def test_read_state(source):
         assert state == actual
 
 
+def test_read_state_from_state_messages(source):
+    state = [
+        {"data": {"s1": {"cursor": "old"}, "s2": {"cursor": "value"}}},
+        {"type": "STREAM", "stream": {"stream_descriptor": {"name": "s1"}, "stream_state": {"cursor": "new"}}},
+        {"type": "STREAM", "stream": {"stream_descriptor": {"name": "s3"}}},
+    ]
+
+    with tempfile.NamedTemporaryFile("w") as state_file:
+        state_file.write(json.dumps(state))
+        state_file.flush()
+        actual = source.read_state(state_file.name)
+        assert {"s1": {"cursor": "new"}, "s2": {"cursor": "value"}, "s3": {}} == actual
+
+
 def test_read_state_nonexistent(source):
     assert {} == source.read_state("")
 
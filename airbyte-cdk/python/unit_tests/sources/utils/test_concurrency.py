@@ -0,0 +1,147 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import threading
+import time
+
+import pytest
+from airbyte_cdk.sources.utils.concurrency import interleave, ordered, prefetch
+
+
+def _producer(name, count, delay=0.0):
+    def produce():
+        for i in range(count):
+            time.sleep(delay)
+            yield f"{name}-{i}"
+
+    return produce
+
+
+def test_interleave_keeps_order_within_producer():
+    items = list(interleave([_producer("a", 20, 0.001), _producer("b", 20)], max_workers=2, buffer_size=3))
+
+    assert [i for i in items if i.startswith("a")] == [f"a-{i}" for i in range(20)]
+    assert [i for i in items if i.startswith("b")] == [f"b-{i}" for i in range(20)]
+
+
+def test_interleave_raises_producer_exception():
+    def failing():
+        yield "ok"
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        list(interleave([failing, _producer("a", 1000)], max_workers=2, buffer_size=1))
+
+
+def test_ordered_outputs_in_input_order():
+    delays = {"first": 0.02, "second": 0.0, "third": 0.01}
+
+    results = [(name, list(items)) for name, items in ordered(delays, lambda name: _producer(name, 3, delays[name])(), max_workers=3)]
+
+    assert results == [(name, [f"{name}-{i}" for i in range(3)]) for name in delays]
+
+
+def test_ordered_bounds_started_inputs():
+    started = []
+    lock = threading.Lock()
+
+    def produce(i):
+        with lock:
+            started.append(i)
+        return [i]
+
+    for i, items in ordered(range(10), produce, max_workers=2):
+        assert list(items) == [i]
+        time.sleep(0.01)
+        # the current input and at most one input ahead of it were started
+        assert max(started) <= i + 1
+
+
+def test_ordered_stops_workers_when_consumer_stops():
+    produced = []
+
+    def produce(i):
+        for j in range(1000):
+            produced.append(j)
+            yield j
+
+    reader = ordered(range(5), produce, max_workers=2, buffer_size=1)
+    _, items = next(reader)
+    next(items)
+    reader.close()
+
+    assert len(produced) < 1000
+
+
+def test_ordered_raises_producer_exception():
+    def produce(i):
+        if i == 1:
+            raise ValueError("boom")
+        return [i]
+
+    reader = ordered(range(3), produce, max_workers=3)
+    _, items = next(reader)
+    assert list(items) == [0]
+    _, items = next(reader)
+    with pytest.raises(ValueError, match="boom"):
+        list(items)
+
+
+def test_prefetch_keeps_order():
+    assert list(prefetch(range(100), depth=3)) == list(range(100))
+
+
+def test_prefetch_is_bounded_by_depth():
+    produced = []
+
+    def produce():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    reader = prefetch(produce(), depth=2)
+    assert next(reader) == 0
+    # let the background thread run as far ahead as it can
+    time.sleep(0.2)
+    assert len(produced) == 3
+    reader.close()
+
+
+def test_prefetch_runs_ahead_of_the_consumer():
+    def produce():
+        for i in range(5):
+            time.sleep(0.05)
+            yield i
+
+    start = time.monotonic()
+    for _ in prefetch(produce(), depth=5):
+        time.sleep(0.05)
+    # producing and consuming overlap instead of taking 0.5 seconds
+    assert time.monotonic() - start < 0.45
+
+
+def test_prefetch_raises_producer_exception():
+    def produce():
+        yield 1
+        raise ValueError("boom")
+
+    reader = prefetch(produce(), depth=1)
+    assert next(reader) == 1
+    with pytest.raises(ValueError, match="boom"):
+        next(reader)
+
+
+def test_prefetch_closes_the_producer_when_the_consumer_stops():
+    closed = threading.Event()
+
+    def produce():
+        try:
+            yield from range(100)
+        finally:
+            closed.set()
+
+    reader = prefetch(produce(), depth=1)
+    next(reader)
+    reader.close()
+    assert closed.is_set()
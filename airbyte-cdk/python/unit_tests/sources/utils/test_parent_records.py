@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import copy
+
+import pytest
+from airbyte_cdk.sources.utils.parent_records import ParentRecordStore, project, store_key
+
+
+class CountingParent:
+    def __init__(self, records):
+        self.records = records
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        for record in self.records:
+            yield dict(record)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ParentRecordStore(directory=str(tmp_path))
+
+
+def test_records_are_read_once_per_sync(store):
+    parent = CountingParent([{"id": 1}, {"id": 2}])
+    with store.sync():
+        assert list(store.records("parent", parent.read)) == [{"id": 1}, {"id": 2}]
+        assert list(store.records("parent", parent.read)) == [{"id": 1}, {"id": 2}]
+
+    assert parent.reads == 1
+    assert store.metrics["hits"] == 1
+    assert store.metrics["misses"] == 1
+
+
+def test_records_are_not_stored_outside_of_a_sync(store):
+    parent = CountingParent([{"id": 1}])
+    list(store.records("parent", parent.read))
+    list(store.records("parent", parent.read))
+
+    assert parent.reads == 2
+
+
+def test_store_is_emptied_when_the_sync_ends(store):
+    parent = CountingParent([{"id": 1}])
+    with store.sync():
+        with store.sync():
+            list(store.records("parent", parent.read))
+        list(store.records("parent", parent.read))
+        assert parent.reads == 1
+
+    assert store.metrics["memory_size"] == 0
+    with store.sync():
+        list(store.records("parent", parent.read))
+    assert parent.reads == 2
+
+
+def test_partially_read_parents_are_not_stored(store):
+    parent = CountingParent([{"id": 1}, {"id": 2}])
+    with store.sync():
+        records = store.records("parent", parent.read)
+        next(records)
+        records.close()
+        assert list(store.records("parent", parent.read)) == [{"id": 1}, {"id": 2}]
+
+        assert parent.reads == 2
+        assert store.metrics["memory_size"] > 0
+
+
+def test_failed_parents_are_not_stored(store):
+    def failing():
+        yield {"id": 1}
+        raise RuntimeError("boom")
+
+    with store.sync():
+        with pytest.raises(RuntimeError):
+            list(store.records("parent", failing))
+        assert store.metrics["memory_size"] == 0
+        assert list(store.records("parent", lambda: iter([{"id": 2}]))) == [{"id": 2}]
+
+
+def test_replayed_records_are_copies(store):
+    with store.sync():
+        for record in store.records("parent", CountingParent([{"id": 1}]).read):
+            record["id"] = 2
+        replayed = list(store.records("parent", CountingParent([]).read))
+        replayed[0]["id"] = 3
+
+        assert list(store.records("parent", CountingParent([]).read)) == [{"id": 1}]
+
+
+def test_records_spill_to_disk_past_the_memory_limit(tmp_path):
+    store = ParentRecordStore(memory_limit=200, directory=str(tmp_path))
+    records = [{"id": i, "name": "x" * 20} for i in range(20)]
+    with store.sync():
+        list(store.records("parent", CountingParent(records).read))
+
+        assert 0 < store.metrics["memory_size"] <= 200
+        assert store.metrics["disk_size"] > 0
+        assert list(store.records("parent", CountingParent([]).read)) == records
+    assert not list(tmp_path.iterdir())
+
+
+class Parent:
+    def __init__(self, name: str, url_base: str = "https://example.com/"):
+        self.name = name
+        self.url_base = url_base
+
+
+class OtherParent(Parent):
+    pass
+
+
+def test_keys_tell_parents_apart():
+    assert store_key(Parent("parent"), None, {"b": 1, "a": 2}) == store_key(Parent("parent"), None, {"a": 2, "b": 1})
+    assert store_key(Parent("parent"), None) != store_key(Parent("other"), None)
+    assert store_key(Parent("parent"), None) != store_key(OtherParent("parent"), None)
+    assert store_key(Parent("parent"), None) != store_key(Parent("parent", "https://other.com/"), None)
+    assert store_key(Parent("parent"), ["updated_at"]) != store_key(Parent("parent"), None)
+
+
+def test_project():
+    record = {"id": 1, "name": "a", "nested": {"key": "value"}}
+
+    assert project(record, None) is record
+    assert project(record, ["id", "missing"]) == {"id": 1}
+    assert project("not a record", ["id"]) == "not a record"
+
+
+def test_default_store_is_shared():
+    assert ParentRecordStore.default() is ParentRecordStore.default()
+    assert copy.deepcopy(ParentRecordStore.default()) is ParentRecordStore.default()
@@ -210,3 +210,49 @@ def test_custom_transform_with_default_normalization():
     obj = {"value": 12}
     s.transformer.transform(obj, SIMPLE_SCHEMA)
     assert obj == {"value": "transformed"}
+
+
+def test_schema_is_compiled_once(mocker):
+    t = TypeTransformer(TransformConfig.DefaultSchemaNormalization)
+    compile_converter = mocker.spy(t, "_compile_converter")
+    for _ in range(3):
+        t.transform({"prop": 12, "array": [1, 2], "nested": {"a": 1}}, COMPLEX_SCHEMA)
+    # prop, array, array items, nested and nested.a
+    assert compile_converter.call_count == 5
+
+
+def test_compiled_schemas_are_bounded():
+    t = TypeTransformer(TransformConfig.DefaultSchemaNormalization)
+    schemas = [{"type": "object", "properties": {"prop": {"type": "string"}}} for _ in range(TypeTransformer.MAX_COMPILED_SCHEMAS + 1)]
+    for schema in schemas[:-1]:
+        t.transform({"prop": 12}, schema)
+    # Using the first schema again keeps it cached, so the second one is evicted instead
+    t.transform({"prop": 12}, schemas[0])
+    t.transform({"prop": 12}, schemas[-1])
+
+    cached = [compiled.schema for compiled in t._compiled_schemas.values()]
+    assert len(cached) == TypeTransformer.MAX_COMPILED_SCHEMAS
+    assert any(schema is schemas[0] for schema in cached)
+    assert not any(schema is schemas[1] for schema in cached)
+
+
+def test_transform_recursive_schema():
+    schema = {
+        "type": "object",
+        "properties": {"node": {"$ref": "#/definitions/node"}},
+        "definitions": {"node": {"type": "object", "properties": {"value": {"type": "string"}, "child": {"$ref": "#/definitions/node"}}}},
+    }
+    record = {"node": {"value": 1, "child": {"value": 2, "child": {"value": 3}}}}
+    TypeTransformer(TransformConfig.DefaultSchemaNormalization).transform(record, schema)
+    assert record == {"node": {"value": "1", "child": {"value": "2", "child": {"value": "3"}}}}
+
+
+@pytest.mark.parametrize(
+    "validation_sample_interval, expected_warnings",
+    [(None, 0), (1, 5), (2, 3), (1000, 1)],
+)
+def test_validation_is_sampled(validation_sample_interval, expected_warnings, caplog):
+    t = TypeTransformer(TransformConfig.DefaultSchemaNormalization, validation_sample_interval=validation_sample_interval)
+    for _ in range(5):
+        t.transform({"number_prop": "aa12"}, COMPLEX_SCHEMA)
+    assert len(caplog.records) == expected_warnings
@@ -53,3 +53,14 @@ def test_double_finish_is_safely_ignored():
         timer.finish_event()
         timer.finish_event()
         assert timer.count == 1
+
+
+def test_finish_named_event():
+    with create_timer("Source Counter") as timer:
+        timer.start_event("first")
+        timer.start_event("second")
+        timer.finish_event("first")
+        assert timer.events["first"].end is not None
+        assert timer.events["second"].end is None
+        timer.finish_event()
+        assert timer.events["second"].end is not None
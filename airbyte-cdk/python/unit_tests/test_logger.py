@@ -7,7 +7,8 @@ import logging
 from typing import Dict
 
 import pytest
-from airbyte_cdk.logger import AirbyteLogFormatter
+from airbyte_cdk.logger import AirbyteLogFormatter, RepeatedMessageFilter, init_logger
+from airbyte_cdk.models import AirbyteLogMessage, AirbyteMessage
 
 
 @pytest.fixture(scope="session")
@@ -92,3 +93,50 @@ def test_fatal(logger, caplog):
     record = caplog.records[0]
     assert record.levelname == "CRITICAL"
     assert record.message == "Test fatal 1"
+
+
+@pytest.mark.parametrize("message", ["Test formatter", 'Quotes " and unicode \u00e9', "Percent %s"])
+def test_formatter_outputs_the_protocol_message(message):
+    record = logging.LogRecord("airbyte", logging.INFO, "", 0, message, None, None)
+    expected = AirbyteMessage(type="LOG", log=AirbyteLogMessage(level="INFO", message=message)).json(exclude_unset=True)
+
+    assert AirbyteLogFormatter().format(record) == expected
+
+
+def test_debug_extras():
+    record = logging.LogRecord("airbyte", logging.DEBUG, "", 0, "Test debug", None, None)
+    record.url = "https://example.com"
+    formatted = json.loads(AirbyteLogFormatter().format(record))
+
+    assert formatted == {"type": "DEBUG", "message": "Test debug", "data": {"url": "https://example.com"}}
+
+
+def _record(name="airbyte", level=logging.INFO, msg="Read page %s", args=(1,)):
+    return logging.LogRecord(name, level, "", 0, msg, args, None)
+
+
+def test_repeated_messages_are_dropped(mocker):
+    now = mocker.patch("airbyte_cdk.logger.time.monotonic", return_value=0.0)
+    log_filter = RepeatedMessageFilter(max_messages=2, interval=10)
+
+    assert [log_filter.filter(_record(args=(page,))) for page in range(4)] == [True, True, False, False]
+    assert log_filter.filter(_record(msg="Other message"))
+    assert log_filter.filter(_record(name="airbyte.other"))
+    assert log_filter.filter(_record(level=logging.WARNING))
+
+    now.return_value = 10.0
+    record = _record(args=(5,))
+    assert log_filter.filter(record)
+    assert record.getMessage() == "Read page 5 (2 similar messages dropped)"
+
+
+def test_init_logger_drops_repeated_messages(capsys):
+    logger = init_logger("airbyte.RepeatedTestlogger", max_repeated_messages=1)
+    try:
+        logger.info("Read page %s", 1)
+        logger.info("Read page %s", 2)
+    finally:
+        init_logger()
+
+    messages = [json.loads(line)["log"]["message"] for line in capsys.readouterr().out.splitlines()]
+    assert messages == ["Read page 1"]
@@ -0,0 +1,38 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import datetime
+from decimal import Decimal
+
+import pytest
+from airbyte_cdk.models import AirbyteLogMessage, AirbyteMessage, AirbyteRecordMessage, AirbyteStateMessage, Level, Type
+from airbyte_cdk.utils.message_serialization import airbyte_message_to_string
+
+
+@pytest.mark.parametrize(
+    "record",
+    [
+        AirbyteRecordMessage(stream="users", data={"id": 1, "name": "octavia"}, emitted_at=1),
+        AirbyteRecordMessage(namespace="public", stream="users", data={"id": 1}, emitted_at=1),
+        AirbyteRecordMessage(stream="users", data={"nested": {"list": [1, "a", None, True]}, "unicode": "é😀"}, emitted_at=1),
+        AirbyteRecordMessage(stream="users", data={"date": datetime.date(2022, 1, 1), "decimal": Decimal("1.5"), "set": {1}}, emitted_at=1),
+        AirbyteRecordMessage.construct(stream="users", data={"id": 1}, emitted_at=1),
+    ],
+)
+def test_record_is_serialized_like_pydantic(record):
+    message = AirbyteMessage(type=Type.RECORD, record=record)
+
+    assert airbyte_message_to_string(message) == message.json(exclude_unset=True)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        AirbyteMessage(type=Type.LOG, log=AirbyteLogMessage(level=Level.INFO, message="hello")),
+        AirbyteMessage(type=Type.STATE, state=AirbyteStateMessage(data={"users": {"cursor": 1}})),
+        AirbyteMessage(type=Type.RECORD, record=AirbyteRecordMessage(stream="users", data={}, emitted_at=1), log=None),
+    ],
+)
+def test_other_messages_are_serialized_by_pydantic(message):
+    assert airbyte_message_to_string(message) == message.json(exclude_unset=True)
@@ -0,0 +1,95 @@
+#
+# Copyright (c) 2022 Airbyte, Inc., all rights reserved.
+#
+
+import io
+import logging
+import sys
+import time
+
+from airbyte_cdk.utils.output_sink import OutputSink
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_messages_are_written_in_batches():
+    stream = CountingStream()
+    with OutputSink(stream, buffer_size=100, flush_interval=60) as sink:
+        for i in range(100):
+            sink.write_message(f'{{"record": {i}}}')
+
+    assert stream.getvalue() == "".join(f'{{"record": {i}}}\n' for i in range(100))
+    assert stream.writes < 30
+
+
+def test_flush_on_demand():
+    stream = CountingStream()
+    with OutputSink(stream, buffer_size=10_000, flush_interval=60) as sink:
+        sink.write_message("record")
+        assert stream.getvalue() == ""
+        sink.write_message("state", flush=True)
+        assert stream.getvalue() == "record\nstate\n"
+
+
+def test_flush_on_interval():
+    stream = CountingStream()
+    with OutputSink(stream, buffer_size=10_000, flush_interval=0.01) as sink:
+        sink.write_message("record")
+        time.sleep(0.1)
+        assert stream.getvalue() == "record\n"
+
+
+def test_logs_and_prints_are_routed_through_the_sink():
+    stream = CountingStream()
+    handler = logging.StreamHandler(stream)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    try:
+        with OutputSink(stream, buffer_size=10_000, flush_interval=60) as sink:
+            sink.write_message("record 1")
+            logging.getLogger("airbyte.test").warning("log line")
+            sink.write_message("record 2")
+        handler.emit(logging.makeLogRecord({"msg": "after", "levelno": logging.WARNING}))
+    finally:
+        root_logger.removeHandler(handler)
+
+    assert stream.getvalue() == "record 1\nlog line\nrecord 2\nafter\n"
+    assert handler.stream is stream
+
+
+def test_log_lines_do_not_flush_the_sink():
+    stream = CountingStream()
+    handler = logging.StreamHandler(stream)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    try:
+        with OutputSink(stream, buffer_size=10_000, flush_interval=60) as sink:
+            sink.write_message("record")
+            logging.getLogger("airbyte.test").warning("log line")
+            assert stream.getvalue() == ""
+            assert handler.stream.encoding == stream.encoding
+    finally:
+        root_logger.removeHandler(handler)
+
+    assert stream.getvalue() == "record\nlog line\n"
+
+
+def test_explicit_flushes_of_stdout_flush_the_sink(monkeypatch):
+    stream = CountingStream()
+    monkeypatch.setattr(sys, "stdout", stream)
+    with OutputSink(stream, buffer_size=10_000, flush_interval=60) as sink:
+        sink.write_message("record")
+        print("printed")
+        assert stream.getvalue() == ""
+        print("flushed", flush=True)
+        assert stream.getvalue() == "record\nprinted\nflushed\n"
+
+    assert sys.stdout is stream
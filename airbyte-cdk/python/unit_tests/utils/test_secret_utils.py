@@ -116,3 +116,23 @@ def test_secret_filtering():
     update_secrets([SECRET_STRING_VALUE, SECRET_STRING_2_VALUE])
     filtered = filter_secrets(sensitive_str)
     assert filtered == f"**** {NOT_SECRET_VALUE} **** ****"
+
+
+@pytest.mark.parametrize(
+    ["secrets", "string", "expected"],
+    [
+        (["x", "xk"], "xk", "****"),
+        (["xk", "x"], "xk", "****"),
+        (["ab", "bcd"], "abcd", "****cd"),
+        (["abc", "b"], "ab abc b", "a**** **** ****"),
+        (["a.c"], "abc a.c", "abc ****"),
+        ([SECRET_INT_VALUE, ""], f"port {SECRET_INT_VALUE}", "port ****"),
+        (["long_secret"], "short", "short"),
+    ],
+)
+def test_secret_filtering_matches_the_longest_secret(secrets, string, expected):
+    update_secrets(secrets)
+    try:
+        assert filter_secrets(string) == expected
+    finally:
+        update_secrets([])